@@ -0,0 +1,324 @@
+"""
+Asynchronous Activity Log Writer for Estate Management System
+=============================================================
+Views record activity with ``log_activity(user=..., action=...)`` instead of
+``Log.objects.create(...)``. Events go into an in-process buffer and a
+background thread writes them with one ``bulk_create`` per batch, either when
+``ACTIVITY_LOG_BATCH_SIZE`` events are waiting or every
+``ACTIVITY_LOG_FLUSH_INTERVAL`` seconds.
+
+Crash safety: every event is also appended to a journal file in
+``ACTIVITY_LOG_SPILL_DIR`` before it is buffered. Each writer names its files
+``activity-<pid>-<token>...`` with a random token, so a process that reuses
+a dead process's pid never shares its files. The journal is rotated at each
+flush and deleted once its batch is committed. A batch that fails to insert
+stays on disk as a ``.spill`` file. Spill files, the journals of dead
+writers and files left half-replayed by a dead process are replayed on the
+next start, on the next successful flush, or by
+``python manage.py flush_activity_log``. Delivery is at-least-once: a crash
+between the INSERT and the unlink can replay a batch.
+
+Set ``ACTIVITY_LOG_ASYNC = False`` to write synchronously (tests, scripts).
+"""
+
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import uuid
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import EstateUser, Log
+
+logger = logging.getLogger(__name__)
+
+
+BATCH_SIZE = getattr(settings, "ACTIVITY_LOG_BATCH_SIZE", 200)
+FLUSH_INTERVAL = getattr(settings, "ACTIVITY_LOG_FLUSH_INTERVAL", 2.0)
+SPILL_DIR = str(getattr(settings, "ACTIVITY_LOG_SPILL_DIR", os.path.join(settings.BASE_DIR, "activity_spill")))
+ASYNC_ENABLED = getattr(settings, "ACTIVITY_LOG_ASYNC", True)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# Writer tokens and replay claims of this process: files with our pid but
+# another token (or an unknown claim) were left by a dead process
+_live_tokens = set()
+_claims = set()
+
+
+def _owner(name):
+    """(pid, token) from ``activity-<pid>-<token>...``; token is "" for older names"""
+    parts = name[len("activity-"):].split(".")[0].split("-")
+    return int(parts[0]), parts[1] if len(parts) > 1 else ""
+
+
+def _writer_alive(name):
+    pid, token = _owner(name)
+    if pid == os.getpid():
+        return token in _live_tokens
+    return _pid_alive(pid)
+
+
+def _read_events(path):
+    """Parse a journal/spill file, skipping a torn last line"""
+    events = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+    return events
+
+
+def _write_events(events):
+    """
+    Insert events with a single bulk_create.
+    Events whose user was deleted in the meantime are dropped (the Log FK
+    cascades on user delete anyway).
+    """
+    if not events:
+        return 0
+
+    def build(batch):
+        return [
+            Log(
+                user_id=event["user_id"],
+                action=event["action"][:500],
+                timestamp=parse_datetime(event["timestamp"]) or timezone.now(),
+            )
+            for event in batch
+        ]
+
+    try:
+        Log.objects.bulk_create(build(events), batch_size=BATCH_SIZE)
+    except IntegrityError:
+        user_ids = {event["user_id"] for event in events if event["user_id"] is not None}
+        existing = set(EstateUser.objects.filter(user_id__in=user_ids).values_list("user_id", flat=True))
+        events = [event for event in events if event["user_id"] is None or event["user_id"] in existing]
+        Log.objects.bulk_create(build(events), batch_size=BATCH_SIZE)
+    return len(events)
+
+
+# ===========================
+# Writer
+# ===========================
+
+class ActivityLogWriter:
+    """Per-process buffer + journal + background flush thread"""
+
+    def __init__(self, spill_dir=SPILL_DIR, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.spill_dir = spill_dir
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pid = os.getpid()
+        self.token = uuid.uuid4().hex[:12]
+        self.buffer = []
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopping = False
+        self.sequence = 0
+        self.has_spill = True  # check for leftovers from earlier runs on the first flush
+        self.journal = None
+        self.thread = None
+
+    @property
+    def journal_path(self):
+        return os.path.join(self.spill_dir, f"activity-{self.pid}-{self.token}.journal")
+
+    def start(self):
+        os.makedirs(self.spill_dir, exist_ok=True)
+        _live_tokens.add(self.token)
+        self.journal = open(self.journal_path, "a", encoding="utf-8")
+        self.thread = threading.Thread(target=self._run, name="activity-log-writer", daemon=True)
+        self.thread.start()
+        atexit.register(self.stop)
+
+    def add(self, user_id, action):
+        event = {"user_id": user_id, "action": action, "timestamp": timezone.now().isoformat()}
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self.lock:
+            # Journal first: a killed process leaves the event on disk
+            self.journal.write(line)
+            self.journal.flush()
+            self.buffer.append(event)
+            pending = len(self.buffer)
+        if pending >= self.batch_size:
+            self.wakeup.set()
+
+    def _rotate(self):
+        """Swap out the buffer and its journal (caller holds self.lock)"""
+        events, self.buffer = self.buffer, []
+        self.journal.close()
+        self.sequence += 1
+        inflight = os.path.join(self.spill_dir, f"activity-{self.pid}-{self.token}-{self.sequence}.inflight")
+        os.replace(self.journal_path, inflight)
+        self.journal = open(self.journal_path, "a", encoding="utf-8")
+        return events, inflight
+
+    def flush(self):
+        """Write everything buffered so far, returns number of rows written"""
+        with self.flush_lock:
+            with self.lock:
+                if not self.buffer:
+                    events = None
+                else:
+                    events, inflight = self._rotate()
+
+            written = 0
+            if events:
+                try:
+                    written = _write_events(events)
+                    os.remove(inflight)
+                except Exception as e:
+                    os.replace(inflight, _spill_path(self.spill_dir, os.path.basename(inflight)))
+                    self.has_spill = True
+                    logger.error(f"❌ Activity log flush failed, {len(events)} events spilled to disk: {str(e)}")
+                    return 0
+
+            if self.has_spill:
+                self.has_spill = False
+                written += replay_spill(self.spill_dir)
+            return written
+
+    def _run(self):
+        while not self.stopping:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            try:
+                close_old_connections()
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ Activity log writer error: {str(e)}")
+        connection.close()
+
+    def stop(self):
+        """Flush remaining events on shutdown"""
+        if self.stopping:
+            return
+        self.stopping = True
+        self.wakeup.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.flush_interval + 5)
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"❌ Activity log final flush failed (events kept in {self.spill_dir}): {str(e)}")
+            return
+        with self.lock:
+            self.journal.close()
+            if os.path.exists(self.journal_path) and os.path.getsize(self.journal_path) == 0:
+                os.remove(self.journal_path)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """Return this process's writer, starting it on first use (and after fork)"""
+    global _writer
+    if _writer is None or _writer.pid != os.getpid():
+        with _writer_lock:
+            if _writer is None or _writer.pid != os.getpid():
+                writer = ActivityLogWriter()
+                writer.start()
+                _writer = writer
+    return _writer
+
+
+# ===========================
+# Public Helpers
+# ===========================
+
+def log_activity(user, action):
+    """
+    Record a user activity log entry
+
+    Args:
+        user: EstateUser instance or user_id (None for anonymous)
+        action: Description of the action (max 500 characters)
+    """
+    user_id = getattr(user, "user_id", user)
+    if not ASYNC_ENABLED:
+        Log.objects.create(user_id=user_id, action=action)
+        return
+    try:
+        get_writer().add(user_id, action)
+    except Exception as e:
+        logger.error(f"❌ Failed to queue activity log, writing directly: {str(e)}")
+        Log.objects.create(user_id=user_id, action=action)
+
+
+def flush():
+    """Write all buffered activity logs now (e.g. before reading the logs table)"""
+    if _writer is not None and _writer.pid == os.getpid():
+        return _writer.flush()
+    return 0
+
+
+def _spill_path(spill_dir, name):
+    """New, unique ``.spill`` path for the events of file ``name`` (never replaces another spill)"""
+    return os.path.join(spill_dir, f"{name.split('.')[0]}-{uuid.uuid4().hex[:12]}.spill")
+
+
+def replay_spill(spill_dir=SPILL_DIR):
+    """
+    Insert events left on disk by failed flushes or crashed processes.
+    Each file is claimed with an atomic rename to ``<name>.replay-<pid>``, so
+    concurrent replays never insert the same file twice; claims whose process
+    died mid-replay are taken over.
+
+    Returns:
+        Number of rows written
+    """
+    written = 0
+    for path in sorted(glob.glob(os.path.join(spill_dir, "activity-*"))):
+        name = os.path.basename(path)
+        if ".replay-" in name:
+            name, claimer = name.rsplit(".replay-", 1)
+            if not claimer.isdigit():
+                continue
+            claimer = int(claimer)
+            if path in _claims or (claimer != os.getpid() and _pid_alive(claimer)):
+                continue  # being replayed right now
+        elif name.endswith(".journal") or name.endswith(".inflight"):
+            if _writer_alive(name):
+                continue
+        elif not name.endswith(".spill"):
+            continue
+
+        claimed = os.path.join(spill_dir, f"{name}.replay-{os.getpid()}")
+        try:
+            os.replace(path, claimed)
+        except FileNotFoundError:
+            continue  # another process claimed it
+
+        _claims.add(claimed)
+        try:
+            count = _write_events(_read_events(claimed))
+            os.remove(claimed)
+            written += count
+            logger.info(f"✅ Replayed {count} activity log events from {name}")
+        except Exception as e:
+            os.replace(claimed, _spill_path(spill_dir, name))
+            logger.error(f"❌ Failed to replay {name}: {str(e)}")
+        finally:
+            _claims.discard(claimed)
+    return written
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class BackendConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend'
+
+    def ready(self):
+        from . import signals  # noqa: F401 - registers signal handlers
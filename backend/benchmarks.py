@@ -0,0 +1,108 @@
+"""
+Hot Path Benchmarks for Estate Management System
+================================================
+Times the most used pages and APIs in-process with Django's test client
+against a synthetic dataset (synthetic_data.py). Each request is measured
+for wall-clock latency and for the number of SQL queries it ran on the
+request thread (background writers such as activity_log.py are not
+counted). Used by ``python manage.py benchmark_hot_paths``.
+"""
+
+import math
+import statistics
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from .current_user import ROLE_SESSION_KEYS
+
+
+Target = namedtuple("Target", ["name", "role", "url"])
+
+TARGETS = [
+    Target("home", "buyer", "/"),
+    Target("buyer_quick_search_api", "buyer", "/backend/api/buyer/quick-search/?q=Villa&bedrooms=3"),
+    Target("dashboard_search_api", "admin", "/backend/api/dashboard/search/?q=Pune"),
+    Target("dashboard_view", "admin", "/backend/dashboard/"),
+    Target("seller_dashboard_view", "seller", "/backend/seller-home/"),
+    Target("get_notifications_api", "seller", "/backend/api/notifications/"),
+    Target("bookings_html", "admin", "/backend/bookings/"),
+]
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def logged_in_client(role, user_id):
+    """Test client with a session like the login view creates"""
+    client = Client(HTTP_HOST="localhost")
+    session = client.session
+    session["role"] = role
+    session["user_id"] = user_id
+    session[ROLE_SESSION_KEYS.get(role, "user_id")] = user_id
+    session.save()
+    return client
+
+
+def measure(client, url, iterations, warmup=1):
+    """
+    Request ``url`` ``iterations`` times (after ``warmup`` untimed requests)
+
+    Returns:
+        Dict with the last status code, latency_ms (min, p50..p99, max, mean)
+        and queries (min, median, max) per request
+    """
+    secure = getattr(settings, "SECURE_SSL_REDIRECT", False)
+    for _ in range(warmup):
+        client.get(url, secure=secure)
+
+    latencies = []
+    queries = []
+    status = None
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = client.get(url, secure=secure)
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured.captured_queries))
+        status = response.status_code
+
+    latencies.sort()
+    latency = {"min": round(latencies[0], 3)}
+    latency.update({f"p{pct}": round(percentile(latencies, pct), 3) for pct in PERCENTILES})
+    latency.update({"max": round(latencies[-1], 3), "mean": round(statistics.fmean(latencies), 3)})
+    return {
+        "status": status,
+        "latency_ms": latency,
+        "queries": {"min": min(queries), "median": statistics.median(queries), "max": max(queries)},
+    }
+
+
+def run(users, iterations, warmup=1, targets=TARGETS):
+    """
+    Measure every target as the synthetic user of its role
+
+    Args:
+        users: {role: user_id}, e.g. synthetic_data.sample_users()
+    """
+    results = {}
+    clients = {}
+    for target in targets:
+        if target.role not in users:
+            continue
+        if target.role not in clients:
+            clients[target.role] = logged_in_client(target.role, users[target.role])
+        results[target.name] = {"url": target.url, "role": target.role,
+                                **measure(clients[target.role], target.url, iterations, warmup)}
+    return results
@@ -29,3 +29,30 @@ class AzureBotConsumer(AsyncWebsocketConsumer):
             # For demo, just echo user message
             bot_reply = res_json.get("id", "Message sent")
         await self.send(text_data=json.dumps({"reply": bot_reply}))
+
+
+class NotificationConsumer(AsyncWebsocketConsumer):
+    """Pushes new notifications to the logged-in user's dashboards (see notification_push.py)"""
+
+    async def connect(self):
+        from .notification_push import user_group_name
+
+        session = self.scope.get("session") or {}
+        role = session.get("role")
+        user_id = session.get("user_id")
+        if not role or not user_id:
+            await self.close(code=4401)
+            return
+
+        self.group_name = user_group_name(user_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        # Catch up on anything published before (or between) connections
+        await self.send(text_data=json.dumps({"event": "refresh"}))
+
+    async def disconnect(self, close_code):
+        if hasattr(self, "group_name"):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def send_notification(self, event):
+        await self.send(text_data=json.dumps(event["payload"]))
@@ -0,0 +1,158 @@
+"""
+Current User Resolution for Estate Management System
+====================================================
+Views used to read ``request.session['role']``, pick one of ``buyer_id`` /
+``seller_id`` / ``admin_user`` / ``user_id`` and run
+``EstateUser.objects.get(user_id=...)``, sometimes more than once per
+request. ``EstateUserMiddleware`` resolves the logged-in user once per
+request into ``request.estate_user`` (None for anonymous visitors and for
+sessions whose user no longer exists).
+
+Rows come from a small per-process cache with a short TTL
+(``ESTATE_USER_CACHE_TTL`` seconds), so most requests do not query the
+users table at all. The signals in signals.py drop a user's entry whenever
+the row is saved or deleted (edit_user, edit_profile, delete_user, block,
+password change, ...); other processes pick the change up within the TTL.
+Each request gets its own copy of the cached row, so a view can modify and
+save it without affecting concurrent requests.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.db import transaction
+from django.shortcuts import redirect
+
+from .models import EstateUser
+
+
+CACHE_TTL = getattr(settings, "ESTATE_USER_CACHE_TTL", 30)
+CACHE_MAX_ENTRIES = 2048
+
+# Session key each role's login stores its id under (all equal user_id)
+ROLE_SESSION_KEYS = {
+    "admin": "admin_user",
+    "buyer": "buyer_id",
+    "seller": "seller_id",
+}
+
+_MISSING = object()
+
+_cache = OrderedDict()  # user_id -> (expires_at, EstateUser or None)
+_lock = threading.Lock()
+
+
+# ===========================
+# Per-process Cache
+# ===========================
+
+def _cached(user_id):
+    now = time.monotonic()
+    with _lock:
+        entry = _cache.get(user_id)
+        if entry is None:
+            return _MISSING
+        if entry[0] <= now:
+            del _cache[user_id]
+            return _MISSING
+        _cache.move_to_end(user_id)
+        return entry[1]
+
+
+def _store(user_id, user):
+    with _lock:
+        _cache[user_id] = (time.monotonic() + CACHE_TTL, user)
+        _cache.move_to_end(user_id)
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def get_user(user_id):
+    """EstateUser by id through the cache (None if it does not exist)"""
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+    user = _cached(user_id)
+    if user is _MISSING:
+        # Misses are cached too, so a stale session does not query every request
+        user = EstateUser.objects.filter(user_id=user_id).first()
+        _store(user_id, user)
+    return copy.copy(user)
+
+
+def invalidate(user_id):
+    """Forget a user now and again after commit (a concurrent read may re-cache the old row)"""
+    def drop():
+        with _lock:
+            _cache.pop(user_id, None)
+
+    drop()
+    transaction.on_commit(drop)
+
+
+def clear():
+    with _lock:
+        _cache.clear()
+
+
+# ===========================
+# Request Integration
+# ===========================
+
+def session_user_id(session):
+    """Logged-in user's id from the session, or None"""
+    role = session.get("role")
+    if not role:
+        return None
+    return session.get(ROLE_SESSION_KEYS.get(role, "user_id")) or session.get("user_id")
+
+
+class EstateUserMiddleware:
+    """Sets ``request.estate_user`` (after SessionMiddleware)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user_id = session_user_id(request.session)
+        request.estate_user = get_user(user_id) if user_id else None
+        return self.get_response(request)
+
+
+def request_user(request):
+    """
+    The logged-in EstateUser
+
+    Raises:
+        EstateUser.DoesNotExist: No user is logged in or the account is gone,
+        like the ``EstateUser.objects.get()`` calls this replaces
+    """
+    user = getattr(request, "estate_user", _MISSING)
+    if user is _MISSING:
+        user_id = session_user_id(request.session)
+        user = request.estate_user = get_user(user_id) if user_id else None
+    if user is None:
+        raise EstateUser.DoesNotExist("No logged-in user for this session")
+    return user
+
+
+def login_required(allowed_roles=None):
+    """Redirect to the login page unless a user (with one of ``allowed_roles``) is logged in"""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            role = request.session.get("role")
+            if not role or (allowed_roles and role not in allowed_roles):
+                return redirect("/backend/login/")
+            try:
+                request_user(request)
+            except EstateUser.DoesNotExist:
+                return redirect("/backend/login/")
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
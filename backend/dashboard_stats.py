@@ -0,0 +1,213 @@
+"""
+Admin Dashboard Statistics Snapshot for Estate Management System
+================================================================
+The admin dashboard reads its counters from the single ``DashboardStats``
+row instead of running ~20 COUNT/SUM queries per page load.
+
+Incremental maintenance: every tracked row (user, property, image, booking,
+transaction) "contributes" a set of counter values, e.g. an Available
+property contributes ``total_properties=1, properties_available=1``. The
+signals in ``signals.py`` apply ``new contribution - old contribution`` to
+the snapshot with one atomic ``UPDATE ... SET x = x + delta``, inside the
+same transaction as the change itself.
+
+Changes that bypass signals (``QuerySet.update()``, raw SQL, manual DB
+edits) are corrected by ``reconcile()``, run from
+``python manage.py refresh_dashboard_stats`` (e.g. from cron) and whenever
+the calendar month rolls over.
+"""
+
+import datetime
+import logging
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import Booking, DashboardStats, EstateUser, Property, PropertyImage, Transaction
+
+logger = logging.getLogger(__name__)
+
+
+SNAPSHOT_ID = 1
+
+
+def _month_start(value):
+    return value.date().replace(day=1) if isinstance(value, datetime.datetime) else value.replace(day=1)
+
+
+def _previous_month(month):
+    return (month - datetime.timedelta(days=1)).replace(day=1)
+
+
+def _current_month():
+    return _month_start(timezone.localtime())
+
+
+def _in_month(value, month):
+    return value is not None and _month_start(timezone.localtime(value)) == month
+
+
+# ===========================
+# Row Contributions
+# ===========================
+
+def _user_contribution(user, month):
+    return {
+        "total_users": 1,
+        "users_sellers": int(user.role == "seller"),
+        "users_buyers": int(user.role == "buyer"),
+        "users_admins": int(user.role == "admin"),
+        "prev_month_users": int(_in_month(user.created_at, _previous_month(month))),
+    }
+
+
+def _property_contribution(prop, month):
+    return {
+        "total_properties": 1,
+        "properties_available": int(prop.status == Property.STATUS_AVAILABLE),
+        "properties_sold": int(prop.status == Property.STATUS_SOLD),
+        "properties_pending": int(prop.status == Property.STATUS_PENDING),
+        "prev_month_properties": int(_in_month(prop.created_at, _previous_month(month))),
+    }
+
+
+def _image_contribution(image, month):
+    return {"total_images": 1}
+
+
+def _booking_contribution(booking, month):
+    confirmed = booking.status == "Confirmed"
+    purchases = 0
+    if confirmed and booking.pk:
+        purchases = Transaction.objects.filter(booking_id=booking.pk, payment_status="success").count()
+    return {
+        "total_bookings": 1,
+        "bookings_pending": int(booking.status == "pending"),
+        "bookings_confirmed": int(confirmed),
+        "successful_purchases": purchases,
+    }
+
+
+def _transaction_contribution(txn, month):
+    success = txn.payment_status == "success"
+    purchase = success and txn.booking_id is not None and Booking.objects.filter(
+        booking_id=txn.booking_id, status="Confirmed"
+    ).exists()
+    amount = Decimal(str(txn.amount or 0))
+    return {
+        "total_transactions": 1,
+        "transactions_success": int(success),
+        "successful_purchases": int(purchase),
+        "total_revenue": amount,
+        "monthly_revenue": amount if _in_month(txn.payment_date, month) else Decimal("0"),
+    }
+
+
+CONTRIBUTIONS = {
+    EstateUser: _user_contribution,
+    Property: _property_contribution,
+    PropertyImage: _image_contribution,
+    Booking: _booking_contribution,
+    Transaction: _transaction_contribution,
+}
+
+TRACKED_MODELS = tuple(CONTRIBUTIONS)
+
+
+def contribution(instance, month=None):
+    """Counter values a single row adds to the snapshot"""
+    return CONTRIBUTIONS[type(instance)](instance, month or _current_month())
+
+
+# ===========================
+# Snapshot Maintenance
+# ===========================
+
+def compute_stats():
+    """Recompute every counter from the source tables"""
+    month = _current_month()
+    prev_month = _previous_month(month)
+    month_start = timezone.make_aware(datetime.datetime.combine(month, datetime.time.min))
+    prev_start = timezone.make_aware(datetime.datetime.combine(prev_month, datetime.time.min))
+
+    return {
+        "total_users": EstateUser.objects.count(),
+        "users_sellers": EstateUser.objects.filter(role="seller").count(),
+        "users_buyers": EstateUser.objects.filter(role="buyer").count(),
+        "users_admins": EstateUser.objects.filter(role="admin").count(),
+        "total_properties": Property.objects.count(),
+        "properties_available": Property.objects.filter(status=Property.STATUS_AVAILABLE).count(),
+        "properties_sold": Property.objects.filter(status=Property.STATUS_SOLD).count(),
+        "properties_pending": Property.objects.filter(status=Property.STATUS_PENDING).count(),
+        "total_images": PropertyImage.objects.count(),
+        "total_bookings": Booking.objects.count(),
+        "bookings_pending": Booking.objects.filter(status="pending").count(),
+        "bookings_confirmed": Booking.objects.filter(status="Confirmed").count(),
+        "total_transactions": Transaction.objects.count(),
+        "transactions_success": Transaction.objects.filter(payment_status="success").count(),
+        "successful_purchases": Transaction.objects.filter(
+            payment_status="success", booking__status="Confirmed"
+        ).count(),
+        "total_revenue": Transaction.objects.aggregate(total=Sum("amount"))["total"] or 0,
+        "stats_month": month,
+        "monthly_revenue": Transaction.objects.filter(
+            payment_date__gte=month_start
+        ).aggregate(total=Sum("amount"))["total"] or 0,
+        "prev_month_users": EstateUser.objects.filter(
+            created_at__gte=prev_start, created_at__lt=month_start
+        ).count(),
+        "prev_month_properties": Property.objects.filter(
+            created_at__gte=prev_start, created_at__lt=month_start
+        ).count(),
+    }
+
+
+def reconcile():
+    """
+    Rebuild the snapshot row from scratch
+
+    Returns:
+        The refreshed DashboardStats instance
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        values = compute_stats()
+        stats, _created = DashboardStats.objects.update_or_create(
+            stats_id=SNAPSHOT_ID,
+            defaults={**values, "refreshed_at": now},
+        )
+    logger.info("✅ Dashboard stats snapshot reconciled")
+    return stats
+
+
+def apply_delta(old, new):
+    """
+    Apply ``new - old`` contributions to the snapshot (atomic F() update).
+    A missing or stale-month snapshot is rebuilt instead.
+    """
+    delta = {}
+    for key in set(old) | set(new):
+        change = new.get(key, 0) - old.get(key, 0)
+        if change:
+            delta[key] = F(key) + change
+    if not delta:
+        return
+
+    updated = DashboardStats.objects.filter(
+        stats_id=SNAPSHOT_ID, stats_month=_current_month()
+    ).update(updated_at=timezone.now(), **delta)
+    if not updated:
+        reconcile()
+
+
+def get_snapshot():
+    """
+    The admin dashboard snapshot (one row lookup).
+    Built on first use and rebuilt when the calendar month has changed.
+    """
+    stats = DashboardStats.objects.filter(stats_id=SNAPSHOT_ID).first()
+    if stats is None or stats.stats_month != _current_month():
+        stats = reconcile()
+    return stats
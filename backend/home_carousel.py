@@ -0,0 +1,205 @@
+"""
+Home Page Carousel Snapshot
+===========================
+The landing page used to load every ``PropertyImage`` (with its property),
+build a dict per image, ``json.dumps`` the whole list and stat six default
+images on every visit. It now renders a precomputed snapshot:
+
+- at most ``CAROUSEL_LIMIT`` slides, one per property, ranked Available
+  first, then Pending, then Sold, newest upload first within each group
+- a ``member`` variant (price and contact shown) and a ``guest`` variant
+  (hidden), each already serialised to JSON
+- the default/fallback slides resolved (``os.path.exists``) once, at build time
+
+Both variants live under one cache key, so a visit costs a single cache
+read. The signals in signals.py drop the key after any Property or
+PropertyImage change commits, and image_variants.py drops it when variants
+are generated (it writes with update(), which sends no signal). The next
+visit rebuilds it. ``HOME_CAROUSEL_CACHE_TIMEOUT`` bounds staleness in
+processes that do not share the cache (LocMem); with a shared cache backend
+invalidation reaches every process immediately.
+"""
+
+import json
+import logging
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, IntegerField, Value, When
+
+from .models import Property, PropertyImage
+
+logger = logging.getLogger(__name__)
+
+
+CACHE_KEY = "home_carousel:v1"
+CACHE_TIMEOUT = getattr(settings, "HOME_CAROUSEL_CACHE_TIMEOUT", 600)
+CAROUSEL_LIMIT = getattr(settings, "HOME_CAROUSEL_LIMIT", 24)
+
+# Shown when there are few property images (only files that exist in MEDIA_ROOT)
+DEFAULT_SLIDES = [
+    {'name': 'apartment.jpeg', 'title': 'Modern Apartment', 'location': 'Mumbai, Maharashtra', 'price': 5000000, 'type': 'Apartment'},
+    {'name': 'download.jpeg', 'title': 'Luxury Villa', 'location': 'Pune, Maharashtra', 'price': 8500000, 'type': 'Villa'},
+    {'name': 'download1.jpeg', 'title': 'Family Home', 'location': 'Delhi, Delhi', 'price': 4500000, 'type': 'House'},
+    {'name': 'shiva1.jpg', 'title': 'Commercial Space', 'location': 'Bangalore, Karnataka', 'price': 7500000, 'type': 'Commercial'},
+    {'name': 'shiva2.jpg', 'title': 'Studio Apartment', 'location': 'Chennai, Tamil Nadu', 'price': 2500000, 'type': 'Studio'},
+    {'name': 'shiva3.jpg', 'title': 'Penthouse', 'location': 'Hyderabad, Telangana', 'price': 12000000, 'type': 'Penthouse'},
+]
+
+# Fields hidden from visitors who are not logged in
+GUEST_OVERRIDES = {
+    'price': 0,
+    'contact': 'Login to view contact',
+    'is_logged_in': False,
+    'show_sensitive_info': False,
+}
+
+
+# ===========================
+# Building
+# ===========================
+
+def _ranked_images(limit):
+    """Newest image of the best-ranked properties, at most ``limit`` of them"""
+    status_rank = Case(
+        When(property__status=Property.STATUS_AVAILABLE, then=Value(0)),
+        When(property__status=Property.STATUS_PENDING, then=Value(1)),
+        default=Value(2),
+        output_field=IntegerField(),
+    )
+    images = (
+        PropertyImage.objects.filter(property__isnull=False).exclude(image_url="")
+        .select_related('property')
+        .annotate(status_rank=status_rank)
+        .order_by('status_rank', '-uploaded_at', '-image_id')
+    )
+    picked = []
+    seen = set()
+    for image in images.iterator(chunk_size=limit * 4):
+        if image.property_id in seen:
+            continue
+        seen.add(image.property_id)
+        picked.append(image)
+        if len(picked) >= limit:
+            break
+    return picked
+
+
+def _property_slide(image):
+    prop = image.property
+    full_url = image.variant_url('large')
+    webp_url = image.variant_url('large', 'webp')
+    return {
+        'image_url': full_url,
+        'image_webp_url': webp_url if webp_url != image.original_url() else '',
+        'title': prop.title,
+        'description': prop.description,
+        'location': prop.location,
+        'city': prop.city,
+        'state': prop.state,
+        'price': float(prop.price) if prop.price else 0,
+        'property_type': prop.property_type,
+        'bedrooms': prop.bedrooms,
+        'bathrooms': prop.bathrooms,
+        'area_sqft': float(prop.area_sqft) if prop.area_sqft else 0,
+        'status': prop.status,
+        'contact': prop.contact,
+        'is_logged_in': True,
+        'show_sensitive_info': True,
+    }
+
+
+def _default_slides(taken_urls, room):
+    slides = []
+    for default_img in DEFAULT_SLIDES:
+        if len(slides) >= room:
+            break
+        default_url = settings.MEDIA_URL + default_img['name']
+        if default_url in taken_urls or not os.path.exists(os.path.join(settings.MEDIA_ROOT, default_img['name'])):
+            continue
+        location = default_img['location']
+        slides.append({
+            'image_url': default_url,
+            'image_webp_url': '',
+            'title': default_img['title'],
+            'description': f"Beautiful {default_img['type'].lower()} with modern amenities and excellent location.",
+            'location': location,
+            'city': location.split(',')[0].strip(),
+            'state': location.split(',')[1].strip() if ',' in location else '',
+            'price': default_img['price'],
+            'property_type': default_img['type'],
+            'bedrooms': 2,
+            'bathrooms': 2,
+            'area_sqft': 1200,
+            'status': 'Available',
+            'contact': '+91-9876543210',
+            'is_logged_in': True,
+            'show_sensitive_info': True,
+        })
+    return slides
+
+
+def _fallback_slide():
+    return {
+        'image_url': settings.MEDIA_URL + 'estatelogo.png',
+        'image_webp_url': '',
+        'title': 'Estate Management System',
+        'description': 'Welcome to our AI-powered estate management platform',
+        'location': 'All Cities, India',
+        'city': 'All Cities',
+        'state': 'India',
+        'price': 0,
+        'property_type': 'Platform',
+        'bedrooms': 0,
+        'bathrooms': 0,
+        'area_sqft': 0,
+        'status': 'Active',
+        'contact': 'support@estate.com',
+        'is_logged_in': True,
+        'show_sensitive_info': True,
+    }
+
+
+def _variant(slides):
+    return {
+        "carousel_data_json": json.dumps(slides),
+        "image_urls_json": json.dumps([slide['image_url'] for slide in slides]),
+    }
+
+
+def build_snapshot(limit=CAROUSEL_LIMIT):
+    """
+    Rank and render the carousel for both audiences
+
+    Returns:
+        {"member": {...}, "guest": {...}}, each with ``carousel_data_json``
+        and ``image_urls_json`` ready to drop into the template
+    """
+    slides = [_property_slide(image) for image in _ranked_images(limit)]
+    slides += _default_slides({slide['image_url'] for slide in slides}, limit - len(slides))
+    if not slides:
+        slides = [_fallback_slide()]
+
+    guest_slides = [{**slide, **GUEST_OVERRIDES} for slide in slides]
+    return {"member": _variant(slides), "guest": _variant(guest_slides)}
+
+
+# ===========================
+# Cache Access
+# ===========================
+
+def get_carousel(is_logged_in):
+    """Carousel JSON for one audience: one cache read, rebuilt on a miss"""
+    snapshot = cache.get(CACHE_KEY)
+    if snapshot is None:
+        snapshot = build_snapshot()
+        cache.set(CACHE_KEY, snapshot, CACHE_TIMEOUT)
+        logger.info("✅ Home carousel snapshot rebuilt")
+    return snapshot["member" if is_logged_in else "guest"]
+
+
+def invalidate():
+    """Drop the snapshot once the current transaction commits"""
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
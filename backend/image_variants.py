@@ -0,0 +1,192 @@
+"""
+Responsive Image Variants for Property Images
+=============================================
+Cards and the home carousel used to load the original upload (up to 5MB)
+for every slot. Each uploaded ``PropertyImage`` now gets fixed-size copies:
+
+- ``thumb`` 320x240 and ``card`` 640x480, center-cropped (listing cards)
+- ``large`` at most 1600x1200, aspect ratio kept (carousel, detail views)
+
+each as progressive JPEG and WebP, stored under ``MEDIA_ROOT/variants/``.
+Paths are recorded in ``PropertyImage.variants``; the model's
+``variant_url()`` / ``srcset()`` helpers fall back to the original until the
+variants exist.
+
+Generation runs on the background job queue (task ``images.generate_variants``,
+queued by the post_save signal in signals.py), so uploads return as soon as
+the original is stored; the cached home carousel is dropped once they exist.
+Rows sharing a content-addressed file (media_store.py)
+share its variants; unreferenced variant files are reclaimed by gc_media. ``python manage.py generate_image_variants``
+backfills images uploaded before the pipeline existed.
+"""
+
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from . import home_carousel
+from .models import PropertyImage
+
+logger = logging.getLogger(__name__)
+
+
+VARIANT_DIR = "variants"
+
+# name -> (max width, max height, crop to exact size)
+VARIANT_SIZES = {
+    "thumb": (320, 240, True),
+    "card": (640, 480, True),
+    "large": (1600, 1200, False),
+}
+
+JPEG_QUALITY = 82
+WEBP_QUALITY = 80
+
+
+def media_url(path):
+    """Stored image path -> public URL (absolute URLs and /media/ paths pass through)"""
+    if not path:
+        return ""
+    if path.startswith("http") or path.startswith(settings.MEDIA_URL):
+        return path
+    return settings.MEDIA_URL + path
+
+
+def storage_path(image_url):
+    """Stored image path -> default_storage name (None for external URLs)"""
+    if not image_url or image_url.startswith("http"):
+        return None
+    if image_url.startswith(settings.MEDIA_URL):
+        return image_url[len(settings.MEDIA_URL):]
+    return image_url
+
+
+# ===========================
+# Rendering
+# ===========================
+
+def _load(name):
+    with default_storage.open(name, "rb") as f:
+        image = Image.open(f)
+        # Let the JPEG decoder downscale while decoding (much cheaper for large photos)
+        largest = max(width for width, _height, _crop in VARIANT_SIZES.values())
+        image.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+    return image
+
+
+def _resize(image, width, height, crop):
+    if crop:
+        return ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+    resized = image.copy()
+    resized.thumbnail((width, height), Image.Resampling.LANCZOS)  # never upscales
+    return resized
+
+
+def _encode(image, fmt):
+    buffer = io.BytesIO()
+    if fmt == "jpeg":
+        if image.mode == "RGBA":
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        image.save(buffer, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        image.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def generate_variants(image_id):
+    """
+    Build every variant of one PropertyImage and record their paths
+
+    Returns:
+        The variants mapping, or None if the image is gone or external
+    """
+    image_row = PropertyImage.objects.filter(image_id=image_id).first()
+    if image_row is None:
+        return None
+    source = storage_path(image_row.image_url)
+    if source is None:
+        return None
+
+    stem = os.path.splitext(os.path.basename(source))[0]
+    variants = _existing_variants(image_row.image_url, stem)
+    if variants is None:
+        original = _load(source)
+        variants = {"source": image_row.image_url}
+        for size, (width, height, crop) in VARIANT_SIZES.items():
+            resized = _resize(original, width, height, crop)
+            entry = {"width": resized.width, "height": resized.height}
+            for fmt, ext in (("jpeg", "jpg"), ("webp", "webp")):
+                name = f"{VARIANT_DIR}/{stem}_{size}.{ext}"
+                if default_storage.exists(name):
+                    default_storage.delete(name)
+                entry[fmt] = default_storage.save(name, ContentFile(_encode(resized, fmt)))
+            variants[size] = entry
+
+    # update() so the post_save signal does not queue the image again.
+    # Files left behind by a delete or re-point meanwhile are reclaimed by gc_media.
+    updated = PropertyImage.objects.filter(
+        image_id=image_id, image_url=image_row.image_url
+    ).update(variants=variants)
+    if not updated:
+        return None
+    home_carousel.invalidate()
+
+    logger.info(f"✅ Image variants generated for image #{image_id}")
+    return variants
+
+
+def _existing_variants(image_url, stem):
+    """
+    Variants another row already rendered from the same content-addressed
+    file (identical content, so the files can be shared), or None
+    """
+    from .media_store import blob_hash
+    if blob_hash(image_url) is None:
+        return None
+    sibling = (
+        PropertyImage.objects.filter(image_url=image_url, variants__source=image_url)
+        .values_list("variants", flat=True).first()
+    )
+    if sibling and all(default_storage.exists(sibling[size][fmt]) for size in VARIANT_SIZES for fmt in ("jpeg", "webp")):
+        return sibling
+    return None
+
+
+def needs_variants(image):
+    """True if the image is stored locally and its variants are missing or stale"""
+    return storage_path(image.image_url) is not None and (image.variants or {}).get("source") != image.image_url
+
+
+# ===========================
+# Payload Helpers
+# ===========================
+
+def first_image(prop):
+    """First image of a property (uses prefetched images when available)"""
+    images = sorted(prop.images.all(), key=lambda image: image.image_id)
+    return images[0] if images else None
+
+
+def card_image_payload(image, default=""):
+    """
+    Image fields for property card JSON: the 640px card variant plus
+    ``srcset`` values the client can use for 320px/640px slots
+    """
+    if image is None:
+        return {"image_url": default, "image_srcset": "", "image_webp_srcset": ""}
+    return {
+        "image_url": image.card_url(),
+        "image_srcset": image.card_srcset(),
+        "image_webp_srcset": image.card_webp_srcset(),
+    }
@@ -0,0 +1,409 @@
+"""
+Durable Background Job Queue for Estate Management System
+=========================================================
+Request handlers do their transactional writes and hand the slow side
+effects (notifications, emails, file processing) to this queue instead of
+running them inline. No broker is needed: jobs are rows in the
+``background_jobs`` table.
+
+    from . import jobs
+    jobs.enqueue_on_commit("notifications.ticket_resolved", ticket.ticket_id)
+
+- ``enqueue_on_commit`` inserts the job inside the current transaction, so
+  the job exists if and only if the request's writes committed. Workers are
+  woken once the transaction commits.
+- Tasks are plain functions registered with ``@jobs.task("name")`` (see
+  tasks.py). Arguments must be JSON-serialisable: pass ids, not objects.
+- Workers claim a job with a conditional ``UPDATE ... WHERE status='queued'``,
+  so any number of worker threads and ``run_jobs`` processes can share the
+  table. Each job runs in its own transaction.
+- A failing job is retried with exponential backoff and jitter until
+  ``max_attempts``, then marked failed with its last error. Jobs left
+  ``running`` by a killed worker are re-queued after ``JOBS_LOCK_TIMEOUT``.
+- ``job_stats()`` reports queue depth and latency (admin API and
+  ``python manage.py run_jobs --stats``).
+
+In production run ``python manage.py run_jobs --threads 4`` next to the web
+server; without it jobs stay queued. With ``JOBS_EMBEDDED_WORKER = True``
+(the default only when DEBUG is on) each web process also starts a single
+worker thread on its first enqueue, so development works without run_jobs.
+"""
+
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+from .models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+
+EMBEDDED_WORKER = getattr(settings, "JOBS_EMBEDDED_WORKER", settings.DEBUG)
+POLL_INTERVAL = getattr(settings, "JOBS_POLL_INTERVAL", 1.0)  # seconds
+LOCK_TIMEOUT = getattr(settings, "JOBS_LOCK_TIMEOUT", 300)  # seconds
+RETRY_BASE_DELAY = getattr(settings, "JOBS_RETRY_BASE_DELAY", 5)  # seconds
+RETRY_MAX_DELAY = getattr(settings, "JOBS_RETRY_MAX_DELAY", 3600)  # seconds
+DEFAULT_MAX_ATTEMPTS = getattr(settings, "JOBS_MAX_ATTEMPTS", 5)
+RETENTION_DAYS = getattr(settings, "JOBS_RETENTION_DAYS", 7)
+
+_registry = {}
+_current = threading.local()
+
+
+# ===========================
+# Task Registry
+# ===========================
+
+def task(name, max_attempts=None):
+    """
+    Register a function as a job task
+
+    Args:
+        name: Name used by enqueue() (stored in the job row)
+        max_attempts: Attempts before the job is marked failed
+    """
+    def decorator(func):
+        func.task_name = name
+        func.max_attempts = max_attempts or DEFAULT_MAX_ATTEMPTS
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def _load_tasks():
+    # Registration happens on import of tasks.py
+    from . import tasks  # noqa: F401
+
+
+def get_task(name):
+    if name not in _registry:
+        _load_tasks()
+    return _registry[name]
+
+
+# ===========================
+# Enqueueing
+# ===========================
+
+def enqueue(name, *args, delay=None, **kwargs):
+    """
+    Insert a job row (in the caller's transaction, if any)
+
+    Args:
+        name: Registered task name
+        delay: Optional seconds to wait before the first attempt
+
+    Returns:
+        The BackgroundJob instance
+    """
+    func = get_task(name)
+    now = timezone.now()
+    return BackgroundJob.objects.create(
+        task=name,
+        payload={"args": list(args), "kwargs": kwargs},
+        max_attempts=func.max_attempts,
+        run_at=now + timedelta(seconds=delay) if delay else now,
+        created_at=now,
+    )
+
+
+def enqueue_on_commit(name, *args, **kwargs):
+    """
+    Queue a job that only becomes visible if the current transaction commits.
+    Local workers are woken right after the commit.
+
+    Returns:
+        The BackgroundJob instance
+    """
+    job = enqueue(name, *args, **kwargs)
+    transaction.on_commit(_wake_workers)
+    return job
+
+
+# ===========================
+# Claiming & Running
+# ===========================
+
+def _backoff(attempts):
+    """Seconds to wait before retry number ``attempts`` (1-based), with jitter"""
+    delay = min(RETRY_BASE_DELAY * (2 ** (attempts - 1)), RETRY_MAX_DELAY)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def requeue_stale():
+    """
+    Put jobs whose worker died mid-run back in the queue (or fail them when
+    out of attempts)
+
+    Returns:
+        Number of jobs recovered
+    """
+    cutoff = timezone.now() - timedelta(seconds=LOCK_TIMEOUT)
+    stale = BackgroundJob.objects.filter(status=BackgroundJob.STATUS_RUNNING, started_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=BackgroundJob.STATUS_FAILED,
+        finished_at=timezone.now(),
+        last_error="Worker lost while running the job",
+        locked_by="",
+    )
+    requeued = stale.update(status=BackgroundJob.STATUS_QUEUED, locked_by="")
+    if failed or requeued:
+        logger.warning(f"⚠️ Recovered stale jobs: {requeued} re-queued, {failed} failed")
+    return failed + requeued
+
+
+def claim(worker_id, limit=10):
+    """
+    Claim up to ``limit`` due jobs for ``worker_id``
+
+    Returns:
+        List of BackgroundJob instances now marked running
+    """
+    now = timezone.now()
+    candidates = list(
+        BackgroundJob.objects.filter(status=BackgroundJob.STATUS_QUEUED, run_at__lte=now)
+        .order_by("run_at", "job_id")
+        .values_list("job_id", flat=True)[:limit]
+    )
+    claimed = []
+    for job_id in candidates:
+        # Only one worker's UPDATE can move the row out of 'queued'
+        won = BackgroundJob.objects.filter(job_id=job_id, status=BackgroundJob.STATUS_QUEUED).update(
+            status=BackgroundJob.STATUS_RUNNING,
+            attempts=F("attempts") + 1,
+            started_at=now,
+            locked_by=worker_id,
+        )
+        if won:
+            claimed.append(job_id)
+    return list(BackgroundJob.objects.filter(job_id__in=claimed).order_by("run_at", "job_id"))
+
+
+def run_job(job):
+    """
+    Execute a claimed job and record the outcome
+
+    Returns:
+        True if the job succeeded
+    """
+    _current.job = job
+    try:
+        func = get_task(job.task)
+        with transaction.atomic():
+            func(*job.payload.get("args", []), **job.payload.get("kwargs", {}))
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=5)}"
+        if job.attempts >= job.max_attempts:
+            BackgroundJob.objects.filter(job_id=job.job_id).update(
+                status=BackgroundJob.STATUS_FAILED,
+                finished_at=timezone.now(),
+                last_error=error,
+                locked_by="",
+            )
+            logger.error(f"❌ Job #{job.job_id} {job.task} failed permanently after {job.attempts} attempts: {str(e)}")
+        else:
+            delay = _backoff(job.attempts)
+            BackgroundJob.objects.filter(job_id=job.job_id).update(
+                status=BackgroundJob.STATUS_QUEUED,
+                run_at=timezone.now() + timedelta(seconds=delay),
+                last_error=error,
+                locked_by="",
+            )
+            logger.warning(f"⚠️ Job #{job.job_id} {job.task} failed (attempt {job.attempts}), retrying in {delay:.0f}s: {str(e)}")
+        return False
+    finally:
+        _current.job = None
+
+    BackgroundJob.objects.filter(job_id=job.job_id).update(
+        status=BackgroundJob.STATUS_DONE,
+        finished_at=timezone.now(),
+        locked_by="",
+    )
+    return True
+
+
+def current_job():
+    """The job running in this thread, or None (e.g. to skip further offloading)"""
+    return getattr(_current, "job", None)
+
+
+def run_pending(worker_id=None, limit=100):
+    """
+    Run due jobs in the calling thread until none are left or ``limit`` ran
+
+    Returns:
+        Number of jobs run
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:inline"
+    ran = 0
+    while ran < limit:
+        batch = claim(worker_id, limit=min(10, limit - ran))
+        if not batch:
+            break
+        for job in batch:
+            run_job(job)
+            ran += 1
+    return ran
+
+
+def purge_finished(days=RETENTION_DAYS):
+    """Delete done jobs older than ``days`` (failed jobs are kept for inspection)"""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = BackgroundJob.objects.filter(status=BackgroundJob.STATUS_DONE, finished_at__lt=cutoff).delete()
+    return deleted
+
+
+# ===========================
+# Worker
+# ===========================
+
+class JobWorker:
+    """N threads polling the job table; woken early by enqueue_on_commit"""
+
+    def __init__(self, threads=1, poll_interval=POLL_INTERVAL, name="worker"):
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.name = name
+        self.pid = os.getpid()
+        self.wakeup = threading.Event()
+        self.stopping = False
+        self.workers = []
+        self.last_maintenance = 0.0
+
+    def worker_id(self, index):
+        return f"{socket.gethostname()}:{self.pid}:{self.name}-{index}"
+
+    def start(self):
+        for index in range(self.threads):
+            thread = threading.Thread(target=self._run, args=(index,), name=f"jobs-{self.name}-{index}", daemon=True)
+            thread.start()
+            self.workers.append(thread)
+
+    def _maintenance(self):
+        # One thread per process re-queues stale jobs and purges old ones, at most once a minute
+        now = time.monotonic()
+        if now - self.last_maintenance < 60:
+            return
+        self.last_maintenance = now
+        requeue_stale()
+        purge_finished()
+
+    def _run(self, index):
+        worker_id = self.worker_id(index)
+        while not self.stopping:
+            try:
+                close_old_connections()
+                if index == 0:
+                    self._maintenance()
+                batch = claim(worker_id, limit=1)
+                if batch:
+                    run_job(batch[0])
+                    continue
+            except Exception as e:
+                logger.error(f"❌ Job worker {worker_id} error: {str(e)}")
+            self.wakeup.wait(self.poll_interval)
+            self.wakeup.clear()
+        connection.close()
+
+    def stop(self, timeout=30):
+        """Let running jobs finish, then return"""
+        self.stopping = True
+        self.wakeup.set()
+        deadline = time.monotonic() + timeout
+        for thread in self.workers:
+            thread.join(timeout=max(0, deadline - time.monotonic()))
+
+
+_workers = []
+_embedded = None
+_embedded_lock = threading.Lock()
+
+
+def register_worker(worker):
+    """Let enqueue_on_commit wake this process's worker (used by run_jobs)"""
+    _workers.append(worker)
+
+
+def _wake_workers():
+    global _embedded
+    if EMBEDDED_WORKER and (_embedded is None or _embedded.pid != os.getpid()):
+        with _embedded_lock:
+            if _embedded is None or _embedded.pid != os.getpid():
+                worker = JobWorker(threads=1, name="embedded")
+                worker.start()
+                _embedded = worker
+                register_worker(worker)
+    for worker in _workers:
+        if worker.pid == os.getpid():
+            worker.wakeup.set()
+
+
+# ===========================
+# Visibility
+# ===========================
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def job_stats(window=1000):
+    """
+    Queue depth and latency
+
+    Args:
+        window: Number of most recently finished jobs to compute latencies over
+
+    Returns:
+        Dict with counts per status, oldest queued job age and p50/p95/max of
+        queue latency (run_at -> started) and run time (started -> finished),
+        all in seconds
+    """
+    now = timezone.now()
+    counts = dict(
+        BackgroundJob.objects.order_by().values_list("status").annotate(total=Count("job_id"))
+    )
+    oldest = BackgroundJob.objects.filter(
+        status=BackgroundJob.STATUS_QUEUED, run_at__lte=now
+    ).aggregate(oldest=Min("run_at"))["oldest"]
+
+    recent = (
+        BackgroundJob.objects.filter(status=BackgroundJob.STATUS_DONE)
+        .order_by("-finished_at")
+        .values_list("task", "run_at", "started_at", "finished_at")[:window]
+    )
+    waits, runs, per_task = [], [], {}
+    for name, run_at, started_at, finished_at in recent:
+        wait = max((started_at - run_at).total_seconds(), 0.0)
+        run = (finished_at - started_at).total_seconds()
+        waits.append(wait)
+        runs.append(run)
+        per_task.setdefault(name, []).append(wait)
+
+    def summary(values):
+        return {
+            "p50": _percentile(values, 0.50),
+            "p95": _percentile(values, 0.95),
+            "max": max(values) if values else None,
+        }
+
+    return {
+        "counts": {status: counts.get(status, 0) for status, _label in BackgroundJob.STATUS_CHOICES},
+        "oldest_queued_seconds": (now - oldest).total_seconds() if oldest else 0.0,
+        "queue_latency": summary(waits),
+        "run_time": summary(runs),
+        "queue_latency_by_task": {name: summary(values) for name, values in sorted(per_task.items())},
+        "sample_size": len(waits),
+    }
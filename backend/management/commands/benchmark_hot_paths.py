@@ -0,0 +1,143 @@
+"""
+Django Management Command: Benchmark hot paths on synthetic datasets
+Usage: python manage.py benchmark_hot_paths [--scales 1k,100k,1m] [--iterations 30] [--warmup 2]
+                                            [--seed 42] [--output FILE] [--compare FILE]
+                                            [--target NAME ...] [--no-seed] [--keep]
+
+For each scale: deletes earlier synthetic data, seeds a fresh dataset
+(backend/synthetic_data.py), then times the pages and APIs in
+backend/benchmarks.py TARGETS and records latency percentiles and queries
+per request. Results are written as JSON (``--output``); pass a previous
+file as ``--compare`` to print the change in p95 latency and queries.
+
+Runs against the configured database: point it at a scratch copy.
+"""
+
+import datetime
+import json
+import os
+import platform
+import subprocess
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from backend import activity_log, benchmarks, property_views, synthetic_data
+
+
+class Command(BaseCommand):
+    help = 'Time hot pages/APIs (latency percentiles, query counts) at several dataset scales'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', default='1k', help='Comma-separated scales (1k, 100k, 1m or property counts)')
+        parser.add_argument('--iterations', type=int, default=30, help='Timed requests per target')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per target first')
+        parser.add_argument('--seed', type=int, default=synthetic_data.DEFAULT_SEED, help='Dataset random seed')
+        parser.add_argument('--output', default=None,
+                            help='JSON results file (default: benchmark-<timestamp>.json)')
+        parser.add_argument('--compare', default=None, help='Previous results file to compare against')
+        parser.add_argument('--target', action='append', help='Only this target (repeatable)')
+        parser.add_argument('--no-seed', action='store_true',
+                            help='Benchmark the synthetic data already in the database (single scale)')
+        parser.add_argument('--keep', action='store_true', help='Keep the last synthetic dataset afterwards')
+
+    def handle(self, *args, **options):
+        scales = [scale.strip().lower() for scale in options['scales'].split(',') if scale.strip()]
+        for scale in scales:
+            if scale not in synthetic_data.SCALES and not scale.isdigit():
+                raise CommandError(f'Unknown scale "{scale}"')
+        targets = benchmarks.TARGETS
+        if options['target']:
+            targets = [target for target in targets if target.name in options['target']]
+            if not targets:
+                raise CommandError(f'No such target; choose from {", ".join(t.name for t in benchmarks.TARGETS)}')
+
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as handle:
+                baseline = json.load(handle)
+
+        report = {
+            'generated_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'git_commit': self._git_commit(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'debug': settings.DEBUG,
+            'seed': options['seed'],
+            'iterations': options['iterations'],
+            'warmup': options['warmup'],
+            'scales': {},
+        }
+
+        try:
+            for scale in (scales[:1] if options['no_seed'] else scales):
+                report['scales'][scale] = self._bench_scale(scale, targets, options)
+        finally:
+            if not options['keep'] and not options['no_seed']:
+                self._drain()
+                synthetic_data.purge()
+                synthetic_data.rebuild_derived_tables()
+
+        output = options['output'] or f'benchmark-{datetime.datetime.now():%Y%m%d-%H%M%S}.json'
+        with open(output, 'w') as handle:
+            json.dump(report, handle, indent=2, default=str)
+
+        self._print(report, baseline)
+        self.stdout.write(self.style.SUCCESS(f'✅ Results written to {os.path.abspath(output)}'))
+
+    def _bench_scale(self, scale, targets, options):
+        result = {}
+        if not options['no_seed']:
+            self.stdout.write(f'Seeding scale {scale}...')
+            synthetic_data.purge()
+            started = time.perf_counter()
+            result['rows'] = synthetic_data.seed(scale, seed=options['seed'])
+            result['seed_seconds'] = round(time.perf_counter() - started, 2)
+
+        users = synthetic_data.sample_users()
+        if not users:
+            raise CommandError('No synthetic users found; run without --no-seed or use seed_synthetic first')
+        self.stdout.write(f'Benchmarking scale {scale} ({options["iterations"]} requests per target)...')
+        result['targets'] = benchmarks.run(users, options['iterations'], options['warmup'], targets)
+        self._drain()
+        return result
+
+    def _drain(self):
+        # Write what the requests buffered now, so the background writers
+        # do not compete with the purge for the database (SQLite locks)
+        activity_log.flush()
+        property_views.flush()
+
+    def _print(self, report, baseline):
+        for scale, result in report['scales'].items():
+            self.stdout.write(f'\nscale {scale}')
+            self.stdout.write(
+                f"  {'target':<24} {'status':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8}"
+                + (f" {'Δp95 ms':>9} {'Δqueries':>9}" if baseline else '')
+            )
+            previous = (baseline or {}).get('scales', {}).get(scale, {}).get('targets', {})
+            for name, row in result['targets'].items():
+                line = (
+                    f"  {name:<24} {row['status']:>6} {row['latency_ms']['p50']:>9.1f} "
+                    f"{row['latency_ms']['p95']:>9.1f} {row['latency_ms']['p99']:>9.1f} {row['queries']['median']:>8}"
+                )
+                if baseline:
+                    before = previous.get(name)
+                    if before:
+                        line += (
+                            f" {row['latency_ms']['p95'] - before['latency_ms']['p95']:>+9.1f}"
+                            f" {row['queries']['median'] - before['queries']['median']:>+9}"
+                        )
+                    else:
+                        line += f" {'new':>9} {'':>9}"
+                self.stdout.write(line)
+
+    def _git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, timeout=5,
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
@@ -0,0 +1,109 @@
+"""
+Django Management Command: Benchmark login password verification
+Usage: python manage.py benchmark_password_hashing [--iterations 260000,600000,1000000]
+                                                   [--duration 3] [--clients 16] [--pool-size N] [--json]
+
+For each PBKDF2 iteration count, measures one verification on this thread
+and logins per second through the bounded pool (backend/passwords.py) with
+``--clients`` concurrent callers, including how many were turned away as
+busy. Use it to pick a hasher cost and PASSWORD_POOL_SIZE for the login peak.
+"""
+
+import json
+import statistics
+import threading
+import time
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.management.base import BaseCommand
+from backend import passwords
+
+
+BENCH_PASSWORD = "benchmark-password-123"
+
+
+class Command(BaseCommand):
+    help = 'Measure password verification latency and logins/sec per hasher cost'
+
+    def add_arguments(self, parser):
+        default = PBKDF2PasswordHasher.iterations
+        parser.add_argument('--iterations', default=f'100000,260000,600000,{default}',
+                            help=f'Comma-separated PBKDF2 iteration counts (Django default: {default})')
+        parser.add_argument('--duration', type=float, default=3.0, help='Seconds of load per cost')
+        parser.add_argument('--clients', type=int, default=16, help='Concurrent login threads')
+        parser.add_argument('--pool-size', type=int, default=None, help='Override PASSWORD_POOL_SIZE')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        if options['pool_size'] is not None:
+            passwords.shutdown()
+            passwords.POOL_SIZE = options['pool_size']
+
+        results = []
+        try:
+            for iterations in [int(value) for value in options['iterations'].split(',') if value.strip()]:
+                results.append(self._bench(iterations, options['duration'], max(1, options['clients'])))
+        finally:
+            passwords.shutdown()
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(
+            f"pool size {passwords.POOL_SIZE}, max pending {passwords.MAX_PENDING}, {options['clients']} clients\n"
+            f"{'iterations':>12} {'verify ms':>10} {'logins/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'busy':>6}"
+        )
+        for row in results:
+            self.stdout.write(
+                f"{row['iterations']:>12} {row['single_verify_ms']:>10.1f} {row['logins_per_second']:>10.1f} "
+                f"{row['latency_p50_ms']:>9.1f} {row['latency_p95_ms']:>9.1f} {row['busy']:>6}"
+            )
+
+    def _bench(self, iterations, duration, clients):
+        hasher = PBKDF2PasswordHasher()
+        encoded = hasher.encode(BENCH_PASSWORD, hasher.salt(), iterations=iterations)
+
+        started = time.perf_counter()
+        passwords._verify(BENCH_PASSWORD, encoded, rehash=False)
+        single_ms = (time.perf_counter() - started) * 1000
+
+        # Warm the pool so process start-up is not counted
+        passwords.verify_password(BENCH_PASSWORD, encoded, rehash=False)
+
+        latencies = []
+        busy = [0]
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+
+        def client():
+            while time.perf_counter() < deadline:
+                began = time.perf_counter()
+                try:
+                    passwords.verify_password(BENCH_PASSWORD, encoded, rehash=False)
+                except passwords.PasswordPoolBusy:
+                    with lock:
+                        busy[0] += 1
+                    time.sleep(0.01)
+                    continue
+                with lock:
+                    latencies.append((time.perf_counter() - began) * 1000)
+
+        threads = [threading.Thread(target=client, daemon=True) for _ in range(clients)]
+        began = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+
+        latencies.sort()
+        return {
+            'iterations': iterations,
+            'single_verify_ms': round(single_ms, 2),
+            'logins_per_second': round(len(latencies) / elapsed, 2),
+            'latency_p50_ms': round(statistics.median(latencies), 2) if latencies else 0,
+            'latency_p95_ms': round(latencies[int(len(latencies) * 0.95) - 1], 2) if latencies else 0,
+            'completed': len(latencies),
+            'busy': busy[0],
+        }
@@ -0,0 +1,127 @@
+"""
+Django Management Command: Check per-endpoint SQL query budgets
+Usage: python manage.py check_query_budgets [--sizes 5,25] [--only NAME ...] [--duplicates] [--json FILE] [--keepdb]
+
+Requests every named URL in backend/urls.py as its role at two fixture
+sizes (backend/query_budgets.py) and fails (exit status 1) when an
+endpoint's query count grows with the data or exceeds its budget.
+``--duplicates`` lists queries that ran more than once per request.
+
+Runs against a test database created for the run, like ``manage.py test``
+(DATABASES['default']['TEST'] applies, a temporary file for SQLite by
+default; ``--keepdb`` reuses it between runs), so the configured database
+is never touched.
+"""
+
+import json
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from backend import activity_log, property_views, query_budgets, synthetic_data
+
+
+class Command(BaseCommand):
+    help = 'Fail if any endpoint runs a data-dependent number of queries or exceeds its query budget'
+
+    def add_arguments(self, parser):
+        default = ','.join(str(size) for size in query_budgets.DEFAULT_SIZES)
+        parser.add_argument('--sizes', default=default, help=f'Two fixture sizes (default: {default})')
+        parser.add_argument('--only', action='append', help='Only this URL name (repeatable)')
+        parser.add_argument('--duplicates', action='store_true', help='Show repeated query signatures')
+        parser.add_argument('--json', default=None, help='Also write the results to this JSON file')
+        parser.add_argument('--keepdb', action='store_true', help='Keep the test database between runs')
+
+    def handle(self, *args, **options):
+        try:
+            small_size, large_size = sorted(int(size) for size in options['sizes'].split(','))
+        except ValueError:
+            raise CommandError('--sizes takes two integers, e.g. 5,25')
+        if small_size == large_size:
+            raise CommandError('--sizes must differ')
+
+        test_settings = connection.settings_dict['TEST']
+        if connection.vendor == 'sqlite' and not test_settings.get('NAME'):
+            # The background log/view writers use their own connections, and
+            # an in-memory test database locks whole tables between them
+            test_settings['NAME'] = os.path.join(tempfile.gettempdir(), 'estate_query_budgets.sqlite3')
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False, keepdb=options['keepdb'])
+        try:
+            small = self._run_size(small_size, options['only'])
+            large = self._run_size(large_size, options['only'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        failures = 0
+        report = {}
+        self.stdout.write(f"{'endpoint':<36} {'role':<7} {'status':>6} {small_size:>6} {large_size:>6} {'budget':>7}")
+        for name, large_result in large.items():
+            small_result = small.get(name)
+            if small_result is None:
+                continue
+            role = large_result['role']
+            budget = query_budgets.BUDGETS.get(name, query_budgets.DEFAULT_BUDGET)
+            problems = query_budgets.evaluate(small_result['measured'], large_result['measured'], budget)
+            status, count, signatures = large_result['measured']
+            duplicates = {sql: n for sql, n in signatures.most_common() if n > 1}
+
+            line = f"{name:<36} {role or 'anon':<7} {status:>6} {small_result['measured'][1]:>6} {count:>6} {budget:>7}"
+            if problems and name in query_budgets.KNOWN_GROWTH:
+                self.stdout.write(self.style.WARNING(
+                    f"{line}  ⚠️ known: {query_budgets.KNOWN_GROWTH[name]} ({'; '.join(problems)})"
+                ))
+            elif problems:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f"{line}  ❌ {'; '.join(problems)}"))
+            else:
+                self.stdout.write(line)
+            if options['duplicates'] or problems:
+                for sql, n in duplicates.items():
+                    self.stdout.write(f"      {n}x {sql[:160]}")
+
+            report[name] = {
+                'url': large_result['url'], 'role': role, 'status': status, 'budget': budget,
+                'queries': {str(small_size): small_result['measured'][1], str(large_size): count},
+                'duplicates': duplicates, 'problems': problems,
+            }
+
+        if options['json']:
+            with open(options['json'], 'w') as handle:
+                json.dump({'sizes': [small_size, large_size], 'endpoints': report}, handle, indent=2)
+
+        skipped = ', '.join(sorted(query_budgets.SKIP))
+        self.stdout.write(f'Skipped: {skipped}')
+        if failures:
+            raise CommandError(f'{failures} endpoint(s) over budget or growing with data')
+        self.stdout.write(self.style.SUCCESS(f'✅ {len(report)} endpoints within their query budgets'))
+
+    def _run_size(self, size, only):
+        self._drain()
+        synthetic_data.purge()
+        fixtures = query_budgets.seed_fixtures(size)
+        results = {}
+        try:
+            for endpoint in query_budgets.endpoints(fixtures):
+                if only and endpoint.name not in only:
+                    continue
+                results[endpoint.name] = {
+                    'role': endpoint.role, 'url': endpoint.url,
+                    'measured': query_budgets.measure(endpoint, fixtures['users']),
+                }
+        finally:
+            self._drain()
+            synthetic_data.purge()
+            synthetic_data.rebuild_derived_tables()
+        return results
+
+    def _drain(self):
+        # Write buffered log rows/views now so the background writers do not
+        # compete with fixture setup and cleanup for the database
+        activity_log.flush()
+        property_views.flush()
@@ -0,0 +1,21 @@
+"""
+Django Management Command: Replay activity log events left on disk
+Usage: python manage.py flush_activity_log
+
+Inserts spill files from failed flushes and journals of processes that
+exited without flushing (see backend/activity_log.py).
+"""
+
+from django.core.management.base import BaseCommand
+from backend import activity_log
+
+
+class Command(BaseCommand):
+    help = 'Write spilled/journaled activity log events to the logs table'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Replaying activity log files from {activity_log.SPILL_DIR}...')
+
+        written = activity_log.replay_spill()
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Activity log replayed: {written} events written'))
@@ -0,0 +1,43 @@
+"""
+Django Management Command: Reclaim unreferenced property image files
+Usage: python manage.py gc_media [--dry-run] [--grace-seconds 3600]
+
+Recomputes content-addressed blob reference counts, deletes blobs nobody
+references, then streams over images/, variants/ and legacy property_*
+uploads in MEDIA_ROOT and deletes files no row points at
+(see backend/media_store.py). Memory use is bounded by the batch size.
+"""
+
+from django.core.management.base import BaseCommand
+from backend import media_store
+
+
+class Command(BaseCommand):
+    help = 'Delete property image files that no PropertyImage row references'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be deleted without deleting')
+        parser.add_argument('--grace-seconds', type=int, default=media_store.GC_GRACE_SECONDS,
+                            help='Keep files changed more recently than this (uploads in progress)')
+        parser.add_argument('--batch-size', type=int, default=media_store.GC_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        grace = options['grace_seconds']
+        batch_size = options['batch_size']
+        verb = 'Would delete' if dry_run else 'Deleted'
+
+        fixed = media_store.repair_refcounts(batch_size=batch_size)
+        if fixed:
+            self.stdout.write(self.style.WARNING(f'⚠️ {fixed} blob reference counts had drifted and were corrected'))
+
+        blobs, blob_bytes = media_store.collect_blobs(grace_seconds=grace, dry_run=dry_run, batch_size=batch_size)
+        self.stdout.write(f'{verb} {blobs} unreferenced blobs ({blob_bytes / (1024 * 1024):.1f}MB)')
+
+        orphans, orphan_bytes, scanned = media_store.collect_orphans(grace_seconds=grace, dry_run=dry_run, batch_size=batch_size)
+        self.stdout.write(f'{verb} {orphans} orphaned files of {scanned} scanned ({orphan_bytes / (1024 * 1024):.1f}MB)')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Media GC finished: {(blob_bytes + orphan_bytes) / (1024 * 1024):.1f}MB '
+            f'{"reclaimable" if dry_run else "reclaimed"}'
+        ))
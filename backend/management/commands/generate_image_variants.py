@@ -0,0 +1,45 @@
+"""
+Django Management Command: Build responsive variants for property images
+Usage: python manage.py generate_image_variants [--all] [--inline]
+
+Queues (or with --inline, renders directly) the thumb/card/large JPEG and
+WebP copies of images whose variants are missing or stale
+(see backend/image_variants.py).
+"""
+
+from django.core.management.base import BaseCommand
+from backend import image_variants, jobs
+from backend.models import PropertyImage
+
+
+class Command(BaseCommand):
+    help = 'Generate thumbnail/card/large JPEG and WebP variants for property images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Regenerate every image, not only missing ones')
+        parser.add_argument('--inline', action='store_true', help='Render in this process instead of queueing jobs')
+
+    def handle(self, *args, **options):
+        images = PropertyImage.objects.only('image_id', 'image_url', 'variants').order_by('image_id')
+        pending = [
+            image.image_id for image in images.iterator()
+            if options['all'] and image_variants.storage_path(image.image_url) is not None
+            or image_variants.needs_variants(image)
+        ]
+        self.stdout.write(f'{len(pending)} images need variants')
+
+        failed = 0
+        for image_id in pending:
+            if not options['inline']:
+                jobs.enqueue('images.generate_variants', image_id)
+                continue
+            try:
+                image_variants.generate_variants(image_id)
+            except Exception as e:
+                failed += 1
+                self.stdout.write(self.style.WARNING(f'⚠️ Image #{image_id}: {str(e)}'))
+
+        if options['inline']:
+            self.stdout.write(self.style.SUCCESS(f'✅ Variants generated for {len(pending) - failed} images ({failed} failed)'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✅ Queued {len(pending)} images (run `python manage.py run_jobs` to process)'))
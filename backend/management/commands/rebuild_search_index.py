@@ -0,0 +1,19 @@
+"""
+Django Management Command: Rebuild the property full-text search index
+Usage: python manage.py rebuild_search_index
+"""
+
+from django.core.management.base import BaseCommand
+from backend import property_search_helper
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index over Property listings'
+
+    def handle(self, *args, **options):
+        backend = property_search_helper.get_search_backend()
+        self.stdout.write(f'Rebuilding search index using {backend.__class__.__name__}...')
+
+        indexed = property_search_helper.rebuild_index()
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Search index rebuilt: {indexed} properties indexed'))
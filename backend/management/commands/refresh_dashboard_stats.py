@@ -0,0 +1,30 @@
+"""
+Django Management Command: Reconcile the admin dashboard statistics snapshot
+Usage: python manage.py refresh_dashboard_stats
+
+The snapshot is kept current by model signals; run this periodically (e.g.
+hourly from cron) to correct drift from bulk updates or manual DB edits.
+"""
+
+from django.core.management.base import BaseCommand
+from backend import dashboard_stats
+from backend.models import DashboardStats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the admin dashboard statistics snapshot from the source tables'
+
+    def handle(self, *args, **options):
+        before = DashboardStats.objects.filter(stats_id=dashboard_stats.SNAPSHOT_ID).first()
+        stats = dashboard_stats.reconcile()
+
+        if before is not None:
+            drift = {
+                field: (getattr(before, field), getattr(stats, field))
+                for field in dashboard_stats.compute_stats()
+                if getattr(before, field) != getattr(stats, field)
+            }
+            for field, (old, new) in drift.items():
+                self.stdout.write(self.style.WARNING(f'  {field}: {old} -> {new}'))
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Dashboard stats refreshed at {stats.refreshed_at:%Y-%m-%d %H:%M:%S}'))
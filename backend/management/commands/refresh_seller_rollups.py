@@ -0,0 +1,23 @@
+"""
+Django Management Command: Rebuild the seller dashboard daily rollups
+Usage: python manage.py refresh_seller_rollups [--seller ID ...]
+
+The rollups are kept current by model signals; run this periodically (e.g.
+nightly from cron) to correct drift from bulk updates, raw SQL or deleted
+logs. See backend/seller_rollups.py.
+"""
+
+from django.core.management.base import BaseCommand
+from backend import activity_log, seller_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-seller daily rollups (listings, images, bookings, revenue, views)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seller', type=int, action='append', help='Only rebuild this seller (repeatable)')
+
+    def handle(self, *args, **options):
+        activity_log.flush()
+        written = seller_rollups.rebuild(seller_ids=options['seller'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Seller rollups rebuilt ({written} daily rows)'))
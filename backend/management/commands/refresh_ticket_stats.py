@@ -0,0 +1,29 @@
+"""
+Django Management Command: Reconcile the support ticket statistics row
+Usage: python manage.py refresh_ticket_stats
+
+The row is kept current when tickets are created or change status; run this
+periodically (e.g. hourly from cron) to correct drift from tickets deleted
+with their user, bulk updates or manual DB edits. See
+backend/support_tickets.py.
+"""
+
+from django.core.management.base import BaseCommand
+from backend import support_tickets
+from backend.models import SupportTicketStats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the support ticket counts by status from the tickets table'
+
+    def handle(self, *args, **options):
+        before = SupportTicketStats.objects.filter(stats_id=support_tickets.SNAPSHOT_ID).first()
+        stats = support_tickets.reconcile()
+
+        if before is not None:
+            for field in ('total',) + support_tickets.STATUSES:
+                old, new = getattr(before, field), getattr(stats, field)
+                if old != new:
+                    self.stdout.write(self.style.WARNING(f'  {field}: {old} -> {new}'))
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Support ticket stats refreshed at {stats.refreshed_at:%Y-%m-%d %H:%M:%S}'))
@@ -0,0 +1,20 @@
+"""
+Django Management Command: Recompute per-user unread notification counters
+Usage: python manage.py repair_notification_counters
+"""
+
+from django.core.management.base import BaseCommand
+from backend import notification_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute NotificationCounter rows from the notification tables in bulk'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Recomputing notification counters...')
+
+        written, drifted = notification_counters.repair_all()
+
+        if drifted:
+            self.stdout.write(self.style.WARNING(f'⚠️ {drifted} counters had drifted and were corrected'))
+        self.stdout.write(self.style.SUCCESS(f'✅ Notification counters repaired: {written} rows written'))
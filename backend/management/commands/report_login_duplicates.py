@@ -0,0 +1,41 @@
+"""
+Django Management Command: List accounts whose phone/email duplicates another account
+Usage: python manage.py report_login_duplicates
+
+Migration 0032 gave each normalized phone/email (the unique login lookup
+keys) to the oldest account using it. Later accounts with the same value
+kept NULL keys and cannot log in with that phone/email until the duplicate
+is merged, or the account's phone/email is corrected (saving a changed
+phone/email re-derives its key).
+"""
+
+from django.core.management.base import BaseCommand
+from backend.models import EstateUser, normalize_email, normalize_phone
+
+
+class Command(BaseCommand):
+    help = 'List accounts left without a login lookup key because their phone/email is taken'
+
+    def handle(self, *args, **options):
+        found = 0
+        checks = (
+            ('phone', 'phone_normalized', normalize_phone),
+            ('email', 'email_normalized', normalize_email),
+        )
+        for field, key_field, normalize in checks:
+            candidates = EstateUser.objects.filter(**{f'{key_field}__isnull': True}).exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+            for user in candidates.order_by('user_id').only('user_id', 'name', field):
+                key = normalize(getattr(user, field))
+                if key is None:
+                    continue
+                owner = EstateUser.objects.filter(**{key_field: key}).only('user_id', 'name').first()
+                owner_text = f"user #{owner.user_id} ({owner.name})" if owner else "no account (save it again to claim it)"
+                self.stdout.write(self.style.WARNING(
+                    f'  user #{user.user_id} ({user.name}): {field} {key} belongs to {owner_text}'
+                ))
+                found += 1
+
+        if found:
+            self.stdout.write(self.style.WARNING(f'⚠️ {found} duplicate login value(s) to resolve'))
+        else:
+            self.stdout.write(self.style.SUCCESS('✅ Every phone/email has its login lookup key'))
@@ -0,0 +1,62 @@
+"""
+Django Management Command: Run the background job queue
+Usage: python manage.py run_jobs [--threads 4] [--once] [--stats]
+
+Processes jobs queued with jobs.enqueue_on_commit (see backend/jobs.py).
+This is the production worker: with DEBUG off the web processes do not run
+jobs (JOBS_EMBEDDED_WORKER defaults to False), so keep at least one running
+next to the web server. Run as many processes as needed; jobs are claimed
+atomically, so workers never run the same job twice.
+"""
+
+import json
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from backend import jobs, notification_push
+
+
+class Command(BaseCommand):
+    help = 'Process queued background jobs (notifications and other post-commit side effects)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=2, help='Worker threads in this process')
+        parser.add_argument('--once', action='store_true', help='Run all due jobs, then exit')
+        parser.add_argument('--stats', action='store_true', help='Print queue depth and latency as JSON, then exit')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.stdout.write(json.dumps(jobs.job_stats(), indent=2))
+            return
+
+        if options['once']:
+            jobs.requeue_stale()
+            ran = jobs.run_pending(limit=10 ** 9)
+            self.stdout.write(self.style.SUCCESS(f'✅ Ran {ran} jobs'))
+            return
+
+        if not notification_push.shared_channel_layer():
+            self.stdout.write(self.style.WARNING(
+                '⚠️ CHANNEL_LAYERS is per-process: notifications created here are not pushed to open '
+                'WebSockets (dashboards catch up when they reconnect). Set CHANNEL_REDIS_URL to push them.'
+            ))
+
+        threads = max(1, options['threads'])
+        worker = jobs.JobWorker(threads=threads, name='run_jobs')
+        jobs.register_worker(worker)
+
+        stopping = []
+        def request_stop(signum, frame):
+            stopping.append(signum)
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGTERM, request_stop)
+
+        worker.start()
+        self.stdout.write(self.style.SUCCESS(f'✅ Job worker started with {threads} threads (Ctrl+C to stop)'))
+        while not stopping:
+            time.sleep(0.5)
+
+        self.stdout.write('Stopping, waiting for running jobs to finish...')
+        worker.stop()
+        self.stdout.write(self.style.SUCCESS('✅ Job worker stopped'))
@@ -0,0 +1,308 @@
+"""
+Content-addressed Image Storage for Estate Management System
+============================================================
+Property images are stored once per distinct content, at
+``images/<first 2 hex>/<sha256>.<ext>`` in default_storage. Re-uploading the
+same photo (e.g. the same picture on several listings) reuses the stored
+file instead of writing a copy.
+
+Each file has a ``MediaBlob`` row whose ``ref_count`` is the number of
+``PropertyImage`` rows pointing at it. The signals in signals.py keep it
+current on create, re-point and delete (including cascades), so deleting a
+row never deletes a file another row still uses. Nothing is unlinked on the
+request path: ``python manage.py gc_media``:
+
+1. recomputes ref counts in batches (corrects QuerySet.update()/raw SQL),
+2. deletes blobs that have had no references for ``MEDIA_GC_GRACE_SECONDS``,
+3. streams over ``images/``, ``variants/`` and legacy ``property_*`` files in
+   MEDIA_ROOT and deletes those no row references,
+
+holding at most one batch of names in memory at a time. The grace period
+covers uploads that are stored but not yet linked to a row. Uploads are
+first written to ``images/incoming/`` while they are hashed (uploads.py) and
+then renamed into place, so one left behind by a crashed request is an
+unreferenced file there and goes in step 3.
+"""
+
+import logging
+import os
+import re
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import MediaBlob, PropertyImage
+
+logger = logging.getLogger(__name__)
+
+
+BLOB_DIR = "images"
+INCOMING_DIR = f"{BLOB_DIR}/incoming"
+GC_GRACE_SECONDS = getattr(settings, "MEDIA_GC_GRACE_SECONDS", 3600)
+GC_BATCH_SIZE = 1000
+
+_BLOB_NAME = re.compile(r"^images/[0-9a-f]{2}/(?P<sha>[0-9a-f]{64})\.[a-z0-9]+$")
+# Upload names used before content addressing (files in the MEDIA_ROOT top level)
+_LEGACY_NAME = re.compile(r"^property_[^/]+\.[A-Za-z0-9]+$")
+
+
+def blob_path(sha256, ext):
+    return f"{BLOB_DIR}/{sha256[:2]}/{sha256}.{ext}"
+
+
+def _storage_name(image_url):
+    from .image_variants import storage_path
+    return storage_path(image_url)
+
+
+def blob_hash(image_url):
+    """Content hash of a content-addressed image path, or None for legacy/external URLs"""
+    match = _BLOB_NAME.match(_storage_name(image_url) or "")
+    return match.group("sha") if match else None
+
+
+# ===========================
+# Storing
+# ===========================
+
+def incoming_path(ext):
+    """Storage name an upload is written to before its content hash is known"""
+    return f"{INCOMING_DIR}/{uuid.uuid4().hex}.{ext}"
+
+
+def _move(source, target):
+    """Rename a file within MEDIA_ROOT (atomic, so an identical concurrent upload just replaces it)"""
+    target_path = default_storage.path(target)
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    os.replace(default_storage.path(source), target_path)
+
+
+def put(incoming, sha256, ext, size):
+    """
+    Move an upload written to ``incoming`` into place under its content hash,
+    or drop it if that file already exists
+
+    Args:
+        incoming: Storage name from incoming_path() holding the whole upload
+        sha256: Hex digest of the content
+        ext: File extension for the detected type
+        size: Content length in bytes
+
+    Returns:
+        Tuple of (storage name, True if bytes were written / False if deduplicated)
+    """
+    path = blob_path(sha256, ext)
+    blob, created = MediaBlob.objects.get_or_create(sha256=sha256, defaults={"path": path, "size": size})
+    if not created:
+        # Fresh activity keeps GC away while the caller links the file to a row.
+        # No row updated: GC removed the blob (and its file) since the read
+        if MediaBlob.objects.filter(sha256=sha256).update(updated_at=timezone.now()):
+            path = blob.path
+        else:
+            blob, created = MediaBlob.objects.get_or_create(sha256=sha256, defaults={"path": path, "size": size})
+            path = blob.path
+
+    # A new row always gets its file written; an existing row's file is trusted
+    # only if present (GC deletes the file before its row delete commits)
+    if not created and default_storage.exists(path):
+        default_storage.delete(incoming)
+        return path, False
+
+    _move(incoming, path)
+    return path, True
+
+
+# ===========================
+# Reference Counting
+# ===========================
+
+def add_ref(image_url):
+    sha256 = blob_hash(image_url)
+    if sha256 is None:
+        return
+    updated = MediaBlob.objects.filter(sha256=sha256).update(
+        ref_count=F("ref_count") + 1, updated_at=timezone.now()
+    )
+    if not updated:
+        # File stored without a row (e.g. copied in by hand): start counting now
+        try:
+            with transaction.atomic():
+                MediaBlob.objects.create(sha256=sha256, path=_storage_name(image_url), ref_count=1)
+        except IntegrityError:
+            MediaBlob.objects.filter(sha256=sha256).update(ref_count=F("ref_count") + 1, updated_at=timezone.now())
+
+
+def release(image_url):
+    sha256 = blob_hash(image_url)
+    if sha256 is None:
+        return
+    MediaBlob.objects.filter(sha256=sha256, ref_count__gt=0).update(
+        ref_count=F("ref_count") - 1, updated_at=timezone.now()
+    )
+
+
+def repair_refcounts(batch_size=GC_BATCH_SIZE):
+    """
+    Recompute ref_count for every blob, one batch of blobs at a time
+
+    Returns:
+        Number of blobs whose count was wrong
+    """
+    fixed = 0
+    last_sha = ""
+    while True:
+        batch = list(
+            MediaBlob.objects.filter(sha256__gt=last_sha).order_by("sha256")
+            .values_list("sha256", "path", "ref_count")[:batch_size]
+        )
+        if not batch:
+            return fixed
+        last_sha = batch[-1][0]
+        paths = [path for _sha, path, _count in batch]
+        actual = dict(
+            PropertyImage.objects.filter(image_url__in=paths + [settings.MEDIA_URL + path for path in paths])
+            .order_by().values_list("image_url").annotate(total=Count("image_id"))
+        )
+        for sha256, path, count in batch:
+            real = actual.get(path, 0) + actual.get(settings.MEDIA_URL + path, 0)
+            if real != count:
+                MediaBlob.objects.filter(sha256=sha256).update(ref_count=real, updated_at=timezone.now())
+                fixed += 1
+
+
+# ===========================
+# Garbage Collection
+# ===========================
+
+def _delete_file(name, dry_run):
+    try:
+        size = default_storage.size(name)
+        if not dry_run:
+            default_storage.delete(name)
+        return size
+    except FileNotFoundError:
+        return 0
+
+
+def collect_blobs(grace_seconds=GC_GRACE_SECONDS, dry_run=False, batch_size=GC_BATCH_SIZE):
+    """
+    Delete blobs unreferenced for longer than the grace period
+
+    Returns:
+        Tuple of (blobs removed, bytes reclaimed)
+    """
+    cutoff = timezone.now() - timedelta(seconds=grace_seconds)
+    removed = reclaimed = 0
+    last_sha = ""
+    while True:
+        batch = list(
+            MediaBlob.objects.filter(ref_count=0, updated_at__lt=cutoff, sha256__gt=last_sha)
+            .order_by("sha256").values_list("sha256", "path")[:batch_size]
+        )
+        if not batch:
+            return removed, reclaimed
+        last_sha = batch[-1][0]
+        for sha256, path in batch:
+            if dry_run:
+                reclaimed += _delete_file(path, dry_run)
+                removed += 1
+                continue
+            # Conditional delete: a reference taken since the SELECT keeps the
+            # blob. The file goes while the row delete is uncommitted, so an
+            # upload of the same content waits and then writes a new file
+            with transaction.atomic():
+                deleted, _ = MediaBlob.objects.filter(sha256=sha256, ref_count=0, updated_at__lt=cutoff).delete()
+                if not deleted:
+                    continue
+                reclaimed += _delete_file(path, dry_run)
+            removed += 1
+
+
+def _walk(root, relative=""):
+    """Yield (storage name, mtime) for files under MEDIA_ROOT/relative, lazily"""
+    directory = os.path.join(root, relative)
+    try:
+        entries = os.scandir(directory)
+    except FileNotFoundError:
+        return
+    with entries:
+        for entry in entries:
+            name = f"{relative}/{entry.name}" if relative else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk(root, name)
+            elif entry.is_file(follow_symlinks=False):
+                yield name, entry.stat().st_mtime
+
+
+def _candidates(root):
+    """Files GC may manage: blobs, variants and legacy top-level property uploads"""
+    for name, mtime in _walk(root, BLOB_DIR):
+        yield name, mtime
+    from .image_variants import VARIANT_DIR
+    for name, mtime in _walk(root, VARIANT_DIR):
+        yield name, mtime
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False) and _LEGACY_NAME.match(entry.name):
+                yield entry.name, entry.stat().st_mtime
+
+
+def _referenced(names):
+    """Subset of storage ``names`` still referenced by a row"""
+    from .image_variants import VARIANT_SIZES
+    names = list(names)
+    with_prefix = [settings.MEDIA_URL + name for name in names]
+    referenced = set()
+    for url in PropertyImage.objects.filter(image_url__in=names + with_prefix).values_list("image_url", flat=True):
+        referenced.add(url[len(settings.MEDIA_URL):] if url.startswith(settings.MEDIA_URL) else url)
+    referenced.update(MediaBlob.objects.filter(path__in=names).values_list("path", flat=True))
+
+    variant_names = [name for name in names if name.startswith("variants/")]
+    if variant_names:
+        query = Q()
+        for size in VARIANT_SIZES:
+            for fmt in ("jpeg", "webp"):
+                query |= Q(**{f"variants__{size}__{fmt}__in": variant_names})
+        for variants in PropertyImage.objects.filter(query).values_list("variants", flat=True):
+            for size in VARIANT_SIZES:
+                for fmt in ("jpeg", "webp"):
+                    referenced.add((variants.get(size) or {}).get(fmt))
+    return referenced
+
+
+def collect_orphans(grace_seconds=GC_GRACE_SECONDS, dry_run=False, batch_size=GC_BATCH_SIZE):
+    """
+    Stream over managed files in MEDIA_ROOT and delete those no row references
+
+    Returns:
+        Tuple of (files removed, bytes reclaimed, files scanned)
+    """
+    root = str(settings.MEDIA_ROOT)
+    cutoff = timezone.now().timestamp() - grace_seconds
+    removed = reclaimed = scanned = 0
+
+    def flush(batch):
+        nonlocal removed, reclaimed
+        referenced = _referenced(batch)
+        for name in batch:
+            if name not in referenced:
+                reclaimed += _delete_file(name, dry_run)
+                removed += 1
+
+    batch = []
+    for name, mtime in _candidates(root):
+        scanned += 1
+        if mtime > cutoff:
+            continue  # may belong to an upload in progress
+        batch.append(name)
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+    return removed, reclaimed, scanned
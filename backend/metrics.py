@@ -0,0 +1,304 @@
+"""
+Request Metrics for Estate Management System
+============================================
+``MetricsMiddleware`` records, for every request, the matched route
+pattern (``backend/api/properties/<int:property_id>/view/``, not the
+concrete URL, so the label set stays bounded), method and status with:
+
+- latency (``estate_http_request_duration_seconds``)
+- time spent in the database (``estate_http_request_db_seconds``)
+- number of SQL queries (``estate_http_request_queries``)
+- response body size (``estate_http_response_size_bytes``, not for
+  streaming responses)
+- ``estate_http_requests_total`` by status code
+
+The middleware only appends one tuple to a per-process ``deque`` (atomic,
+no lock on the request path). A background thread folds the buffer into
+histograms every ``METRICS_FLUSH_INTERVAL`` seconds; a scrape folds
+whatever is left first.
+
+``/backend/metrics/`` serves everything in the Prometheus text format.
+With several worker processes (gunicorn) set ``METRICS_MULTIPROC_DIR``
+(env ``PROMETHEUS_MULTIPROC_DIR``): every process writes its totals to
+``metrics-<pid>-<start>.json`` there on each fold and at exit, and a scrape
+answered by any worker sums all files. Files of workers that have exited
+are kept so counters never go backwards; gunicorn.conf.py empties the
+directory when the server starts.
+"""
+
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+ENABLED = getattr(settings, "METRICS_ENABLED", True)
+FLUSH_INTERVAL = getattr(settings, "METRICS_FLUSH_INTERVAL", 10.0)
+MULTIPROC_DIR = getattr(settings, "METRICS_MULTIPROC_DIR", None)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# name -> (type, help, buckets)
+METRICS = {
+    "estate_http_requests_total": ("counter", "Requests by route, method and status code", None),
+    "estate_http_request_duration_seconds": ("histogram", "Request latency in seconds", LATENCY_BUCKETS),
+    "estate_http_request_db_seconds": ("histogram", "Time spent in SQL queries per request", LATENCY_BUCKETS),
+    "estate_http_request_queries": ("histogram", "SQL queries per request", QUERY_BUCKETS),
+    "estate_http_response_size_bytes": ("histogram", "Response body size in bytes", SIZE_BUCKETS),
+}
+
+KNOWN_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+# ===========================
+# Per-process Registry
+# ===========================
+
+class _Registry:
+    """Request samples buffered lock-free, folded into counters/histograms by one thread"""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.started = int(time.time())
+        self.samples = deque()
+        self.counters = defaultdict(float)  # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [bucket counts, sum, count]
+        self.fold_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopping = False
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="metrics-folder", daemon=True)
+        self.thread.start()
+        atexit.register(self.stop)
+
+    def observe(self, sample):
+        # deque.append is atomic: request threads never wait on each other or the folder
+        self.samples.append(sample)
+
+    def fold(self):
+        """Move buffered samples into the counters and histograms, returns how many"""
+        with self.fold_lock:
+            folded = 0
+            while True:
+                try:
+                    route, method, status, seconds, db_seconds, queries, size = self.samples.popleft()
+                except IndexError:
+                    break
+                labels = (("route", route), ("method", method))
+                self.counters[("estate_http_requests_total", labels + (("status", str(status)),))] += 1
+                self._histogram("estate_http_request_duration_seconds", labels, seconds)
+                self._histogram("estate_http_request_db_seconds", labels, db_seconds)
+                self._histogram("estate_http_request_queries", labels, queries)
+                if size is not None:
+                    self._histogram("estate_http_response_size_bytes", labels, size)
+                folded += 1
+            return folded
+
+    def _histogram(self, name, labels, value):
+        buckets = METRICS[name][2]
+        histogram = self.histograms.get((name, labels))
+        if histogram is None:
+            histogram = self.histograms[(name, labels)] = [[0] * len(buckets), 0.0, 0]
+        for index, bound in enumerate(buckets):
+            if value <= bound:
+                histogram[0][index] += 1
+                break
+        histogram[1] += value
+        histogram[2] += 1
+
+    def snapshot(self):
+        """Folded totals as a JSON-serialisable dict"""
+        self.fold()
+        with self.fold_lock:
+            return {
+                "counters": [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                "histograms": [
+                    [name, list(labels), list(buckets), total, count]
+                    for (name, labels), (buckets, total, count) in self.histograms.items()
+                ],
+            }
+
+    def write_file(self):
+        """Write this process's totals to METRICS_MULTIPROC_DIR (atomic replace)"""
+        if not MULTIPROC_DIR:
+            return
+        os.makedirs(MULTIPROC_DIR, exist_ok=True)
+        path = os.path.join(MULTIPROC_DIR, f"metrics-{self.pid}-{self.started}.json")
+        temporary = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary, "w") as handle:
+            json.dump(self.snapshot(), handle)
+        os.replace(temporary, path)
+
+    def _run(self):
+        while not self.stopping:
+            self.wakeup.wait(FLUSH_INTERVAL)
+            try:
+                if self.fold() and MULTIPROC_DIR:
+                    self.write_file()
+            except Exception as e:
+                logger.error(f"❌ Metrics fold failed: {str(e)}")
+
+    def stop(self):
+        if self.stopping or os.getpid() != self.pid:  # atexit also runs in forked children
+            return
+        self.stopping = True
+        self.wakeup.set()
+        try:
+            self.write_file()
+        except Exception as e:
+            logger.error(f"❌ Could not write final metrics file: {str(e)}")
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Return this process's registry, starting it on first use (and after fork)"""
+    global _registry
+    if _registry is None or _registry.pid != os.getpid():
+        with _registry_lock:
+            if _registry is None or _registry.pid != os.getpid():
+                registry = _Registry()
+                registry.start()
+                _registry = registry
+    return _registry
+
+
+# ===========================
+# Aggregation and Exposition
+# ===========================
+
+def _snapshots():
+    """This process's totals, plus every other process's file in multiprocess mode"""
+    registry = get_registry()
+    if not MULTIPROC_DIR:
+        return [registry.snapshot()]
+    registry.write_file()
+    snapshots = []
+    for path in glob.glob(os.path.join(MULTIPROC_DIR, "metrics-*.json")):
+        try:
+            with open(path) as handle:
+                snapshots.append(json.load(handle))
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Skipping unreadable metrics file {path}: {str(e)}")
+    return snapshots
+
+
+def _merge(snapshots):
+    counters = defaultdict(float)
+    histograms = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot["counters"]:
+            counters[(name, tuple(tuple(pair) for pair in labels))] += value
+        for name, labels, buckets, total, count in snapshot["histograms"]:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            merged = histograms.setdefault(key, [[0] * len(buckets), 0.0, 0])
+            merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+            merged[1] += total
+            merged[2] += count
+    return counters, histograms
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs):
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _number(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render():
+    """All metrics (every process in multiprocess mode) in the Prometheus text format"""
+    snapshots = _snapshots()
+    counters, histograms = _merge(snapshots)
+
+    lines = [
+        "# HELP estate_metrics_processes Processes whose metrics are included",
+        "# TYPE estate_metrics_processes gauge",
+        f"estate_metrics_processes {len(snapshots)}",
+    ]
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "counter":
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+            continue
+        for (metric, labels), (counts, total, count) in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_labels(labels + (('le', _number(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+# ===========================
+# Middleware
+# ===========================
+
+class _DatabaseTimer:
+    """execute_wrapper that counts queries and adds up their time"""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+class MetricsMiddleware:
+    """Records latency, DB time, query count, response size and status per route (METRICS_ENABLED)"""
+
+    def __init__(self, get_response):
+        if not ENABLED:
+            raise MiddlewareNotUsed("METRICS_ENABLED is off")
+        self.get_response = get_response
+
+    def __call__(self, request):
+        database = _DatabaseTimer()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(database))
+            response = self.get_response(request)
+        seconds = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        route = match.route if match and match.route else UNMATCHED_ROUTE
+        method = request.method if request.method in KNOWN_METHODS else "OTHER"
+        size = None if response.streaming else len(response.content)
+        get_registry().observe((route, method, response.status_code, seconds, database.seconds, database.queries, size))
+        return response
@@ -0,0 +1,51 @@
+# Full-text search index over Property text fields (see backend/property_search_helper.py)
+
+from django.db import migrations
+
+
+SEARCH_FIELDS = ['title', 'location', 'city', 'state', 'property_type', 'description', 'amenities']
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    columns = ', '.join(SEARCH_FIELDS)
+
+    if vendor == 'sqlite':
+        source = ', '.join(f"COALESCE({field}, '')" for field in SEARCH_FIELDS)
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS property_search_fts USING fts5({columns}, tokenize = 'unicode61')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO property_search_fts (rowid, {columns}) SELECT property_id, {source} FROM properties"
+        )
+    elif vendor == 'postgresql':
+        document = " || ' ' || ".join(f"coalesce({field}, '')" for field in SEARCH_FIELDS)
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS properties_search_gin ON properties USING GIN (to_tsvector('simple', {document}))"
+        )
+    elif vendor == 'mysql':
+        schema_editor.execute(
+            f"ALTER TABLE properties ADD FULLTEXT INDEX properties_search_ft ({columns})"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS property_search_fts")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS properties_search_gin")
+    elif vendor == 'mysql':
+        schema_editor.execute("ALTER TABLE properties DROP INDEX properties_search_ft")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0022_alter_property_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
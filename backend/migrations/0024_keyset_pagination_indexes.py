@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0023_property_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['booking_date', 'booking_id'], name='bookings_date_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='estateuser',
+            index=models.Index(fields=['created_at', 'user_id'], name='users_created_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='log',
+            index=models.Index(fields=['timestamp', 'log_id'], name='logs_timestamp_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['created_at', 'property_id'], name='properties_created_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['payment_date', 'txn_id'], name='transactions_date_keyset_idx'),
+        ),
+    ]
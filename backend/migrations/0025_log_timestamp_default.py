@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:28
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0024_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='log',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
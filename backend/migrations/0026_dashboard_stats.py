@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0025_log_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardStats',
+            fields=[
+                ('stats_id', models.AutoField(primary_key=True, serialize=False)),
+                ('total_users', models.IntegerField(default=0)),
+                ('users_sellers', models.IntegerField(default=0)),
+                ('users_buyers', models.IntegerField(default=0)),
+                ('users_admins', models.IntegerField(default=0)),
+                ('total_properties', models.IntegerField(default=0)),
+                ('properties_available', models.IntegerField(default=0)),
+                ('properties_sold', models.IntegerField(default=0)),
+                ('properties_pending', models.IntegerField(default=0)),
+                ('total_images', models.IntegerField(default=0)),
+                ('total_bookings', models.IntegerField(default=0)),
+                ('bookings_pending', models.IntegerField(default=0)),
+                ('bookings_confirmed', models.IntegerField(default=0)),
+                ('total_transactions', models.IntegerField(default=0)),
+                ('transactions_success', models.IntegerField(default=0)),
+                ('successful_purchases', models.IntegerField(default=0)),
+                ('total_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('stats_month', models.DateField(blank=True, null=True)),
+                ('monthly_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('prev_month_users', models.IntegerField(default=0)),
+                ('prev_month_properties', models.IntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'dashboard_stats',
+            },
+        ),
+    ]
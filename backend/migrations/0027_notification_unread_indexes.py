@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0026_dashboard_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='buyernotification',
+            index=models.Index(fields=['buyer', 'is_read'], name='buyer_notif_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sellernotification',
+            index=models.Index(fields=['seller', 'is_read'], name='seller_notif_unread_idx'),
+        ),
+    ]
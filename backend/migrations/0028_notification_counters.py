@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0027_notification_unread_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_counter', serialize=False, to='backend.estateuser')),
+                ('seller_unread', models.IntegerField(default=0)),
+                ('buyer_unread', models.IntegerField(default=0)),
+                ('seller_latest_id', models.IntegerField(default=0)),
+                ('buyer_latest_id', models.IntegerField(default=0)),
+                ('version', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'notification_counters',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0029_background_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='propertyimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:45
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0030_property_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('path', models.CharField(max_length=255)),
+                ('size', models.BigIntegerField(default=0)),
+                ('ref_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'media_blobs',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='propertyimage',
+            index=models.Index(fields=['image_url'], name='property_image_url_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediablob',
+            index=models.Index(fields=['ref_count', 'updated_at'], name='media_blob_gc_idx'),
+        ),
+    ]
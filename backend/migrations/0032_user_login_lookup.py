@@ -0,0 +1,81 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:49
+
+import logging
+
+from django.conf import settings
+from django.db import migrations, models
+
+logger = logging.getLogger(__name__)
+
+
+# Frozen copies of backend.models.normalize_phone/normalize_email as of this
+# migration, so later changes to the live helpers cannot alter it
+def normalize_phone(phone):
+    digits = ''.join(ch for ch in (phone or '') if ch.isdigit())
+    if not digits:
+        return None
+    if not (phone or '').strip().startswith('+'):
+        digits = digits.lstrip('0')  # trunk prefix
+        if len(digits) == getattr(settings, 'PHONE_LOCAL_DIGITS', 10):
+            digits = getattr(settings, 'PHONE_DEFAULT_COUNTRY_CODE', '91') + digits
+    return '+' + digits if digits else None
+
+
+def normalize_email(email):
+    email = (email or '').strip().lower()
+    return email or None
+
+
+def fill_lookup_columns(apps, schema_editor):
+    """
+    Normalize existing phones/emails. Rows that normalize to a value an
+    older account already has keep NULL (login resolves to the older
+    account, as the unordered .first() lookups effectively did); `python
+    manage.py report_login_duplicates` lists them so they can be merged or
+    corrected.
+    """
+    EstateUser = apps.get_model('backend', 'EstateUser')
+    phone_owners, email_owners = {}, {}
+    duplicates = 0
+    batch = []
+    for user in EstateUser.objects.order_by('user_id').only('user_id', 'phone', 'email').iterator(chunk_size=1000):
+        phone = normalize_phone(user.phone)
+        email = normalize_email(user.email)
+        user.phone_normalized = phone if phone not in phone_owners else None
+        user.email_normalized = email if email not in email_owners else None
+        duplicates += (phone is not None and phone in phone_owners) + (email is not None and email in email_owners)
+        phone_owners.setdefault(phone, user.user_id)
+        email_owners.setdefault(email, user.user_id)
+        batch.append(user)
+        if len(batch) >= 1000:
+            EstateUser.objects.bulk_update(batch, ['phone_normalized', 'email_normalized'])
+            batch = []
+    if batch:
+        EstateUser.objects.bulk_update(batch, ['phone_normalized', 'email_normalized'])
+
+    if duplicates:
+        logger.warning(
+            f"⚠️ {duplicates} duplicate login value(s) left without a lookup key; "
+            f"list them with `python manage.py report_login_duplicates`"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0031_media_blobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='estateuser',
+            name='email_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='estateuser',
+            name='phone_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=20, null=True, unique=True),
+        ),
+        migrations.RunPython(fill_lookup_columns, migrations.RunPython.noop),
+    ]
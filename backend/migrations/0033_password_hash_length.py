@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0032_user_login_lookup'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='estateuser',
+            name='password_hash',
+            field=models.CharField(max_length=128),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_rollups(apps, schema_editor):
+    from backend import seller_rollups
+    seller_rollups.rebuild(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0033_password_hash_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SellerDailyStats',
+            fields=[
+                ('stats_id', models.AutoField(primary_key=True, serialize=False)),
+                ('day', models.DateField()),
+                ('listings_added', models.IntegerField(default=0)),
+                ('images_added', models.IntegerField(default=0)),
+                ('bookings_created', models.IntegerField(default=0)),
+                ('bookings_pending', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('views', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='backend.estateuser')),
+            ],
+            options={
+                'db_table': 'seller_daily_stats',
+                'constraints': [models.UniqueConstraint(fields=('seller', 'day'), name='seller_daily_stats_seller_day_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
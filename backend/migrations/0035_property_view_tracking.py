@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def reset_seller_views(apps, schema_editor):
+    # Views were counted from sellers' own "property" log rows; they are now
+    # recorded as PropertyViewDaily events, so start the counters from zero
+    SellerDailyStats = apps.get_model('backend', 'SellerDailyStats')
+    SellerDailyStats.objects.exclude(views=0).update(views=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0034_seller_daily_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyViewDaily',
+            fields=[
+                ('stats_id', models.AutoField(primary_key=True, serialize=False)),
+                ('day', models.DateField()),
+                ('views', models.IntegerField(default=0)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_views', to='backend.property')),
+            ],
+            options={
+                'db_table': 'property_view_daily',
+                'constraints': [models.UniqueConstraint(fields=('property', 'day'), name='property_view_daily_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RecentPropertyView',
+            fields=[
+                ('recent_id', models.AutoField(primary_key=True, serialize=False)),
+                ('viewed_at', models.DateTimeField()),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recent_views', to='backend.property')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recent_views', to='backend.estateuser')),
+            ],
+            options={
+                'db_table': 'recent_property_views',
+                'indexes': [models.Index(fields=['user', '-viewed_at'], name='recent_view_user_time_idx'), models.Index(fields=['-viewed_at'], name='recent_view_time_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'property'), name='recent_view_user_property_uniq')],
+            },
+        ),
+        migrations.RunPython(reset_seller_views, migrations.RunPython.noop),
+    ]
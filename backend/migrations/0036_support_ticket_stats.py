@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0035_property_view_tracking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SupportTicketStats',
+            fields=[
+                ('stats_id', models.AutoField(primary_key=True, serialize=False)),
+                ('total', models.IntegerField(default=0)),
+                ('open', models.IntegerField(default=0)),
+                ('in_progress', models.IntegerField(default=0)),
+                ('resolved', models.IntegerField(default=0)),
+                ('closed', models.IntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'support_ticket_stats',
+            },
+        ),
+    ]
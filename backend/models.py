@@ -1,4 +1,32 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+
+
+# ---------------------------
+# Login Lookup Normalization
+# ---------------------------
+def normalize_phone(phone):
+    """
+    Phone number -> E.164-style ``+<country code><number>`` (digits only), or None
+
+    "098765 43210", "9876543210" and "+91-9876543210" all become
+    "+919876543210"; local numbers get PHONE_DEFAULT_COUNTRY_CODE.
+    """
+    digits = ''.join(ch for ch in (phone or '') if ch.isdigit())
+    if not digits:
+        return None
+    if not (phone or '').strip().startswith('+'):
+        digits = digits.lstrip('0')  # trunk prefix
+        if len(digits) == getattr(settings, 'PHONE_LOCAL_DIGITS', 10):
+            digits = getattr(settings, 'PHONE_DEFAULT_COUNTRY_CODE', '91') + digits
+    return '+' + digits if digits else None
+
+
+def normalize_email(email):
+    """Email -> trimmed lowercase form used for lookups, or None if blank"""
+    email = (email or '').strip().lower()
+    return email or None
 
 
 # ---------------------------
@@ -7,7 +35,7 @@ from django.db import models
 class EstateUser(models.Model):
     user_id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=50)
-    password_hash = models.CharField(max_length=100)
+    password_hash = models.CharField(max_length=128)  # Django hasher string (legacy rows: plaintext until next login)
     role = models.CharField(max_length=20)
     phone = models.CharField(max_length=15, null=True, blank=True)
     email = models.CharField(max_length=100, null=True, blank=True)
@@ -15,12 +43,57 @@ class EstateUser(models.Model):
     profile_photo = models.ImageField(upload_to="profile_photos/", null=True, blank=True)
     address = models.CharField(max_length=255, null=True, blank=True)
     last_login = models.DateTimeField(null=True, blank=True)
+    # Unique lookup keys for login/signup, derived from phone/email on save
+    phone_normalized = models.CharField(max_length=20, null=True, blank=True, unique=True, editable=False)
+    email_normalized = models.CharField(max_length=100, null=True, blank=True, unique=True, editable=False)
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Phone/email as loaded (deferred ones absent), see save()
+        instance._loaded_contact = {
+            field: instance.__dict__[field] for field in ("phone", "email") if field in instance.__dict__
+        }
+        return instance
+
+    def _contact_changed(self, field):
+        loaded = getattr(self, "_loaded_contact", None)
+        if self._state.adding or loaded is None:
+            return True
+        if field not in loaded:
+            return field in self.__dict__  # deferred when loaded, assigned since
+        return self.__dict__.get(field) != loaded[field]
+
+    def save(self, *args, **kwargs):
+        # Lookup keys are only re-derived when phone/email change: legacy
+        # duplicate accounts keep their NULL keys (see migration 0032 and
+        # `manage.py report_login_duplicates`) instead of failing every save
+        derived = []
+        if self._contact_changed("phone"):
+            self.phone_normalized = normalize_phone(self.phone)
+            derived.append("phone_normalized")
+        if self._contact_changed("email"):
+            self.email_normalized = normalize_email(self.email)
+            derived.append("email_normalized")
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'phone' in update_fields and 'phone_normalized' in derived:
+                update_fields.add('phone_normalized')
+            if 'email' in update_fields and 'email_normalized' in derived:
+                update_fields.add('email_normalized')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+        self._loaded_contact = {"phone": self.phone, "email": self.email}
+
     class Meta:
         db_table = "users"
+        indexes = [
+            models.Index(fields=['created_at', 'user_id'], name="users_created_keyset_idx"),  # keyset pagination
+        ]
 
 
 # ---------------------------
@@ -61,8 +134,18 @@ class Property(models.Model):
     def __str__(self):
         return self.title
 
+    def first_image(self):
+        """Oldest image (what ``images.first`` returns), read from prefetch_related('images') when loaded"""
+        prefetched = getattr(self, "_prefetched_objects_cache", {})
+        if "images" in prefetched:
+            return min(prefetched["images"], key=lambda image: image.image_id, default=None)
+        return self.images.order_by("image_id").first()
+
     class Meta:
         db_table = "properties"
+        indexes = [
+            models.Index(fields=['created_at', 'property_id'], name="properties_created_keyset_idx"),  # keyset pagination
+        ]
 
 
 # ---------------------------
@@ -76,12 +159,55 @@ class PropertyImage(models.Model):
     image_url = models.CharField(max_length=255)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     description = models.TextField(null=True, blank=True)
+    # Resized copies built by image_variants.py: {"card": {"jpeg": path, "webp": path, "width": w}, ...}
+    variants = models.JSONField(default=dict, blank=True)
 
     def __str__(self):
         return f"Image {self.image_id} for {self.property.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the signals see which file a changed row pointed at before (media refcounts)
+        instance._loaded_image_url = instance.__dict__.get("image_url")
+        return instance
+
+    # Plain methods (templates call them too): ``property`` is the FK field in this class
+    def original_url(self):
+        """Public URL of the original upload"""
+        from .image_variants import media_url
+        return media_url(self.image_url)
+
+    def variant_url(self, size, fmt="jpeg"):
+        """URL of a resized variant, falling back to the original until it is generated"""
+        from .image_variants import media_url
+        path = (self.variants or {}).get(size, {}).get(fmt)
+        return media_url(path) if path else self.original_url()
+
+    def srcset(self, sizes=("thumb", "card"), fmt="jpeg"):
+        """``srcset`` attribute value for the given variant sizes ('' until generated)"""
+        from .image_variants import media_url
+        entries = []
+        for size in sizes:
+            variant = (self.variants or {}).get(size)
+            if variant and variant.get(fmt):
+                entries.append(f"{media_url(variant[fmt])} {variant['width']}w")
+        return ", ".join(entries)
+
+    def card_url(self):
+        return self.variant_url("card")
+
+    def card_srcset(self):
+        return self.srcset(("thumb", "card"))
+
+    def card_webp_srcset(self):
+        return self.srcset(("thumb", "card"), fmt="webp")
+
     class Meta:
         db_table = "property_images"
+        indexes = [
+            models.Index(fields=["image_url"], name="property_image_url_idx"),  # media refcount repair / GC
+        ]
 
 
 # ---------------------------
@@ -103,6 +229,9 @@ class Booking(models.Model):
 
     class Meta:
         db_table = "bookings"
+        indexes = [
+            models.Index(fields=['booking_date', 'booking_id'], name="bookings_date_keyset_idx"),  # keyset pagination
+        ]
 
 
 # ---------------------------
@@ -125,6 +254,9 @@ class Transaction(models.Model):
 
     class Meta:
         db_table = "transactions"
+        indexes = [
+            models.Index(fields=['payment_date', 'txn_id'], name="transactions_date_keyset_idx"),  # keyset pagination
+        ]
 
 
 # ---------------------------
@@ -134,13 +266,16 @@ class Log(models.Model):
     log_id = models.AutoField(primary_key=True)
     user = models.ForeignKey(EstateUser, on_delete=models.CASCADE, related_name="logs", null=True)
     action = models.CharField(max_length=500)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)  # set by the writer, see activity_log.py
 
     def __str__(self):
         return f"{self.user.name} - {self.action}"
 
     class Meta:
         db_table = "logs"
+        indexes = [
+            models.Index(fields=['timestamp', 'log_id'], name="logs_timestamp_keyset_idx"),  # keyset pagination
+        ]
 
 
 # ---------------------------
@@ -361,6 +496,9 @@ class SellerNotification(models.Model):
     class Meta:
         db_table = "seller_notifications"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['seller', 'is_read'], name="seller_notif_unread_idx"),  # unread counts / ETag
+        ]
 
 
 # ---------------------------
@@ -393,6 +531,36 @@ class BuyerNotification(models.Model):
     class Meta:
         db_table = "buyer_notifications"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['buyer', 'is_read'], name="buyer_notif_unread_idx"),  # unread counts / ETag
+        ]
+
+
+# ---------------------------
+# Per-user Notification Counters
+# ---------------------------
+class NotificationCounter(models.Model):
+    """
+    Denormalized unread counts and latest notification ids per user, so the
+    notification badge and API ETag never scan the notification tables.
+    Maintained by notification_counters.py; rebuilt with
+    `python manage.py repair_notification_counters`.
+    """
+    user = models.OneToOneField(
+        EstateUser, on_delete=models.CASCADE, primary_key=True, related_name="notification_counter"
+    )
+    seller_unread = models.IntegerField(default=0)  # SellerNotification (sellers and admins)
+    buyer_unread = models.IntegerField(default=0)  # BuyerNotification
+    seller_latest_id = models.IntegerField(default=0)
+    buyer_latest_id = models.IntegerField(default=0)
+    version = models.IntegerField(default=0)  # bumped on every change (ETag)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Notification counters for user #{self.user_id}"
+
+    class Meta:
+        db_table = "notification_counters"
 
 
 # ---------------------------
@@ -445,3 +613,226 @@ class ChatMessage(models.Model):
     class Meta:
         db_table = "chat_messages"
         ordering = ["created_at"]
+
+
+# ---------------------------
+# Admin Dashboard Statistics Snapshot
+# ---------------------------
+class DashboardStats(models.Model):
+    """
+    Single-row snapshot of the admin dashboard counters.
+    Kept current by the model signals in signals.py (see dashboard_stats.py)
+    and fully recomputed by `python manage.py refresh_dashboard_stats`.
+    """
+    stats_id = models.AutoField(primary_key=True)
+
+    # Users
+    total_users = models.IntegerField(default=0)
+    users_sellers = models.IntegerField(default=0)
+    users_buyers = models.IntegerField(default=0)
+    users_admins = models.IntegerField(default=0)
+
+    # Properties
+    total_properties = models.IntegerField(default=0)
+    properties_available = models.IntegerField(default=0)
+    properties_sold = models.IntegerField(default=0)
+    properties_pending = models.IntegerField(default=0)
+    total_images = models.IntegerField(default=0)
+
+    # Bookings & transactions
+    total_bookings = models.IntegerField(default=0)
+    bookings_pending = models.IntegerField(default=0)
+    bookings_confirmed = models.IntegerField(default=0)
+    total_transactions = models.IntegerField(default=0)
+    transactions_success = models.IntegerField(default=0)
+    successful_purchases = models.IntegerField(default=0)
+    total_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    # Calendar-month counters, relative to stats_month
+    stats_month = models.DateField(null=True, blank=True)  # first day of the current month
+    monthly_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    prev_month_users = models.IntegerField(default=0)
+    prev_month_properties = models.IntegerField(default=0)
+
+    refreshed_at = models.DateTimeField(null=True, blank=True)  # last full reconcile
+    updated_at = models.DateTimeField(auto_now=True)  # last incremental change
+
+    def __str__(self):
+        return f"Dashboard stats (updated {self.updated_at})"
+
+    class Meta:
+        db_table = "dashboard_stats"
+
+
+class SupportTicketStats(models.Model):
+    """
+    Single-row snapshot of the support ticket counts by status, read by the
+    admin support tickets page when SUPPORT_TICKET_STATS_CACHED is on.
+    Kept current by ticket creation and status changes (support_tickets.py)
+    and fully recomputed by `python manage.py refresh_ticket_stats`.
+    """
+    stats_id = models.AutoField(primary_key=True)
+    total = models.IntegerField(default=0)
+    open = models.IntegerField(default=0)
+    in_progress = models.IntegerField(default=0)
+    resolved = models.IntegerField(default=0)
+    closed = models.IntegerField(default=0)
+    refreshed_at = models.DateTimeField(null=True, blank=True)  # last full reconcile
+    updated_at = models.DateTimeField(auto_now=True)  # last incremental change
+
+    def __str__(self):
+        return f"Support ticket stats (updated {self.updated_at})"
+
+    class Meta:
+        db_table = "support_ticket_stats"
+
+
+# ---------------------------
+# Property View Tracking
+# ---------------------------
+class PropertyViewDaily(models.Model):
+    """
+    Views of one property on one day, flushed in batches from the
+    in-process aggregator in property_views.py
+    """
+    stats_id = models.AutoField(primary_key=True)
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name="daily_views")
+    day = models.DateField()
+    views = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.views} views of property #{self.property_id} on {self.day}"
+
+    class Meta:
+        db_table = "property_view_daily"
+        constraints = [
+            models.UniqueConstraint(fields=["property", "day"], name="property_view_daily_uniq"),
+        ]
+
+
+class RecentPropertyView(models.Model):
+    """
+    A user's "recently viewed" ring: one row per (user, property), trimmed
+    to PROPERTY_VIEWS_RING_SIZE rows per user on each flush
+    """
+    recent_id = models.AutoField(primary_key=True)
+    user = models.ForeignKey(EstateUser, on_delete=models.CASCADE, related_name="recent_views")
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name="recent_views")
+    viewed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"User #{self.user_id} viewed property #{self.property_id}"
+
+    class Meta:
+        db_table = "recent_property_views"
+        constraints = [
+            models.UniqueConstraint(fields=["user", "property"], name="recent_view_user_property_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["user", "-viewed_at"], name="recent_view_user_time_idx"),
+            models.Index(fields=["-viewed_at"], name="recent_view_time_idx"),  # admin: latest across users
+        ]
+
+
+# ---------------------------
+# Seller Dashboard Daily Rollups
+# ---------------------------
+class SellerDailyStats(models.Model):
+    """
+    One row per seller per day with that day's activity on the seller's
+    listings. Kept current by the model signals in signals.py (see
+    seller_rollups.py) and rebuilt by `python manage.py refresh_seller_rollups`.
+    Counters describe rows that still exist, so summing every day gives
+    current totals (e.g. listings, pending bookings).
+    """
+    stats_id = models.AutoField(primary_key=True)
+    seller = models.ForeignKey(EstateUser, on_delete=models.CASCADE, related_name="daily_stats")
+    day = models.DateField()
+
+    listings_added = models.IntegerField(default=0)
+    images_added = models.IntegerField(default=0)
+    bookings_created = models.IntegerField(default=0)
+    bookings_pending = models.IntegerField(default=0)  # bookings made this day still pending
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    views = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Seller #{self.seller_id} on {self.day}"
+
+    class Meta:
+        db_table = "seller_daily_stats"
+        constraints = [
+            # Also the index for (seller, day range) reads
+            models.UniqueConstraint(fields=["seller", "day"], name="seller_daily_stats_seller_day_uniq"),
+        ]
+
+
+# ---------------------------
+# Background Job Queue
+# ---------------------------
+class BackgroundJob(models.Model):
+    """
+    A unit of deferred work (notifications, emails, file processing) run by
+    the DB-backed queue in jobs.py. Rows are inserted in the same transaction
+    as the request's writes and picked up by `python manage.py run_jobs`.
+    """
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    job_id = models.BigAutoField(primary_key=True)
+    task = models.CharField(max_length=100)  # registered task name
+    payload = models.JSONField(default=dict)  # {"args": [...], "kwargs": {...}}
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)  # not before (pushed back on retry)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)  # latest attempt
+    finished_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+
+    def __str__(self):
+        return f"Job #{self.job_id} {self.task} ({self.status})"
+
+    class Meta:
+        db_table = "background_jobs"
+        indexes = [
+            models.Index(fields=["status", "run_at"], name="job_status_run_at_idx"),
+        ]
+
+
+# ---------------------------
+# Content-addressed Media
+# ---------------------------
+class MediaBlob(models.Model):
+    """
+    One stored image file, named by its content hash (see media_store.py).
+    ref_count is the number of PropertyImage rows pointing at it; files of
+    unreferenced blobs are reclaimed by `python manage.py gc_media`.
+    """
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    path = models.CharField(max_length=255)  # storage name, e.g. images/ab/<sha256>.jpg
+    size = models.BigIntegerField(default=0)
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(default=timezone.now)  # last upload or reference change
+
+    def __str__(self):
+        return f"{self.path} ({self.ref_count} refs)"
+
+    class Meta:
+        db_table = "media_blobs"
+        indexes = [
+            models.Index(fields=["ref_count", "updated_at"], name="media_blob_gc_idx"),
+        ]
@@ -0,0 +1,211 @@
+"""
+Per-user Notification Counters for Estate Management System
+============================================================
+Keeps ``NotificationCounter`` rows exact so unread badges and the
+notifications API ETag are a single primary-key lookup instead of a
+``filter(is_read=False).count()`` over the user's notifications.
+
+Every change goes through an atomic ``UPDATE ... SET x = x + delta``:
+- created notifications: ``notification_created`` (notification_service)
+- read / read-all: ``notifications_read`` with the number of rows that
+  actually flipped from unread to read
+- deletions (direct or cascaded): the post_delete signals in signals.py
+
+A missing row is built from the notification tables on first use.
+``python manage.py repair_notification_counters`` recomputes all rows.
+"""
+
+import logging
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import BuyerNotification, EstateUser, NotificationCounter, SellerNotification
+
+logger = logging.getLogger(__name__)
+
+
+def _kind(role):
+    """Buyers use BuyerNotification; sellers and admins share SellerNotification"""
+    return "buyer" if role == "buyer" else "seller"
+
+
+def _empty_counts():
+    return {"seller_unread": 0, "buyer_unread": 0, "seller_latest_id": 0, "buyer_latest_id": 0}
+
+
+def _table(kind):
+    if kind == "buyer":
+        return BuyerNotification, "buyer_id"
+    return SellerNotification, "seller_id"
+
+
+def compute_counts(user_ids=None):
+    """
+    Unread counts and latest ids straight from the notification tables
+
+    Args:
+        user_ids: Restrict to these users (None for everyone)
+
+    Returns:
+        Dict of user_id -> counter field values
+    """
+    counts = {}
+    for kind in ("seller", "buyer"):
+        model, owner = _table(kind)
+        rows = model.objects.exclude(**{owner: None})
+        if user_ids is not None:
+            rows = rows.filter(**{f"{owner}__in": user_ids})
+        grouped = rows.order_by().values(owner).annotate(
+            unread=Count("notification_id", filter=Q(is_read=False)),
+            latest=Max("notification_id"),
+        )
+        for row in grouped:
+            values = counts.setdefault(row[owner], _empty_counts())
+            values[f"{kind}_unread"] = row["unread"]
+            values[f"{kind}_latest_id"] = row["latest"] or 0
+    return counts
+
+
+def get_counter(user_id):
+    """The user's counter row, built from the notification tables if missing"""
+    counter = NotificationCounter.objects.filter(user_id=user_id).first()
+    if counter is not None:
+        return counter
+
+    values = compute_counts([user_id]).get(user_id, _empty_counts())
+    try:
+        with transaction.atomic():
+            return NotificationCounter.objects.create(user_id=user_id, **values)
+    except IntegrityError:
+        # Created concurrently (or the user no longer exists)
+        return NotificationCounter.objects.filter(user_id=user_id).first() or NotificationCounter(user_id=user_id, **values)
+
+
+def _adjust(user_id, kind, unread_delta=0, latest_id=None, create_missing=True):
+    changes = {"version": F("version") + 1}
+    if unread_delta:
+        changes[f"{kind}_unread"] = F(f"{kind}_unread") + unread_delta
+    if latest_id is not None:
+        changes[f"{kind}_latest_id"] = Greatest(F(f"{kind}_latest_id"), latest_id)
+
+    updated = NotificationCounter.objects.filter(user_id=user_id).update(**changes)
+    if not updated and create_missing:
+        # No row yet: building it from the tables already includes this change
+        get_counter(user_id)
+
+
+def notification_created(user_id, role, notification_id):
+    """A new unread notification was stored for ``user_id``"""
+    _adjust(user_id, _kind(role), unread_delta=1, latest_id=notification_id)
+
+
+def notifications_created_bulk(user_ids, role):
+    """
+    One new unread notification was stored for each of ``user_ids``
+    (fan-out). Existing rows are updated with a single UPDATE; missing rows
+    are built from the tables in bulk.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    kind = _kind(role)
+    model, owner = _table(kind)
+    latest = Subquery(
+        model.objects.filter(**{owner: OuterRef("user_id")}).order_by("-notification_id").values("notification_id")[:1]
+    )
+    NotificationCounter.objects.filter(user_id__in=user_ids).update(**{
+        f"{kind}_unread": F(f"{kind}_unread") + 1,
+        f"{kind}_latest_id": Greatest(F(f"{kind}_latest_id"), Coalesce(latest, 0)),
+        "version": F("version") + 1,
+    })
+
+    missing = user_ids - set(NotificationCounter.objects.filter(user_id__in=user_ids).values_list("user_id", flat=True))
+    if missing:
+        counts = compute_counts(missing)
+        NotificationCounter.objects.bulk_create(
+            [NotificationCounter(user_id=user_id, **counts.get(user_id, _empty_counts())) for user_id in missing],
+            ignore_conflicts=True,
+        )
+
+
+def notifications_read(user_id, role, count):
+    """``count`` notifications of ``user_id`` flipped from unread to read"""
+    if count:
+        _adjust(user_id, _kind(role), unread_delta=-count)
+
+
+def notification_deleted(user_id, kind, was_unread):
+    """A notification row of ``user_id`` was deleted"""
+    if user_id is None:
+        return
+    # Never create a row here: during a cascaded user delete it would
+    # reference the user being deleted. A missing row is built on next read.
+    _adjust(user_id, kind, unread_delta=-1 if was_unread else 0, create_missing=False)
+
+
+# ===========================
+# Reads
+# ===========================
+
+def get_unread_count(user_id, role):
+    counter = get_counter(user_id)
+    return getattr(counter, f"{_kind(role)}_unread")
+
+
+def get_unread_counts(user_ids, role):
+    """Unread counts for many users in one query (users without a row are omitted)"""
+    field = f"{_kind(role)}_unread"
+    return dict(NotificationCounter.objects.filter(user_id__in=user_ids).values_list("user_id", field))
+
+
+def get_state(user_id, role):
+    """
+    Returns:
+        Tuple of (latest_notification_id, unread_count, version)
+    """
+    counter = get_counter(user_id)
+    kind = _kind(role)
+    return getattr(counter, f"{kind}_latest_id"), getattr(counter, f"{kind}_unread"), counter.version
+
+
+# ===========================
+# Repair
+# ===========================
+
+def repair_all():
+    """
+    Recompute every counter row in bulk (two grouped queries + one upsert)
+
+    Returns:
+        Tuple of (rows written, rows that had drifted)
+    """
+    counts = compute_counts()
+    existing = {counter.user_id: counter for counter in NotificationCounter.objects.all()}
+    valid_users = set(EstateUser.objects.filter(user_id__in=set(counts) | set(existing)).values_list("user_id", flat=True))
+
+    rows = []
+    drifted = 0
+    for user_id in valid_users:
+        values = counts.get(user_id, _empty_counts())
+        current = existing.get(user_id)
+        if current is not None:
+            # Latest ids are high-water marks (deleting the newest row does not lower them)
+            values["seller_latest_id"] = max(values["seller_latest_id"], current.seller_latest_id)
+            values["buyer_latest_id"] = max(values["buyer_latest_id"], current.buyer_latest_id)
+            if all(getattr(current, field) == value for field, value in values.items()):
+                continue
+            drifted += 1
+        version = (current.version + 1) if current is not None else 0
+        rows.append(NotificationCounter(user_id=user_id, version=version, **values))
+
+    NotificationCounter.objects.bulk_create(
+        rows,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["seller_unread", "buyer_unread", "seller_latest_id", "buyer_latest_id", "version"],
+    )
+    logger.info(f"✅ Notification counters repaired: {len(rows)} written, {drifted} drifted")
+    return len(rows), drifted
@@ -0,0 +1,124 @@
+"""
+Push Delivery for Notifications
+===============================
+Delivers new notifications to open dashboards as they are created, replacing
+the 30-second polling of ``get_notifications_api``.
+
+``NotificationConsumer`` (consumers.py) serves ``/ws/notifications/`` and
+joins the per-user group ``notifications_user_<id>`` on the Channels layer;
+``publish`` sends to that group after the current transaction commits. The
+default ``InMemoryChannelLayer`` needs no Redis but only reaches sockets
+served by the same process, so notifications written by ``run_jobs`` (a
+separate process) or pushed across several ASGI processes need the Redis
+layer (``CHANNEL_REDIS_URL``). A socket asks its page to re-fetch when it
+connects, which catches up on anything published while it was away.
+
+A WebSocket holds a connection open, so push is only offered by the ASGI
+app (estateproject/asgi.py). Under WSGI (gunicorn sync workers,
+PythonAnywhere) dashboards poll ``get_notifications_api`` instead,
+revalidating with its ETag (``push_context`` tells the template which one
+to use).
+
+Events are JSON objects: ``{"event": "notification", "notification": {...},
+"unread_count": n}`` or ``{"event": "refresh"}`` (client should re-fetch).
+"""
+
+import logging
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def push_supported(request):
+    """True when the request is served by the ASGI app, which can hold push connections"""
+    from django.core.handlers.asgi import ASGIRequest
+
+    return isinstance(request, ASGIRequest)
+
+
+def push_context(request):
+    """Template context processor: ``notification_push_enabled`` for notification_push.html"""
+    return {"notification_push_enabled": push_supported(request)}
+
+
+def user_group_name(user_id):
+    """Channels group for one user's notifications"""
+    return f"notifications_user_{user_id}"
+
+
+def serialize_notification(notification):
+    """Notification row -> the dict shape used by get_notifications_api"""
+    from .views import get_time_ago
+
+    data = {
+        "notification_id": notification.notification_id,
+        "title": notification.title,
+        "message": notification.message,
+        "type": notification.notification_type,
+        "is_read": notification.is_read,
+        "created_at": notification.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+        "time_ago": get_time_ago(notification.created_at),
+    }
+    if hasattr(notification, "support_ticket_id"):
+        data["ticket_id"] = notification.support_ticket_id
+    else:
+        data["property_id"] = notification.property_id
+        data["property_title"] = notification.property.title if notification.property_id else None
+        data["booking_id"] = notification.booking_id
+    return data
+
+
+# ===========================
+# Delivery
+# ===========================
+
+def shared_channel_layer():
+    """False when the Channels layer only reaches this process (InMemoryChannelLayer)"""
+    try:
+        from channels.layers import InMemoryChannelLayer, get_channel_layer
+    except ImportError:
+        return False
+    layer = get_channel_layer()
+    return layer is not None and not isinstance(layer, InMemoryChannelLayer)
+
+
+def _deliver_channels(user_id, event):
+    try:
+        from channels.layers import get_channel_layer
+    except ImportError:
+        return
+    if get_channel_layer() is None:
+        return
+    from .notifications.send import send_notification_to_group
+    send_notification_to_group(user_group_name(user_id), event)
+
+
+def _deliver(user_id, event):
+    try:
+        _deliver_channels(user_id, event)
+    except Exception as e:
+        logger.error(f"❌ Failed to push notification to user #{user_id}: {str(e)}")
+
+
+# ===========================
+# Publishing
+# ===========================
+
+def publish(user_id, event):
+    """Push an event to every open dashboard of ``user_id`` once the current transaction commits"""
+    transaction.on_commit(lambda: _deliver(user_id, event))
+
+
+def publish_notification(notification, user_id, unread_count=None):
+    """Push a newly created notification row to its recipient"""
+    try:
+        event = {
+            "event": "notification",
+            "notification": serialize_notification(notification),
+        }
+        if unread_count is not None:
+            event["unread_count"] = unread_count
+        publish(user_id, event)
+    except Exception as e:
+        logger.error(f"❌ Failed to publish notification #{notification.notification_id}: {str(e)}")
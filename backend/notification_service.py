@@ -7,6 +7,7 @@ Handles creation, delivery, and tracking of all system notifications.
 
 from django.utils import timezone
 from .models import SellerNotification, BuyerNotification, EstateUser, Property, Booking, SupportTicket
+from . import jobs, notification_counters, notification_push
 import logging
 
 logger = logging.getLogger(__name__)
@@ -50,6 +51,98 @@ class NotificationType:
     WELCOME = "welcome"
 
 
+# ===========================
+# Batched Fan-out
+# ===========================
+
+def fan_out_notifications(recipients, title, message, notification_type,
+                          property_obj=None, booking_obj=None, support_ticket=None, background=False):
+    """
+    Store the same notification for many recipients with one bulk_create per table
+    
+    Args:
+        recipients: Iterable of (user_id, role) pairs. Buyers get a BuyerNotification,
+                    sellers and admins a SellerNotification.
+        title: Notification title
+        message: Notification message
+        notification_type: Type of notification (use NotificationType constants)
+        property_obj: Related Property (seller/admin rows only, optional)
+        booking_obj: Related Booking (seller/admin rows only, optional)
+        support_ticket: Related SupportTicket (buyer rows only, optional)
+        background: Queue the write as a "notifications.fan_out" job after the
+                    current transaction commits (retried on failure)
+    
+    Returns:
+        List of created notification objects (empty when background=True)
+    """
+    from django.db import transaction
+    
+    recipients = list(dict.fromkeys((user_id, 'buyer' if role == 'buyer' else 'seller') for user_id, role in recipients))
+    if not recipients:
+        return []
+    
+    # Already inside a queued job: write inline so a failure retries that job
+    if background and jobs.current_job() is None:
+        jobs.enqueue_on_commit(
+            "notifications.fan_out", recipients, title, message, notification_type,
+            property_id=property_obj.property_id if property_obj else None,
+            booking_id=booking_obj.booking_id if booking_obj else None,
+            ticket_id=support_ticket.ticket_id if support_ticket else None
+        )
+        return []
+    
+    seller_ids = [user_id for user_id, kind in recipients if kind == 'seller']
+    buyer_ids = [user_id for user_id, kind in recipients if kind == 'buyer']
+    notifications = []
+    
+    with transaction.atomic():
+        if seller_ids:
+            seller_rows = SellerNotification.objects.bulk_create([
+                SellerNotification(
+                    seller_id=user_id,
+                    property=property_obj,
+                    booking=booking_obj,
+                    notification_type=notification_type,
+                    title=title,
+                    message=message,
+                    is_read=False
+                )
+                for user_id in seller_ids
+            ])
+            notification_counters.notifications_created_bulk(seller_ids, 'seller')
+            notifications.extend(('seller', row) for row in seller_rows)
+        
+        if buyer_ids:
+            buyer_rows = BuyerNotification.objects.bulk_create([
+                BuyerNotification(
+                    buyer_id=user_id,
+                    support_ticket=support_ticket,
+                    notification_type=notification_type,
+                    title=title,
+                    message=message,
+                    is_read=False
+                )
+                for user_id in buyer_ids
+            ])
+            notification_counters.notifications_created_bulk(buyer_ids, 'buyer')
+            notifications.extend(('buyer', row) for row in buyer_rows)
+    
+    # Push to open dashboards (after commit)
+    unread = {
+        'seller': notification_counters.get_unread_counts(seller_ids, 'seller') if seller_ids else {},
+        'buyer': notification_counters.get_unread_counts(buyer_ids, 'buyer') if buyer_ids else {},
+    }
+    for kind, notification in notifications:
+        user_id = notification.seller_id if kind == 'seller' else notification.buyer_id
+        if notification.notification_id is None:
+            # Backend without RETURNING (MySQL): ask the client to re-fetch
+            notification_push.publish(user_id, {"event": "refresh"})
+        else:
+            notification_push.publish_notification(notification, user_id, unread[kind].get(user_id))
+    
+    return [notification for _kind, notification in notifications]
+
+
 # ===========================
 # Core Notification Functions
 # ===========================
@@ -72,15 +165,10 @@ def create_seller_notification(seller_id, title, message, notification_type, pro
     try:
         seller = EstateUser.objects.get(user_id=seller_id, role='seller')
         
-        notification = SellerNotification.objects.create(
-            seller=seller,
-            property=property_obj,
-            booking=booking_obj,
-            notification_type=notification_type,
-            title=title,
-            message=message,
-            is_read=False
-        )
+        notification = fan_out_notifications(
+            [(seller.user_id, 'seller')], title, message, notification_type,
+            property_obj=property_obj, booking_obj=booking_obj
+        )[0]
         
         logger.info(f"✅ Seller notification created: {title} for seller #{seller_id}")
         return notification
@@ -110,14 +198,10 @@ def create_buyer_notification(buyer_id, title, message, notification_type, suppo
     try:
         buyer = EstateUser.objects.get(user_id=buyer_id, role='buyer')
         
-        notification = BuyerNotification.objects.create(
-            buyer=buyer,
-            support_ticket=support_ticket,
-            notification_type=notification_type,
-            title=title,
-            message=message,
-            is_read=False
-        )
+        notification = fan_out_notifications(
+            [(buyer.user_id, 'buyer')], title, message, notification_type,
+            support_ticket=support_ticket
+        )[0]
         
         logger.info(f"✅ Buyer notification created: {title} for buyer #{buyer_id}")
         return notification
@@ -130,38 +214,35 @@ def create_buyer_notification(buyer_id, title, message, notification_type, suppo
         return None
 
 
-def create_admin_notification(title, message, notification_type):
+def create_admin_notification(title, message, notification_type, background=False):
     """
-    Create notifications for all admin users
+    Create notifications for all admin users (one bulk insert for all admins)
     
     Args:
         title: Notification title
         message: Notification message
         notification_type: Type of notification
+        background: Queue the write as a job after commit
     
     Returns:
-        List of created notification objects
+        List of created notification objects (empty when background=True)
+        or None if failed
     """
-    notifications = []
     try:
-        admins = EstateUser.objects.filter(role='admin')
-        
-        for admin in admins:
-            notification = SellerNotification.objects.create(
-                seller=admin,  # Using SellerNotification for admins (reusing table)
-                notification_type=notification_type,
-                title=title,
-                message=message,
-                is_read=False
-            )
-            notifications.append(notification)
+        admin_ids = EstateUser.objects.filter(role='admin').values_list('user_id', flat=True)
+        
+        # Using SellerNotification for admins (reusing table)
+        notifications = fan_out_notifications(
+            [(admin_id, 'admin') for admin_id in admin_ids], title, message, notification_type,
+            background=background
+        )
         
         logger.info(f"✅ Admin notifications created: {title} for {len(notifications)} admins")
         return notifications
         
     except Exception as e:
         logger.error(f"❌ Failed to create admin notifications: {str(e)}")
-        return notifications
+        return None
 
 
 # ===========================
@@ -209,7 +290,8 @@ def notify_booking_confirmed(booking_id):
         admin_notifs = create_admin_notification(
             title="📋 Booking Confirmed",
             message=f"Seller {seller_name} confirmed booking for '{property_title}' by {booking.user.name}.",
-            notification_type=NotificationType.BOOKING_CONFIRMED
+            notification_type=NotificationType.BOOKING_CONFIRMED,
+            background=True
         )
         
         return {'buyer': buyer_notif, 'admins': admin_notifs}
@@ -340,7 +422,8 @@ def notify_property_added(property_id):
         return create_admin_notification(
             title="🏠 New Property Listed",
             message=f"{seller_name} added a new property: '{property_obj.title}' in {property_obj.location}.",
-            notification_type=NotificationType.PROPERTY_ADDED
+            notification_type=NotificationType.PROPERTY_ADDED,
+            background=True
         )
     except Exception as e:
         logger.error(f"❌ Property added notification failed: {str(e)}")
@@ -394,7 +477,8 @@ def notify_ticket_created(ticket_id):
         return create_admin_notification(
             title="🎫 New Support Ticket",
             message=f"{ticket.user.name} created ticket #{ticket.token_id}: '{ticket.subject}'. Priority: {ticket.priority}",
-            notification_type=NotificationType.TICKET_CREATED
+            notification_type=NotificationType.TICKET_CREATED,
+            background=True
         )
     except Exception as e:
         logger.error(f"❌ Ticket created notification failed: {str(e)}")
@@ -465,13 +549,14 @@ def mark_notification_read(notification_id, role):
     """Mark a notification as read"""
     try:
         if role == 'buyer':
-            notification = BuyerNotification.objects.get(notification_id=notification_id)
+            notifications, owner = BuyerNotification.objects.filter(notification_id=notification_id), 'buyer_id'
         else:
-            notification = SellerNotification.objects.get(notification_id=notification_id)
+            notifications, owner = SellerNotification.objects.filter(notification_id=notification_id), 'seller_id'
         
-        notification.is_read = True
-        notification.read_at = timezone.now()
-        notification.save()
+        user_id = notifications.values_list(owner, flat=True).first()
+        # Only an unread -> read flip changes the unread counter
+        flipped = notifications.filter(is_read=False).update(is_read=True, read_at=timezone.now())
+        notification_counters.notifications_read(user_id, role, flipped)
         
         logger.info(f"✅ Notification #{notification_id} marked as read")
         return True
@@ -494,6 +579,7 @@ def mark_all_notifications_read(user_id, role):
                 is_read=True,
                 read_at=timezone.now()
             )
+        notification_counters.notifications_read(user_id, role, count)
         
         logger.info(f"✅ Marked {count} notifications as read for user #{user_id}")
         return count
@@ -504,19 +590,27 @@ def mark_all_notifications_read(user_id, role):
 
 
 def get_unread_count(user_id, role):
-    """Get count of unread notifications"""
+    """Get count of unread notifications (from the per-user counter row)"""
     try:
-        if role == 'buyer':
-            return BuyerNotification.objects.filter(buyer_id=user_id, is_read=False).count()
-        else:
-            return SellerNotification.objects.filter(seller_id=user_id, is_read=False).count()
+        return notification_counters.get_unread_count(user_id, role)
     except Exception as e:
         logger.error(f"❌ Failed to get unread count: {str(e)}")
         return 0
 
 
+def get_notification_state(user_id, role):
+    """
+    Latest notification id, unread count and change version for a user,
+    read from the per-user counter row. Used to build the notifications API ETag.
+    
+    Returns:
+        Tuple of (latest_notification_id, unread_count, version)
+    """
+    return notification_counters.get_state(user_id, role)
+
+
 def delete_notification(notification_id, role):
-    """Delete a notification"""
+    """Delete a notification (counters are adjusted by the post_delete signal)"""
     try:
         if role == 'buyer':
             BuyerNotification.objects.filter(notification_id=notification_id).delete()
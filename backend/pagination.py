@@ -0,0 +1,170 @@
+"""
+Keyset (Cursor) Pagination for Estate Management System
+=======================================================
+Shared pagination for the admin listing pages and their JSON page APIs.
+
+Instead of OFFSET, each page continues from the sort key of the last row
+of the previous page (e.g. ``timestamp, log_id``), so fetching page 1000
+costs the same as page 1: one indexed range read of ``page_size + 1`` rows.
+
+Cursors are opaque URL-safe tokens; clients pass them back as ``?cursor=``.
+"""
+
+import base64
+import datetime
+import decimal
+import json
+
+from django.conf import settings
+from django.db import models
+
+
+DEFAULT_PAGE_SIZE = getattr(settings, "KEYSET_PAGE_SIZE", 50)
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token cannot be decoded for the given ordering"""
+
+
+# ===========================
+# Cursor Encoding
+# ===========================
+
+def _json_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(values):
+    """Encode a list of sort-key values into an opaque cursor token"""
+    raw = json.dumps([_json_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, model, keys):
+    """Decode a cursor token back into typed sort-key values"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Malformed cursor: {e}")
+
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise InvalidCursor("Cursor does not match this listing")
+
+    try:
+        return [
+            model._meta.get_field(key.lstrip("-")).to_python(value)
+            for key, value in zip(keys, values)
+        ]
+    except Exception as e:
+        raise InvalidCursor(f"Invalid cursor value: {e}")
+
+
+# ===========================
+# Paginator
+# ===========================
+
+def _after_condition(keys, values):
+    """
+    Build the "rows after this cursor" condition for a multi-column ordering.
+    For (-timestamp, -log_id) this is:
+        timestamp < t OR (timestamp = t AND log_id < id)
+    """
+    condition = models.Q()
+    equal_so_far = models.Q()
+    for key, value in zip(keys, values):
+        field = key.lstrip("-")
+        lookup = "lt" if key.startswith("-") else "gt"
+        condition |= equal_so_far & models.Q(**{f"{field}__{lookup}": value})
+        equal_so_far &= models.Q(**{field: value})
+    return condition
+
+
+class KeysetPage:
+    """One page of a keyset-paginated listing"""
+
+    def __init__(self, items, keys, page_size, has_next, cursor, params=None):
+        self.items = items
+        self.keys = keys
+        self.page_size = page_size
+        self.has_next = has_next
+        self.cursor = cursor
+        self.params = params
+        self.next_cursor = None
+        if has_next and items:
+            last = items[-1]
+            self.next_cursor = encode_cursor([getattr(last, key.lstrip("-")) for key in keys])
+
+    @property
+    def is_first(self):
+        return not self.cursor
+
+    @property
+    def next_query(self):
+        """Query string for the next page, keeping the current filters"""
+        if not self.next_cursor:
+            return ""
+        params = self.params.copy() if self.params is not None else {}
+        params["cursor"] = self.next_cursor
+        if hasattr(params, "urlencode"):
+            return params.urlencode()
+        from urllib.parse import urlencode
+        return urlencode(params)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def paginate_queryset(queryset, keys, cursor=None, page_size=DEFAULT_PAGE_SIZE, params=None):
+    """
+    Fetch one keyset page
+
+    Args:
+        queryset: Base queryset (filters applied, ordering is replaced)
+        keys: Ordering tuple ending in a unique column, e.g. ('-timestamp', '-log_id')
+        cursor: Opaque cursor from a previous page (None for the first page)
+        page_size: Rows per page (capped at MAX_PAGE_SIZE)
+        params: QueryDict of the current request, used to build next_query
+
+    Returns:
+        KeysetPage
+
+    Raises:
+        InvalidCursor: if the cursor is malformed
+    """
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+    queryset = queryset.order_by(*keys)
+    if cursor:
+        values = decode_cursor(cursor, queryset.model, keys)
+        queryset = queryset.filter(_after_condition(keys, values))
+
+    rows = list(queryset[:page_size + 1])
+    has_next = len(rows) > page_size
+    return KeysetPage(rows[:page_size], keys, page_size, has_next, cursor, params)
+
+
+def paginate_request(request, queryset, keys):
+    """
+    Paginate a listing from ``?cursor=`` and ``?page_size=`` request params.
+    An invalid cursor falls back to the first page.
+    """
+    try:
+        page_size = int(request.GET.get("page_size", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        page_size = DEFAULT_PAGE_SIZE
+
+    params = request.GET.copy()
+    params.pop("cursor", None)
+    cursor = request.GET.get("cursor") or None
+    try:
+        return paginate_queryset(queryset, keys, cursor, page_size, params)
+    except InvalidCursor:
+        return paginate_queryset(queryset, keys, None, page_size, params)
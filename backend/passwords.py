@@ -0,0 +1,236 @@
+"""
+Password Hashing for Estate Management System
+=============================================
+``EstateUser.password_hash`` used to hold the plaintext password. It now
+holds a Django hasher string (``PASSWORD_HASHERS``, PBKDF2 by default).
+Rows are migrated on login: a plaintext value is compared once, and on a
+match it is replaced by a hash. Hashes made with an outdated algorithm or
+iteration count are upgraded the same way.
+
+A slow hash is CPU-bound, so verifying it on the request thread would let
+a burst of logins tie up every WSGI worker. Hashing and verification run
+in a small process pool instead (``PASSWORD_POOL_SIZE`` processes). At most
+``PASSWORD_POOL_MAX_PENDING`` operations may be running or queued. Beyond
+that, and when a result takes longer than ``PASSWORD_POOL_TIMEOUT``,
+``PasswordPoolBusy`` is raised so the view can answer "try again" at once
+instead of piling up requests. ``PASSWORD_POOL_SIZE = 0`` hashes inline,
+still subject to the pending limit.
+
+Forgotten passwords are reset through a signed link
+(``make_reset_token`` / ``user_for_reset_token``) that expires after
+``PASSWORD_RESET_MAX_AGE`` seconds and stops working once the password
+changes, so the stored password is only replaced by whoever controls the
+account's mailbox.
+
+``python manage.py benchmark_password_hashing`` measures logins per second
+at several hasher costs.
+"""
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, identify_hasher, make_password
+from django.core import signing
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+logger = logging.getLogger(__name__)
+
+
+POOL_SIZE = getattr(settings, "PASSWORD_POOL_SIZE", 2)
+MAX_PENDING = getattr(settings, "PASSWORD_POOL_MAX_PENDING", 32)
+TIMEOUT = getattr(settings, "PASSWORD_POOL_TIMEOUT", 10)
+RESET_MAX_AGE = getattr(settings, "PASSWORD_RESET_MAX_AGE", 3600)
+
+RESET_SALT = "backend.passwords.reset"
+
+
+class PasswordPoolBusy(Exception):
+    """Too many password operations pending; the caller should ask the user to retry"""
+
+
+# ===========================
+# Hashing (runs in pool workers)
+# ===========================
+
+def is_hashed(encoded):
+    """True if ``encoded`` is a Django hasher string rather than a legacy plaintext password"""
+    try:
+        identify_hasher(encoded)
+    except ValueError:
+        return False
+    return True
+
+
+def _verify(raw, encoded, rehash=True):
+    """
+    Returns:
+        (matches, replacement hash or None). A replacement is returned for
+        legacy plaintext rows and for hashes the current settings would make
+        differently (e.g. more iterations).
+    """
+    if not encoded:
+        return False, None
+    if not is_hashed(encoded):
+        matches = constant_time_compare(raw, encoded)
+        return matches, make_password(raw) if matches and rehash else None
+
+    upgraded = []
+    matches = check_password(raw, encoded, setter=upgraded.append if rehash else None)
+    return matches, make_password(upgraded[0]) if upgraded else None
+
+
+def _hash(raw):
+    return make_password(raw)
+
+
+def _init_worker():
+    # Spawned workers start without Django; hashers need PASSWORD_HASHERS
+    import django
+    django.setup()
+
+
+# ===========================
+# Bounded Process Pool
+# ===========================
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn, not fork: web processes run background threads (jobs, activity log)
+            _executor = ProcessPoolExecutor(
+                max_workers=POOL_SIZE,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            logger.info(f"✅ Password hashing pool started ({POOL_SIZE} processes)")
+        return _executor
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _acquire():
+    global _pending
+    with _pending_lock:
+        if _pending >= MAX_PENDING:
+            logger.warning(f"⚠️ Password pool full ({MAX_PENDING} pending), rejecting request")
+            raise PasswordPoolBusy(f"{MAX_PENDING} password operations already pending")
+        _pending += 1
+
+
+def _release(_future=None):
+    global _pending
+    with _pending_lock:
+        _pending -= 1
+
+
+def _run(fn, *args):
+    _acquire()
+
+    if POOL_SIZE <= 0:
+        try:
+            return fn(*args)
+        finally:
+            _release()
+
+    try:
+        future = _get_executor().submit(fn, *args)
+    except BrokenProcessPool:
+        _release()
+        shutdown()
+        raise PasswordPoolBusy("password pool restarted")
+    except Exception:
+        _release()
+        raise
+    # The slot is held until the worker finishes, even if we stop waiting
+    future.add_done_callback(_release)
+
+    try:
+        return future.result(timeout=TIMEOUT)
+    except FutureTimeout:
+        logger.warning(f"⚠️ Password operation exceeded {TIMEOUT}s")
+        raise PasswordPoolBusy(f"password operation took longer than {TIMEOUT}s")
+    except BrokenProcessPool:
+        logger.error("❌ Password hashing pool crashed; restarting")
+        shutdown()
+        raise PasswordPoolBusy("password pool restarted")
+
+
+# ===========================
+# Public API
+# ===========================
+
+def verify_password(raw, encoded, rehash=True):
+    """
+    Check a password against a stored value (hash or legacy plaintext)
+
+    Returns:
+        (matches, replacement hash or None); store the replacement when given
+
+    Raises:
+        PasswordPoolBusy: Too many logins in flight
+    """
+    return _run(_verify, raw or "", encoded, rehash)
+
+
+def hash_password(raw):
+    """
+    Hash a new password with the preferred hasher
+
+    Raises:
+        PasswordPoolBusy: Too many logins in flight
+    """
+    return _run(_hash, raw)
+
+
+def pending():
+    """Operations currently running or queued (for stats/benchmarks)"""
+    return _pending
+
+
+# ===========================
+# Reset Links
+# ===========================
+
+def _hash_fingerprint(encoded):
+    # Binds a token to the password it replaces: any password change invalidates it
+    return salted_hmac(RESET_SALT, encoded or "").hexdigest()[:20]
+
+
+def make_reset_token(user):
+    """Signed token for a password reset link (expires after PASSWORD_RESET_MAX_AGE seconds)"""
+    return signing.dumps({"user": user.user_id, "hash": _hash_fingerprint(user.password_hash)}, salt=RESET_SALT)
+
+
+def user_for_reset_token(token):
+    """
+    Returns:
+        The EstateUser the reset token was issued for, or None if it is
+        invalid, expired or already used (the password has changed since)
+    """
+    from .models import EstateUser
+
+    try:
+        payload = signing.loads(token, salt=RESET_SALT, max_age=RESET_MAX_AGE)
+    except signing.BadSignature:  # includes SignatureExpired
+        return None
+    user = EstateUser.objects.filter(user_id=payload.get("user")).first()
+    if user is None or not constant_time_compare(payload.get("hash", ""), _hash_fingerprint(user.password_hash)):
+        return None
+    return user
@@ -0,0 +1,221 @@
+"""
+Faceted Property Search for Estate Management System
+====================================================
+Filters available properties and returns facet counts by property type,
+city, bedrooms, bathrooms and price bucket.
+
+All facet counts come from ONE grouped query: the base result set (status,
+text query, price range) is grouped by every facet dimension at once and the
+per-facet counts are rolled up in Python. Counts are disjunctive - each
+facet ignores its own selection, so picking "House" still shows how many
+Apartments match the other filters.
+"""
+
+from django.db import models
+from django.db.models import Case, Count, Value, When
+
+from .models import Property
+from . import property_search_helper
+
+
+# (key, label, min_price inclusive, max_price exclusive)
+PRICE_BUCKETS = [
+    ("under_25l", "Under ₹25L", None, 2500000),
+    ("25l_50l", "₹25L - ₹50L", 2500000, 5000000),
+    ("50l_1cr", "₹50L - ₹1Cr", 5000000, 10000000),
+    ("1cr_2cr", "₹1Cr - ₹2Cr", 10000000, 20000000),
+    ("above_2cr", "Above ₹2Cr", 20000000, None),
+]
+
+# Bedrooms/bathrooms at or above these values are grouped as "N+"
+BEDROOMS_CAP = 5
+BATHROOMS_CAP = 4
+
+FACET_NAMES = ("property_type", "city", "bedrooms", "bathrooms", "price_bucket")
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def _to_number(value, cast=float):
+    try:
+        return cast(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_filters(params):
+    """Read facet filters from request.GET (or any dict-like)"""
+    return {
+        "query": (params.get("q") or "").strip(),
+        "property_type": (params.get("type") or "").strip(),
+        "city": (params.get("city") or "").strip(),
+        "min_price": _to_number(params.get("min_price")),
+        "max_price": _to_number(params.get("max_price")),
+        "bedrooms": _to_number(params.get("bedrooms"), int),
+        "bathrooms": _to_number(params.get("bathrooms"), int),
+        "price_bucket": (params.get("price_bucket") or "").strip(),
+    }
+
+
+def _price_bucket_expression():
+    whens = []
+    for key, _label, low, high in PRICE_BUCKETS:
+        condition = models.Q()
+        if low is not None:
+            condition &= models.Q(price__gte=low)
+        if high is not None:
+            condition &= models.Q(price__lt=high)
+        whens.append(When(condition, then=Value(key)))
+    return Case(*whens, output_field=models.CharField())
+
+
+def _capped(value, cap):
+    if value is None:
+        return None
+    return cap if value >= cap else value
+
+
+def _base_queryset(filters):
+    """Filters that apply to results AND every facet count (evaluated in SQL)"""
+    properties = Property.objects.filter(status=Property.STATUS_AVAILABLE)
+    if filters["query"]:
+        properties = property_search_helper.search_properties(properties, filters["query"])
+    if filters["min_price"] is not None:
+        properties = properties.filter(price__gte=filters["min_price"])
+    if filters["max_price"] is not None:
+        properties = properties.filter(price__lte=filters["max_price"])
+    return properties
+
+
+def filter_results(filters):
+    """Property queryset with every filter applied (the result list)"""
+    properties = _base_queryset(filters)
+    if filters["property_type"]:
+        properties = properties.filter(property_type__iexact=filters["property_type"])
+    if filters["city"]:
+        properties = properties.filter(city__icontains=filters["city"])
+    if filters["bedrooms"] is not None:
+        if filters["bedrooms"] >= BEDROOMS_CAP:
+            properties = properties.filter(bedrooms__gte=BEDROOMS_CAP)
+        else:
+            properties = properties.filter(bedrooms=filters["bedrooms"])
+    if filters["bathrooms"] is not None:
+        if filters["bathrooms"] >= BATHROOMS_CAP:
+            properties = properties.filter(bathrooms__gte=BATHROOMS_CAP)
+        else:
+            properties = properties.filter(bathrooms=filters["bathrooms"])
+    if filters["price_bucket"]:
+        for key, _label, low, high in PRICE_BUCKETS:
+            if key == filters["price_bucket"]:
+                if low is not None:
+                    properties = properties.filter(price__gte=low)
+                if high is not None:
+                    properties = properties.filter(price__lt=high)
+                break
+    return properties
+
+
+def _group_matches(group, filters, skip):
+    """Does a facet group row satisfy every facet filter except ``skip``?"""
+    if skip != "property_type" and filters["property_type"]:
+        if (group["property_type"] or "").lower() != filters["property_type"].lower():
+            return False
+    if skip != "city" and filters["city"]:
+        if filters["city"].lower() not in (group["city"] or "").lower():
+            return False
+    if skip != "bedrooms" and filters["bedrooms"] is not None:
+        if _capped(group["bedrooms"], BEDROOMS_CAP) != _capped(filters["bedrooms"], BEDROOMS_CAP):
+            return False
+    if skip != "bathrooms" and filters["bathrooms"] is not None:
+        if _capped(group["bathrooms"], BATHROOMS_CAP) != _capped(filters["bathrooms"], BATHROOMS_CAP):
+            return False
+    if skip != "price_bucket" and filters["price_bucket"]:
+        if group["price_bucket"] != filters["price_bucket"]:
+            return False
+    return True
+
+
+def compute_facets(filters):
+    """
+    Facet counts for the current filters in a single grouped query
+
+    Returns:
+        Dict of facet name -> list of {'value', 'label', 'count', 'selected'}
+    """
+    groups = list(
+        _base_queryset(filters)
+        .order_by()
+        .annotate(price_bucket=_price_bucket_expression())
+        .values("property_type", "city", "bedrooms", "bathrooms", "price_bucket")
+        .annotate(count=Count("property_id"))
+    )
+
+    counts = {name: {} for name in FACET_NAMES}
+    for group in groups:
+        keys = {
+            "property_type": group["property_type"],
+            "city": group["city"],
+            "bedrooms": _capped(group["bedrooms"], BEDROOMS_CAP),
+            "bathrooms": _capped(group["bathrooms"], BATHROOMS_CAP),
+            "price_bucket": group["price_bucket"],
+        }
+        for name in FACET_NAMES:
+            if keys[name] is None or keys[name] == "":
+                continue
+            if _group_matches(group, filters, skip=name):
+                counts[name][keys[name]] = counts[name].get(keys[name], 0) + group["count"]
+
+    facets = {}
+    for name in ("property_type", "city"):
+        selected = (filters[name] or "").lower()
+        facets[name] = [
+            {"value": value, "label": value, "count": count, "selected": value.lower() == selected}
+            for value, count in sorted(counts[name].items(), key=lambda item: (-item[1], item[0]))
+        ]
+    for name, cap in (("bedrooms", BEDROOMS_CAP), ("bathrooms", BATHROOMS_CAP)):
+        selected = _capped(filters[name], cap)
+        facets[name] = [
+            {"value": value, "label": f"{value}+" if value == cap else str(value), "count": count, "selected": value == selected}
+            for value, count in sorted(counts[name].items())
+        ]
+    facets["price_bucket"] = [
+        {"value": key, "label": label, "count": counts["price_bucket"].get(key, 0), "selected": key == filters["price_bucket"]}
+        for key, label, _low, _high in PRICE_BUCKETS
+    ]
+    return facets
+
+
+def faceted_search(params, page=1, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Run a faceted search
+
+    Args:
+        params: request.GET style mapping (q, type, city, min_price, max_price,
+                bedrooms, bathrooms, price_bucket)
+        page: 1-based page number
+        page_size: results per page (capped at MAX_PAGE_SIZE)
+
+    Returns:
+        Dict with 'filters', 'facets', 'total', 'page', 'page_size' and
+        'results' (list of Property objects with images prefetched)
+    """
+    filters = parse_filters(params)
+    page = max(1, page)
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+
+    facets = compute_facets(filters)
+    # Total is the sum of one facet with every filter applied - no extra COUNT
+    total = sum(item["count"] for item in facets["price_bucket"] if not filters["price_bucket"] or item["selected"])
+
+    results = filter_results(filters).prefetch_related("images").order_by("price", "property_id")
+    offset = (page - 1) * page_size
+
+    return {
+        "filters": filters,
+        "facets": facets,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "results": list(results[offset:offset + page_size]),
+    }
@@ -0,0 +1,245 @@
+"""
+Property Full-Text Search for Estate Management System
+======================================================
+Inverted-index search over the Property text fields (title, location, city,
+state, property_type, description, amenities) used by the buyer quick search
+and the dashboard search box.
+
+Backends:
+- SQLite: FTS5 virtual table ``property_search_fts`` ranked with BM25.
+  Kept in sync by the Property signals in ``backend/signals.py``.
+- PostgreSQL: GIN index over a ``to_tsvector`` expression, ranked with ts_rank_cd.
+- MySQL: FULLTEXT index over the same columns, ranked with MATCH ... AGAINST.
+- Anything else: the old ``__icontains`` OR filter.
+
+Set ``PROPERTY_SEARCH_BACKEND`` in settings to a dotted class path to plug in
+a different backend. Rebuild the index with ``python manage.py rebuild_search_index``.
+"""
+
+import logging
+import re
+
+from django.conf import settings
+from django.db import connection, models
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import Property
+
+logger = logging.getLogger(__name__)
+
+
+# Indexed fields, in the column order of the FTS table / FULLTEXT index
+SEARCH_FIELDS = (
+    "title",
+    "location",
+    "city",
+    "state",
+    "property_type",
+    "description",
+    "amenities",
+)
+
+# BM25 column weights (same order as SEARCH_FIELDS) - a title hit counts most
+SEARCH_WEIGHTS = (10.0, 4.0, 4.0, 3.0, 3.0, 1.0, 2.0)
+
+FTS_TABLE = "property_search_fts"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize_query(query):
+    """Split a raw search box string into lowercase word tokens"""
+    return [token.lower() for token in _TOKEN_RE.findall(query or "")]
+
+
+# ===========================
+# Search Backends
+# ===========================
+
+class LikeSearchBackend:
+    """Fallback backend: OR together ``__icontains`` filters (full table scan)"""
+
+    def search(self, queryset, query):
+        """Filter ``queryset`` to properties matching ``query``"""
+        condition = models.Q()
+        for field in SEARCH_FIELDS:
+            condition |= models.Q(**{f"{field}__icontains": query})
+        return queryset.filter(condition)
+
+    def index_property(self, property_obj):
+        """Add or refresh a single property in the index"""
+
+    def remove_property(self, property_id):
+        """Drop a single property from the index"""
+
+    def rebuild(self):
+        """Rebuild the whole index, returns number of indexed properties"""
+        return Property.objects.count()
+
+
+class SQLiteFTS5Backend(LikeSearchBackend):
+    """SQLite FTS5 inverted index ranked with bm25()"""
+
+    def build_match(self, query):
+        """Build an FTS5 MATCH expression: every token as a prefix term (AND)"""
+        tokens = tokenize_query(query)
+        return " ".join(f'"{token}"*' for token in tokens)
+
+    def search(self, queryset, query):
+        match = self.build_match(query)
+        if not match:
+            return super().search(queryset, query)
+
+        weights = ", ".join(str(w) for w in SEARCH_WEIGHTS)
+        table = queryset.model._meta.db_table
+        pk_column = queryset.model._meta.pk.column
+        # The IN subquery drives a rowid lookup on properties, so bm25() is
+        # only evaluated for rows the index already matched.
+        rank_sql = (
+            f"SELECT bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.{pk_column}"
+        )
+        return queryset.filter(
+            property_id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        ).annotate(
+            search_rank=RawSQL(rank_sql, [match], output_field=models.FloatField())
+        ).order_by("search_rank")
+
+    def _row(self, property_obj):
+        return [property_obj.property_id] + [getattr(property_obj, field) or "" for field in SEARCH_FIELDS]
+
+    def index_property(self, property_obj):
+        columns = ", ".join(SEARCH_FIELDS)
+        placeholders = ", ".join(["%s"] * (len(SEARCH_FIELDS) + 1))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [property_obj.property_id])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, {columns}) VALUES ({placeholders})",
+                self._row(property_obj),
+            )
+
+    def remove_property(self, property_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [property_id])
+
+    def rebuild(self):
+        columns = ", ".join(SEARCH_FIELDS)
+        source = ", ".join(f"COALESCE({field}, '')" for field in SEARCH_FIELDS)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, {columns}) "
+                f"SELECT property_id, {source} FROM {Property._meta.db_table}"
+            )
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+            cursor.execute(f"SELECT COUNT(*) FROM {FTS_TABLE}")
+            return cursor.fetchone()[0]
+
+
+class PostgresSearchBackend(LikeSearchBackend):
+    """PostgreSQL tsvector search backed by the properties_search_gin index"""
+
+    # Must match the expression of the GIN index created in migration 0023
+    DOCUMENT_SQL = (
+        "to_tsvector('simple', "
+        + " || ' ' || ".join(f"coalesce({field}, '')" for field in SEARCH_FIELDS)
+        + ")"
+    )
+
+    def search(self, queryset, query):
+        tokens = tokenize_query(query)
+        if not tokens:
+            return super().search(queryset, query)
+
+        tsquery = " & ".join(f"{token}:*" for token in tokens)
+        return queryset.extra(
+            where=[f"{self.DOCUMENT_SQL} @@ to_tsquery('simple', %s)"],
+            params=[tsquery],
+        ).annotate(
+            search_rank=RawSQL(
+                f"ts_rank_cd({self.DOCUMENT_SQL}, to_tsquery('simple', %s))",
+                [tsquery],
+                output_field=models.FloatField(),
+            )
+        ).order_by("-search_rank")
+
+
+class MySQLFullTextBackend(LikeSearchBackend):
+    """MySQL FULLTEXT search backed by the properties_search_ft index"""
+
+    MATCH_SQL = f"MATCH ({', '.join(SEARCH_FIELDS)}) AGAINST (%s IN BOOLEAN MODE)"
+
+    def search(self, queryset, query):
+        tokens = tokenize_query(query)
+        if not tokens:
+            return super().search(queryset, query)
+
+        against = " ".join(f"+{token}*" for token in tokens)
+        return queryset.extra(
+            where=[self.MATCH_SQL],
+            params=[against],
+        ).annotate(
+            search_rank=RawSQL(self.MATCH_SQL, [against], output_field=models.FloatField())
+        ).order_by("-search_rank")
+
+
+VENDOR_BACKENDS = {
+    "sqlite": SQLiteFTS5Backend,
+    "postgresql": PostgresSearchBackend,
+    "mysql": MySQLFullTextBackend,
+}
+
+_backend = None
+
+
+def get_search_backend():
+    """Return the configured search backend (cached per process)"""
+    global _backend
+    if _backend is None:
+        backend_path = getattr(settings, "PROPERTY_SEARCH_BACKEND", None)
+        if backend_path:
+            backend_class = import_string(backend_path)
+        else:
+            backend_class = VENDOR_BACKENDS.get(connection.vendor, LikeSearchBackend)
+        _backend = backend_class()
+    return _backend
+
+
+# ===========================
+# Public Helpers
+# ===========================
+
+def search_properties(queryset, query):
+    """
+    Full-text filter a Property queryset, best matches first
+
+    Args:
+        queryset: Property queryset (other filters may be applied before or after)
+        query: Raw search string from the user
+
+    Returns:
+        Queryset annotated with ``search_rank`` and ordered by relevance
+    """
+    return get_search_backend().search(queryset, query)
+
+
+def index_property(property_obj):
+    """Refresh one property in the search index (called from post_save)"""
+    try:
+        get_search_backend().index_property(property_obj)
+    except Exception as e:
+        logger.error(f"❌ Failed to index property #{property_obj.property_id}: {str(e)}")
+
+
+def remove_property(property_id):
+    """Remove one property from the search index (called from post_delete)"""
+    try:
+        get_search_backend().remove_property(property_id)
+    except Exception as e:
+        logger.error(f"❌ Failed to remove property #{property_id} from index: {str(e)}")
+
+
+def rebuild_index():
+    """Rebuild the full search index, returns number of indexed properties"""
+    return get_search_backend().rebuild()
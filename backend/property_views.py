@@ -0,0 +1,266 @@
+"""
+Property View Tracking for Estate Management System
+===================================================
+"Views" used to be guessed from ``Log.action`` text: ``logs_html?recent=1``
+regex-parsed "property <id>" out of log rows and the seller dashboard
+counted ``action__icontains='property'``. Views are now recorded as events
+with ``record_view(property_id, user_id)``:
+
+- the call only appends to an in-process buffer (no query, no I/O)
+- a background thread flushes every ``PROPERTY_VIEWS_FLUSH_INTERVAL``
+  seconds (or at ``PROPERTY_VIEWS_BATCH_SIZE`` pending events):
+    * ``PropertyViewDaily``: one ``views = views + n`` per (property, day)
+    * ``SellerDailyStats.views`` for the listing's seller (seller_rollups.py);
+      an owner viewing their own listing is not counted
+    * ``RecentPropertyView``: each user's "recently viewed" ring, one upsert
+      per batch, trimmed to ``PROPERTY_VIEWS_RING_SIZE`` per user
+
+A logged-in user opening the same listing again within one flush window
+counts once. Events still buffered when a process is killed are lost (view
+counts are statistics, so unlike activity_log.py there is no journal); a
+normal shutdown flushes them.
+
+Set ``PROPERTY_VIEWS_ASYNC = False`` to write on every call (tests, scripts).
+"""
+
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.db.models import F, Prefetch, Sum
+from django.utils import timezone
+
+from .models import EstateUser, Property, PropertyImage, PropertyViewDaily, RecentPropertyView
+
+logger = logging.getLogger(__name__)
+
+
+FLUSH_INTERVAL = getattr(settings, "PROPERTY_VIEWS_FLUSH_INTERVAL", 5.0)
+BATCH_SIZE = getattr(settings, "PROPERTY_VIEWS_BATCH_SIZE", 1000)
+RING_SIZE = getattr(settings, "PROPERTY_VIEWS_RING_SIZE", 20)
+ASYNC_ENABLED = getattr(settings, "PROPERTY_VIEWS_ASYNC", True)
+
+PropertyView = namedtuple("PropertyView", ["property_id", "user_id", "viewed_at"])
+
+
+# ===========================
+# Writing a Batch
+# ===========================
+
+def _increment(model, filters, field, count):
+    """``field = field + count`` on the row matching ``filters``, creating it if missing"""
+    if model.objects.filter(**filters).update(**{field: F(field) + count}):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**filters, **{field: count})
+    except IntegrityError:
+        model.objects.filter(**filters).update(**{field: F(field) + count})
+
+
+def _write_batch(views):
+    """
+    Persist one batch of PropertyView events
+
+    Returns:
+        Number of events written
+    """
+    if not views:
+        return 0
+    from . import seller_rollups
+
+    owners = dict(
+        Property.objects.filter(property_id__in={view.property_id for view in views})
+        .values_list("property_id", "user_id")
+    )
+    daily = defaultdict(int)
+    per_seller = defaultdict(int)
+    latest = {}
+    for view in views:
+        if view.property_id not in owners:
+            continue  # property deleted meanwhile
+        if view.user_id is not None:
+            key = (view.user_id, view.property_id)
+            if key not in latest or latest[key] < view.viewed_at:
+                latest[key] = view.viewed_at
+        owner_id = owners[view.property_id]
+        if view.user_id is not None and view.user_id == owner_id:
+            continue  # sellers looking at their own listing
+        day = timezone.localtime(view.viewed_at).date()
+        daily[(view.property_id, day)] += 1
+        if owner_id is not None:
+            per_seller[(owner_id, day)] += 1
+
+    with transaction.atomic():
+        for (property_id, day), count in daily.items():
+            _increment(PropertyViewDaily, {"property_id": property_id, "day": day}, "views", count)
+        seller_rollups.add_views(per_seller)
+        _update_rings(latest)
+    return len(views)
+
+
+def _update_rings(latest):
+    # Drop viewers deleted meanwhile up front: FK checks are deferred to
+    # commit, so a missing user would fail the whole batch, not this insert
+    existing = set(
+        EstateUser.objects.filter(user_id__in={user_id for user_id, _property_id in latest})
+        .values_list("user_id", flat=True)
+    )
+    latest = {key: viewed_at for key, viewed_at in latest.items() if key[0] in existing}
+    if not latest:
+        return
+    RecentPropertyView.objects.bulk_create(
+        [
+            RecentPropertyView(user_id=user_id, property_id=property_id, viewed_at=viewed_at)
+            for (user_id, property_id), viewed_at in latest.items()
+        ],
+        update_conflicts=True, unique_fields=["user", "property"], update_fields=["viewed_at"]
+    )
+    for user_id in {user_id for user_id, _property_id in latest}:
+        stale = list(
+            RecentPropertyView.objects.filter(user_id=user_id).order_by("-viewed_at")
+            .values_list("recent_id", flat=True)[RING_SIZE:]
+        )
+        if stale:
+            RecentPropertyView.objects.filter(recent_id__in=stale).delete()
+
+
+# ===========================
+# Aggregator
+# ===========================
+
+class ViewAggregator:
+    """Per-process view buffer + background flush thread"""
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL, batch_size=BATCH_SIZE):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.pid = os.getpid()
+        self.views = []
+        self.seen = set()  # (user_id, property_id) already counted in this window
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopping = False
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="property-view-flusher", daemon=True)
+        self.thread.start()
+        atexit.register(self.stop)
+
+    def add(self, view):
+        with self.lock:
+            if view.user_id is not None:
+                key = (view.user_id, view.property_id)
+                if key in self.seen:
+                    return
+                self.seen.add(key)
+            self.views.append(view)
+            pending = len(self.views)
+        if pending >= self.batch_size:
+            self.wakeup.set()
+
+    def pending(self):
+        with self.lock:
+            return list(self.views)
+
+    def flush(self):
+        """Write everything buffered so far, returns number of events written"""
+        with self.flush_lock:
+            with self.lock:
+                views, self.views, self.seen = self.views, [], set()
+            if not views:
+                return 0
+            try:
+                return _write_batch(views)
+            except Exception as e:
+                logger.error(f"❌ Property view flush failed, {len(views)} views dropped: {str(e)}")
+                return 0
+
+    def _run(self):
+        while not self.stopping:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            try:
+                close_old_connections()
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ Property view flusher error: {str(e)}")
+        connection.close()
+
+    def stop(self):
+        """Flush remaining views on shutdown"""
+        if self.stopping:
+            return
+        self.stopping = True
+        self.wakeup.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+
+_aggregator = None
+_aggregator_lock = threading.Lock()
+
+
+def get_aggregator():
+    """Return this process's aggregator, starting it on first use (and after fork)"""
+    global _aggregator
+    if _aggregator is None or _aggregator.pid != os.getpid():
+        with _aggregator_lock:
+            if _aggregator is None or _aggregator.pid != os.getpid():
+                aggregator = ViewAggregator()
+                aggregator.start()
+                _aggregator = aggregator
+    return _aggregator
+
+
+# ===========================
+# Public Helpers
+# ===========================
+
+def record_view(property_id, user_id=None):
+    """
+    Record that a property was viewed (cheap: in-memory until the next flush)
+
+    Args:
+        property_id: Viewed property
+        user_id: Viewer (None for anonymous visitors; no recently-viewed entry)
+    """
+    view = PropertyView(int(property_id), user_id, timezone.now())
+    if not ASYNC_ENABLED:
+        _write_batch([view])
+        return
+    get_aggregator().add(view)
+
+
+def flush():
+    """Write this process's buffered views now (e.g. before reading them back)"""
+    if _aggregator is not None and _aggregator.pid == os.getpid():
+        return _aggregator.flush()
+    return 0
+
+
+def recently_viewed(user_id=None, limit=RING_SIZE):
+    """
+    Latest RecentPropertyView rows, newest first, with property, seller and
+    images loaded. ``user_id=None`` lists the latest views across all users.
+    """
+    rows = RecentPropertyView.objects.select_related("property", "property__user", "user")
+    if user_id is not None:
+        rows = rows.filter(user_id=user_id)
+    images = Prefetch("property__images", queryset=PropertyImage.objects.order_by("image_id"))
+    return list(rows.prefetch_related(images).order_by("-viewed_at")[:limit])
+
+
+def view_counts(property_ids, since=None):
+    """{property_id: views} for the given properties (optionally from ``since`` date on)"""
+    rows = PropertyViewDaily.objects.filter(property_id__in=property_ids)
+    if since is not None:
+        rows = rows.filter(day__gte=since)
+    return dict(rows.values("property_id").annotate(total=Sum("views")).values_list("property_id", "total"))
@@ -0,0 +1,274 @@
+"""
+Query Budgets for Estate Management System
+==========================================
+Regression harness for N+1 queries, run with
+``python manage.py check_query_budgets``.
+
+Every named URL in backend/urls.py is requested (GET, as the role that
+uses it) at two fixture sizes. ``seed_fixtures(size)`` gives one seller,
+buyer and admin ``size`` properties, bookings, tickets, reviews,
+notifications, ... each. For every endpoint the SQL queries run on the
+request thread are counted and grouped by signature (the statement with its
+literals replaced by ``?``), so a repeated query shows up as one signature
+with a count.
+
+An endpoint fails when:
+
+- it runs more queries at the larger size than at the smaller one (the
+  count depends on the data: a query per row somewhere), or
+- it runs more queries than its budget (``BUDGETS``, else ``DEFAULT_BUDGET``)
+
+Endpoints in ``KNOWN_GROWTH`` are reported but do not fail the run.
+
+Endpoints that change data, never finish or need files on GET are listed in
+``SKIP``.
+"""
+
+from collections import Counter, namedtuple
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+from .benchmarks import logged_in_client
+from .query_inspector import fingerprint
+from .models import (
+    Booking, BuyerNotification, ChatConversation, ChatMessage, EstateUser, Log, PaymentHistory,
+    Property, PropertyImage, PropertyReview, SavedProperty, SellerNotification, SupportTicket,
+    TicketResponse, Transaction,
+)
+from .synthetic_data import SYNTHETIC_EMAIL_DOMAIN, SYNTHETIC_PASSWORD
+
+
+DEFAULT_SIZES = (5, 25)
+DEFAULT_BUDGET = 15
+
+# Declared per-endpoint query budgets (at the larger fixture size)
+BUDGETS = {
+    "dashboard": 6,
+    "seller_dashboard": 6,
+    "buyer_dashboard": 10,
+    "get_notifications_api": 6,
+    "buyer_quick_search_api": 6,
+    "buyer_property_facets_api": 8,
+    "dashboard_search_api": 12,
+    "buyer_support_tickets_api": 6,
+    "buyer_reviewable_properties_api": 6,
+    "buyer_saved_properties_api": 6,
+    "bookings": 10,
+    "logs": 8,
+}
+
+# Known data-dependent endpoints still to fix: reported as warnings, not failures.
+# Remove an entry once the endpoint is fixed so regressions fail again.
+KNOWN_GROWTH = {}
+
+# Not requested: they change data on GET or stream forever
+SKIP = {
+    "logout": "ends the session",
+    "delete_user": "deletes a user on GET",
+    "mark_notification_read": "changes data on GET",
+    "mark_all_notifications_read": "changes data on GET",
+    "admin_profile_download": "needs a saved profile file",
+    "reset_password": "needs a signed reset token",
+}
+
+# Role per endpoint where the URL does not say (None = anonymous visitor)
+ROLES = {
+    "login": None,
+    "signup": None,
+    "forgot_password": None,
+    "profile": "buyer",
+    "record_property_view_api": "buyer",
+    "get_notifications_api": "seller",
+    "get_property_images_api": "seller",
+    "delete_property_image_api": "seller",
+    "upload_property_images_api": "seller",
+    "update_booking_status": "seller",
+    "update_property_api": "seller",
+    "chatbot_message_api": "buyer",
+    "chatbot_history_api": "buyer",
+    "chatbot_feedback_api": "buyer",
+    "chatbot_clear_history_api": "buyer",
+    "chatbot_property_summary_api": "buyer",
+}
+
+QUERY_STRINGS = {
+    "buyer_quick_search_api": "q=Villa",
+    "dashboard_search_api": "q=Fixture",
+    "chatbot_property_summary_api": "property_id={property_id}",
+}
+
+# URL kwarg -> fixture key
+URL_ARGS = {
+    "property_id": "property_id",
+    "booking_id": "booking_id",
+    "user_id": "other_user_id",
+    "saved_id": "saved_id",
+    "notification_id": "notification_id",
+    "image_id": "image_id",
+    "listing": "listing",
+}
+
+Endpoint = namedtuple("Endpoint", ["name", "role", "url"])
+
+
+# ===========================
+# Fixtures
+# ===========================
+
+def seed_fixtures(size):
+    """
+    One seller, buyer and admin with ``size`` rows of everything they own
+
+    Returns:
+        Dict of ids used to fill URL arguments (see URL_ARGS) plus ``users``
+        ({role: user_id})
+    """
+    def user(role, index=0):
+        email = f"budget-{role}{index}-{size}@{SYNTHETIC_EMAIL_DOMAIN}"
+        return EstateUser.objects.create(
+            name=f"Fixture {role.title()}", role=role, email=email, password_hash=SYNTHETIC_PASSWORD,
+        )
+
+    seller, buyer, admin, other = user("seller"), user("buyer"), user("admin"), user("buyer", 1)
+
+    properties = Property.objects.bulk_create([
+        Property(
+            user=seller, title=f"Fixture Villa {i}", description="Fixture listing", location="Pune",
+            city="Pune", state="Maharashtra", price=1_000_000 + i, bedrooms=3, bathrooms=2,
+            property_type="Villa", amenities="Parking, Gym", contact="9800000000",
+        )
+        for i in range(size)
+    ])
+    images = PropertyImage.objects.bulk_create([
+        PropertyImage(property=prop, image_url=f"/media/property_images/fixture_{prop.property_id}_{n}.jpg")
+        for prop in properties for n in range(2)
+    ])
+    bookings = Booking.objects.bulk_create([
+        Booking(property=prop, user=buyer, status="Confirmed" if i % 2 else "pending")
+        for i, prop in enumerate(properties)
+    ])
+    transactions = Transaction.objects.bulk_create([
+        Transaction(booking=booking, amount=Decimal("25000"), payment_status="success", payment_method="upi")
+        for booking in bookings
+    ])
+    PaymentHistory.objects.bulk_create([
+        PaymentHistory(user=buyer, property=txn.booking.property, transaction=txn, amount=txn.amount,
+                       payment_type="booking_fee", status="success")
+        for txn in transactions
+    ])
+    saved = SavedProperty.objects.bulk_create([SavedProperty(user=buyer, property=prop) for prop in properties])
+    # Reviews for half the booked properties, so "reviewable" has both kinds
+    PropertyReview.objects.bulk_create([
+        PropertyReview(user=buyer, property=prop, rating=4, review_text="Fixture review")
+        for prop in properties[::2]
+    ])
+    tickets = SupportTicket.objects.bulk_create([
+        SupportTicket(user=buyer, subject=f"Fixture ticket {i}", description="Help", token_id=f"SUP-FIX-{size}-{i}",
+                      status=("open", "in_progress", "resolved")[i % 3])
+        for i in range(size)
+    ])
+    TicketResponse.objects.bulk_create([
+        TicketResponse(ticket=ticket, user=admin if n else buyer, message="Fixture response", is_staff_response=bool(n))
+        for ticket in tickets for n in range(2)
+    ])
+    notifications = SellerNotification.objects.bulk_create([
+        SellerNotification(seller=seller, property=booking.property, booking=booking,
+                           title="New booking", message="Fixture notification")
+        for booking in bookings
+    ])
+    BuyerNotification.objects.bulk_create([
+        BuyerNotification(buyer=buyer, title="Booking update", message="Fixture notification", notification_type="booking_confirmed")
+        for _ in range(size)
+    ])
+    Log.objects.bulk_create([
+        Log(user=member, action=f"Fixture action {i}") for member in (seller, buyer, admin) for i in range(size)
+    ])
+    conversation = ChatConversation.objects.create(user=buyer, session_id=f"budget-fixture-{size}", user_role="buyer")
+    ChatMessage.objects.bulk_create([
+        ChatMessage(conversation=conversation, sender_type="user" if i % 2 else "bot", message_text="Fixture message")
+        for i in range(size)
+    ])
+
+    from .synthetic_data import rebuild_derived_tables
+    rebuild_derived_tables()
+    return {
+        "users": {"seller": seller.user_id, "buyer": buyer.user_id, "admin": admin.user_id},
+        "property_id": properties[0].property_id,
+        "booking_id": bookings[0].booking_id,
+        "other_user_id": other.user_id,
+        "saved_id": saved[0].saved_id,
+        "notification_id": notifications[0].notification_id,
+        "image_id": images[0].image_id,
+        "listing": "properties",
+    }
+
+
+# ===========================
+# Endpoints
+# ===========================
+
+def _role_for(name, route):
+    if name in ROLES:
+        return ROLES[name]
+    for role in ("seller", "buyer", "admin"):
+        if role in name or route.startswith(role) or f"/{role}/" in route:
+            return role
+    return "admin"
+
+
+def endpoints(fixtures):
+    """Every named, non-skipped backend URL with its arguments filled from ``fixtures``"""
+    from . import urls
+
+    found = []
+    seen = set()
+    for pattern in urls.urlpatterns:
+        if not isinstance(pattern, URLPattern) or not pattern.name or pattern.name in SKIP or pattern.name in seen:
+            continue
+        seen.add(pattern.name)
+        route = str(pattern.pattern)
+        kwargs = {arg: fixtures[URL_ARGS[arg]] for arg in pattern.pattern.converters}
+        url = reverse(pattern.name, kwargs=kwargs)
+        if pattern.name in QUERY_STRINGS:
+            url += "?" + QUERY_STRINGS[pattern.name].format(**fixtures)
+        found.append(Endpoint(pattern.name, _role_for(pattern.name, route), url))
+    return found
+
+
+# ===========================
+# Measuring
+# ===========================
+
+def measure(endpoint, users):
+    """
+    Request one endpoint once (after a warm-up request)
+
+    Returns:
+        (status code, number of queries, Counter of query signatures)
+    """
+    from django.test import Client
+
+    if endpoint.role is None:
+        client = Client(HTTP_HOST="localhost")
+    else:
+        client = logged_in_client(endpoint.role, users[endpoint.role])
+    secure = getattr(settings, "SECURE_SSL_REDIRECT", False)
+    client.get(endpoint.url, secure=secure)  # warm per-process caches (user, carousel, ...)
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(endpoint.url, secure=secure)
+    signatures = Counter(fingerprint(query["sql"]) for query in captured.captured_queries)
+    return response.status_code, len(captured.captured_queries), signatures
+
+
+def evaluate(small, large, budget):
+    """Failure messages for one endpoint's (status, queries, signatures) at both sizes"""
+    problems = []
+    if large[1] > small[1]:
+        problems.append(f"queries grow with data ({small[1]} -> {large[1]})")
+    if large[1] > budget:
+        problems.append(f"{large[1]} queries exceed budget {budget}")
+    return problems
@@ -0,0 +1,226 @@
+"""
+Query Inspector for Estate Management System (development)
+==========================================================
+Opt-in middleware (``QUERY_INSPECTOR_ENABLED = True``) that watches every
+SQL statement a request runs through ``connection.execute_wrapper`` and
+reports two kinds of hot spots:
+
+- N+1: the same statement shape (``fingerprint``: literals replaced by
+  ``?``) runs ``QUERY_INSPECTOR_REPEAT_THRESHOLD`` times or more in one
+  request. It is reported once, with the count, total time and the backend
+  line that issued it first (e.g. ``backend/views.py:2338 in
+  buyer_support_tickets_api``).
+- Slow query: one statement took ``QUERY_INSPECTOR_SLOW_MS`` or longer.
+  After the response is built, the SELECT is explained
+  (``EXPLAIN QUERY PLAN`` on SQLite, ``EXPLAIN`` on PostgreSQL/MySQL) and
+  the plan is stored with it.
+
+Findings are appended as JSON lines to ``QUERY_INSPECTOR_LOG_FILE``
+(rotated at ``QUERY_INSPECTOR_MAX_BYTES``) and shown to admins at
+``/backend/admin/query-inspector/``. Finding the origin walks the stack on
+every query, so keep this off in production.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+from collections import defaultdict
+from contextlib import ExitStack
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+ENABLED = getattr(settings, "QUERY_INSPECTOR_ENABLED", False)
+REPEAT_THRESHOLD = getattr(settings, "QUERY_INSPECTOR_REPEAT_THRESHOLD", 5)
+SLOW_MS = getattr(settings, "QUERY_INSPECTOR_SLOW_MS", 100)
+LOG_FILE = getattr(settings, "QUERY_INSPECTOR_LOG_FILE", os.path.join(settings.BASE_DIR, "logs", "query_inspector.log"))
+MAX_BYTES = getattr(settings, "QUERY_INSPECTOR_MAX_BYTES", 5 * 1024 * 1024)
+BACKUP_COUNT = getattr(settings, "QUERY_INSPECTOR_BACKUP_COUNT", 3)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BACKEND_DIR)
+
+
+# ===========================
+# Fingerprints and Origins
+# ===========================
+
+_LITERALS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(\.\d+)?\b"), "?"),
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"\((\s*\?\s*,)+\s*\?\s*\)"), "(...)"),  # IN lists of any length
+]
+
+
+def fingerprint(sql):
+    """The statement with literals and parameters (and IN lists) replaced, so repeated shapes compare equal"""
+    for pattern, replacement in _LITERALS:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+def origin():
+    """``backend/<file>:<line> in <function>`` of the innermost project frame that issued the query"""
+    for frame in reversed(traceback.extract_stack()):
+        filename = os.path.abspath(frame.filename)
+        if filename.startswith(BACKEND_DIR) and filename != os.path.abspath(__file__):
+            return f"{os.path.relpath(filename, PROJECT_DIR)}:{frame.lineno} in {frame.name}"
+    return None
+
+
+# ===========================
+# Per-request Recording
+# ===========================
+
+class _RequestQueries:
+    """Statements seen during one request, grouped by fingerprint"""
+
+    def __init__(self):
+        self.groups = defaultdict(lambda: {"count": 0, "total_ms": 0.0, "origin": None, "sql": None})
+        self.slow = []
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.total += 1
+            group = self.groups[fingerprint(sql)]
+            group["count"] += 1
+            group["total_ms"] += elapsed_ms
+            if group["origin"] is None:
+                group["origin"] = origin()
+                group["sql"] = sql
+            if elapsed_ms >= SLOW_MS:
+                self.slow.append({
+                    "sql": sql, "params": None if many else params, "ms": round(elapsed_ms, 2),
+                    "origin": group["origin"] if group["count"] > 1 else origin(),
+                    "alias": context["connection"].alias,
+                })
+
+
+def explain(alias, sql, params):
+    """Query plan lines for a SELECT (None for other statements or on error)"""
+    if not sql.lstrip().upper().startswith("SELECT"):
+        return None
+    connection = connections[alias]
+    prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            return [" | ".join(str(value) for value in row) for row in cursor.fetchall()]
+    except Exception as e:
+        return [f"EXPLAIN failed: {str(e)}"]
+
+
+# ===========================
+# Findings File
+# ===========================
+
+_file_logger = None
+_file_logger_lock = threading.Lock()
+
+
+def _findings_logger():
+    global _file_logger
+    with _file_logger_lock:
+        if _file_logger is None:
+            os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+            handler = RotatingFileHandler(LOG_FILE, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            findings = logging.getLogger(f"{__name__}.findings")
+            findings.setLevel(logging.INFO)
+            findings.propagate = False
+            findings.addHandler(handler)
+            _file_logger = findings
+        return _file_logger
+
+
+def record(finding):
+    """Append one finding (dict) to the rotating findings file"""
+    finding.setdefault("at", timezone.now().isoformat())
+    _findings_logger().info(json.dumps(finding, default=str))
+
+
+def recent_findings(limit=200):
+    """Newest findings first, read from the current and rotated files"""
+    findings = []
+    paths = [LOG_FILE] + [f"{LOG_FILE}.{n}" for n in range(1, BACKUP_COUNT + 1)]
+    for path in paths:
+        if len(findings) >= limit or not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as handle:
+            lines = handle.readlines()
+        for line in reversed(lines):
+            try:
+                findings.append(json.loads(line))
+            except ValueError:
+                continue
+            if len(findings) >= limit:
+                break
+    return findings
+
+
+# ===========================
+# Middleware
+# ===========================
+
+class QueryInspectorMiddleware:
+    """Reports N+1 query patterns and slow queries per request (QUERY_INSPECTOR_ENABLED)"""
+
+    def __init__(self, get_response):
+        if not ENABLED:
+            raise MiddlewareNotUsed("QUERY_INSPECTOR_ENABLED is off")
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path.startswith("/backend/admin/query-inspector"):
+            return self.get_response(request)
+
+        queries = _RequestQueries()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+
+        try:
+            self._report(request, queries)
+        except Exception as e:
+            logger.error(f"❌ Query inspector failed to report {request.path}: {str(e)}")
+        return response
+
+    def _report(self, request, queries):
+        match = getattr(request, "resolver_match", None)
+        context = {
+            "method": request.method,
+            "path": request.get_full_path(),
+            "view": match.view_name if match else None,
+            "request_queries": queries.total,
+        }
+        for shape, group in queries.groups.items():
+            if group["count"] >= REPEAT_THRESHOLD:
+                logger.warning(f"⚠️ N+1: {group['count']}x from {group['origin']} on {context['path']}")
+                record({
+                    "kind": "n_plus_one", **context, "count": group["count"],
+                    "total_ms": round(group["total_ms"], 2), "origin": group["origin"],
+                    "fingerprint": shape, "sql": group["sql"],
+                })
+        for slow in queries.slow:
+            logger.warning(f"⚠️ Slow query ({slow['ms']} ms) from {slow['origin']} on {context['path']}")
+            record({
+                "kind": "slow", **context, "ms": slow["ms"], "origin": slow["origin"], "sql": slow["sql"],
+                "plan": explain(slow["alias"], slow["sql"], slow["params"]),
+            })
@@ -0,0 +1,245 @@
+"""
+On-demand Request Profiler for Estate Management System
+=======================================================
+Profiles one live request when it carries a profiling token, so a page
+that is only slow with production data (``buyer_dashboard_view``,
+``admin_support_tickets``, ...) can be examined where it is slow:
+
+1. An admin asks for a token: ``POST /backend/api/admin/profiler/token/``
+   (optionally ``path=/backend/buyer-home/`` to restrict it to one path).
+   Tokens are signed with SECRET_KEY and expire after
+   ``PROFILER_TOKEN_MAX_AGE`` seconds.
+2. The request to profile adds ``?_profile=<token>`` or the
+   ``X-Profile-Token: <token>`` header. It may be made by any user (e.g.
+   the buyer whose dashboard is slow); the token is the admin's permission.
+3. The request runs under cProfile while a sampling thread records the
+   request thread's stack every ``PROFILER_SAMPLE_INTERVAL`` seconds.
+   Written to ``PROFILER_DIR``:
+
+   - ``<name>.prof``: cProfile stats (``python -m pstats``, snakeviz, ...)
+   - ``<name>.collapsed``: one ``frame;frame;frame count`` line per
+     sampled stack, the input of flamegraph.pl / speedscope
+
+   The response gets an ``X-Profile-Id: <name>`` header.
+
+At most ``PROFILER_MAX_PER_HOUR`` profiles are taken per hour. The count
+comes from the files in ``PROFILER_DIR``, so it holds across worker
+processes that share the directory. Each process runs one profile at a
+time. Only the newest ``PROFILER_MAX_FILES`` profiles are kept. Requests
+with an invalid, expired or rate-limited token are served normally,
+unprofiled.
+"""
+
+import cProfile
+import glob
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+
+logger = logging.getLogger(__name__)
+
+
+ENABLED = getattr(settings, "PROFILER_ENABLED", True)
+PROFILE_DIR = getattr(settings, "PROFILER_DIR", os.path.join(settings.BASE_DIR, "profiles"))
+TOKEN_MAX_AGE = getattr(settings, "PROFILER_TOKEN_MAX_AGE", 900)
+MAX_PER_HOUR = getattr(settings, "PROFILER_MAX_PER_HOUR", 10)
+MAX_FILES = getattr(settings, "PROFILER_MAX_FILES", 200)
+SAMPLE_INTERVAL = getattr(settings, "PROFILER_SAMPLE_INTERVAL", 0.005)
+
+TOKEN_PARAM = "_profile"
+TOKEN_HEADER = "HTTP_X_PROFILE_TOKEN"
+SIGNING_SALT = "backend.request_profiler"
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILE_NAME = re.compile(r"^[\w.-]+$")
+
+
+# ===========================
+# Tokens
+# ===========================
+
+def issue_token(admin_id, path=None):
+    """Signed token allowing one admin's profiling requests (to ``path`` only, if given)"""
+    return signing.dumps({"admin": admin_id, "path": path or None}, salt=SIGNING_SALT, compress=True)
+
+
+def check_token(token, path):
+    """
+    Returns:
+        The admin id that issued ``token``, or None if it is invalid,
+        expired or restricted to another path
+    """
+    try:
+        payload = signing.loads(token, salt=SIGNING_SALT, max_age=TOKEN_MAX_AGE)
+    except signing.BadSignature:  # includes SignatureExpired
+        return None
+    if payload.get("path") and payload["path"] != path:
+        return None
+    return payload.get("admin")
+
+
+# ===========================
+# Profile Files
+# ===========================
+
+def list_profiles():
+    """Saved profiles, newest first: dicts with name, created, size and files"""
+    profiles = []
+    for path in glob.glob(os.path.join(PROFILE_DIR, "*.prof")):
+        name = os.path.basename(path)[:-len(".prof")]
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        files = [name + ".prof"]
+        if os.path.exists(os.path.join(PROFILE_DIR, name + ".collapsed")):
+            files.append(name + ".collapsed")
+        profiles.append({"name": name, "created": stat.st_mtime, "size": stat.st_size, "files": files})
+    profiles.sort(key=lambda profile: profile["created"], reverse=True)
+    return profiles
+
+
+def profile_file(filename):
+    """Absolute path of a saved .prof/.collapsed file, or None (no path traversal)"""
+    if not PROFILE_NAME.match(filename) or not filename.endswith((".prof", ".collapsed")):
+        return None
+    path = os.path.join(PROFILE_DIR, filename)
+    return path if os.path.isfile(path) else None
+
+
+def _recent_count(window=3600):
+    cutoff = time.time() - window
+    count = 0
+    for path in glob.glob(os.path.join(PROFILE_DIR, "*.prof")):
+        try:
+            if os.path.getmtime(path) >= cutoff:
+                count += 1
+        except FileNotFoundError:
+            continue
+    return count
+
+
+def _prune():
+    for profile in list_profiles()[MAX_FILES:]:
+        for filename in profile["files"]:
+            try:
+                os.remove(os.path.join(PROFILE_DIR, filename))
+            except FileNotFoundError:
+                pass
+
+
+# ===========================
+# Stack Sampling
+# ===========================
+
+def _frame_label(code):
+    filename = code.co_filename
+    if filename.startswith(PROJECT_DIR):
+        filename = os.path.relpath(filename, PROJECT_DIR)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+class _StackSampler:
+    """Samples one thread's stack from a background thread into collapsed-stack counts"""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="request-profiler-sampler", daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.done.set()
+        self.thread.join()
+
+    def _run(self):
+        while not self.done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+# ===========================
+# Middleware
+# ===========================
+
+class RequestProfilerMiddleware:
+    """Runs requests carrying a valid profiling token under cProfile + stack sampling (PROFILER_ENABLED)"""
+
+    def __init__(self, get_response):
+        if not ENABLED:
+            raise MiddlewareNotUsed("PROFILER_ENABLED is off")
+        self.get_response = get_response
+        self.busy = threading.Lock()  # one profile at a time per process
+
+    def __call__(self, request):
+        token = request.GET.get(TOKEN_PARAM) or request.META.get(TOKEN_HEADER)
+        if not token:
+            return self.get_response(request)
+
+        admin_id = check_token(token, request.path)
+        if admin_id is None:
+            logger.warning(f"⚠️ Ignoring invalid or expired profiling token on {request.path}")
+            return self.get_response(request)
+        if _recent_count() >= MAX_PER_HOUR:
+            logger.warning(f"⚠️ Profiling rate limit ({MAX_PER_HOUR}/hour) reached, {request.path} not profiled")
+            return self.get_response(request)
+        if not self.busy.acquire(blocking=False):
+            logger.warning(f"⚠️ Another profile is running in this process, {request.path} not profiled")
+            return self.get_response(request)
+
+        try:
+            profiler = cProfile.Profile()
+            started = time.perf_counter()
+            with _StackSampler(threading.get_ident()) as sampler:
+                profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    profiler.disable()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        finally:
+            self.busy.release()
+
+        try:
+            name = self._save(request, profiler, sampler)
+        except Exception as e:
+            logger.error(f"❌ Could not save profile of {request.path}: {str(e)}")
+            return response
+        response["X-Profile-Id"] = name
+        logger.info(f"✅ Profiled {request.method} {request.path} ({elapsed_ms:.0f} ms) for admin {admin_id}: {name}")
+        return response
+
+    def _save(self, request, profiler, sampler):
+        match = getattr(request, "resolver_match", None)
+        view = match.url_name if match and match.url_name else "unresolved"
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{view}-{os.getpid()}-{threading.get_ident() % 10000}"
+
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(PROFILE_DIR, name + ".prof"))
+        with open(os.path.join(PROFILE_DIR, name + ".collapsed"), "w", encoding="utf-8") as handle:
+            handle.write(sampler.collapsed())
+        _prune()
+        return name
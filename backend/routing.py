@@ -1,6 +1,10 @@
 from django.urls import re_path
-from .consumers import AzureBotConsumer
+from .consumers import NotificationConsumer
 
+# Only the authenticated notification socket is exposed. AzureBotConsumer
+# (ws/bot/) is not routed: it accepts anonymous connections, relays them
+# with the server's Direct Line secret and blocks the event loop on
+# requests.post.
 websocket_urlpatterns = [
-    re_path(r'ws/bot/$', AzureBotConsumer.as_asgi()),
+    re_path(r'ws/notifications/$', NotificationConsumer.as_asgi()),
 ]
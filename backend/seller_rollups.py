@@ -0,0 +1,267 @@
+"""
+Seller Dashboard Daily Rollups for Estate Management System
+===========================================================
+The seller dashboard used to run about twelve queries per load: counts of
+properties, bookings and images, revenue SUMs filtered with
+``payment_date__month`` / ``__year`` (no index can serve those) and three
+``Log ... action__icontains='property'`` scans for "views".
+
+It now reads ``SellerDailyStats``: one row per seller per day holding
+listings, images, bookings (total and still pending), revenue and views
+for rows dated that day. ``get_summary`` answers every dashboard figure with
+one conditional-aggregation query over the seller's rows, with plain date
+ranges (``day >= month_start``), served by the (seller, day) unique index.
+
+Incremental maintenance works like dashboard_stats.py: each tracked row
+contributes values to one (seller, day) bucket, and the signals in
+signals.py apply ``new - old`` with ``UPDATE ... SET x = x + delta`` inside
+the same transaction. Views are added by property_views.py when it flushes
+buffered view events (other people opening the seller's listings).
+
+Changes that bypass signals (``QuerySet.update()``, raw SQL)
+are corrected by ``rebuild()``, run from
+``python manage.py refresh_seller_rollups`` (e.g. nightly).
+"""
+
+import datetime
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+from django.apps import apps as django_apps
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Booking, Property, PropertyImage, SellerDailyStats, Transaction
+
+logger = logging.getLogger(__name__)
+
+
+COUNTERS = ("listings_added", "images_added", "bookings_created", "bookings_pending", "revenue", "views")
+REBUILD_BATCH_SIZE = 500
+
+
+def _day(value):
+    return timezone.localtime(value).date() if value else timezone.localdate()
+
+
+# ===========================
+# Row Contributions
+# ===========================
+
+def _property_owner(property_id):
+    if property_id is None:
+        return None
+    return Property.objects.filter(property_id=property_id).values_list("user_id", flat=True).first()
+
+
+def _property_contribution(prop):
+    if prop.user_id is None:
+        return {}
+    return {(prop.user_id, _day(prop.created_at)): {"listings_added": 1}}
+
+
+def _image_contribution(image):
+    cached = image.property if PropertyImage.property.is_cached(image) else None
+    seller_id = cached.user_id if cached is not None else _property_owner(image.property_id)
+    if seller_id is None:
+        return {}
+    return {(seller_id, _day(image.uploaded_at)): {"images_added": 1}}
+
+
+def _booking_contribution(booking):
+    cached = booking.property if Booking.property.is_cached(booking) else None
+    seller_id = cached.user_id if cached is not None else _property_owner(booking.property_id)
+    if seller_id is None:
+        return {}
+    return {(seller_id, _day(booking.booking_date)): {
+        "bookings_created": 1,
+        "bookings_pending": int(booking.status == "pending"),
+    }}
+
+
+def _transaction_contribution(txn):
+    if txn.booking_id is None:
+        return {}
+    seller_id = Booking.objects.filter(booking_id=txn.booking_id).values_list("property__user_id", flat=True).first()
+    if seller_id is None:
+        return {}
+    return {(seller_id, _day(txn.payment_date)): {"revenue": Decimal(str(txn.amount or 0))}}
+
+
+CONTRIBUTIONS = {
+    Property: _property_contribution,
+    PropertyImage: _image_contribution,
+    Booking: _booking_contribution,
+    Transaction: _transaction_contribution,
+}
+
+TRACKED_MODELS = tuple(CONTRIBUTIONS)
+
+
+def contribution(instance):
+    """{(seller_id, day): {counter: value}} a single row adds to the rollups"""
+    return CONTRIBUTIONS[type(instance)](instance)
+
+
+# ===========================
+# Incremental Maintenance
+# ===========================
+
+def apply_delta(old, new):
+    """Apply ``new - old`` contributions (atomic F() updates, one per bucket touched)"""
+    changes = defaultdict(dict)
+    for bucket in set(old) | set(new):
+        before, after = old.get(bucket, {}), new.get(bucket, {})
+        for key in set(before) | set(after):
+            change = after.get(key, 0) - before.get(key, 0)
+            if change:
+                changes[bucket][key] = change
+    for (seller_id, day), delta in changes.items():
+        _add(seller_id, day, delta)
+
+
+def _add(seller_id, day, delta):
+    updated = SellerDailyStats.objects.filter(seller_id=seller_id, day=day).update(
+        updated_at=timezone.now(), **{key: F(key) + change for key, change in delta.items()}
+    )
+    if updated:
+        return
+    if all(change <= 0 for change in delta.values()):
+        # Removal with no bucket (e.g. the seller is being deleted): nothing to subtract from
+        return
+    try:
+        with transaction.atomic():
+            SellerDailyStats.objects.create(seller_id=seller_id, day=day, **delta)
+    except IntegrityError:
+        SellerDailyStats.objects.filter(seller_id=seller_id, day=day).update(
+            updated_at=timezone.now(), **{key: F(key) + change for key, change in delta.items()}
+        )
+
+
+def add_views(views):
+    """Add property views, {(seller_id, day): count}, as flushed by property_views.py"""
+    for (seller_id, day), count in views.items():
+        if count:
+            _add(seller_id, day, {"views": count})
+
+
+# ===========================
+# Full Rebuild
+# ===========================
+
+def _source_buckets(models, seller_ids):
+    """Recompute {(seller_id, day): {counter: value}} for ``seller_ids`` from the source tables"""
+    Property, PropertyImage, Booking, Transaction, PropertyViewDaily = models
+    buckets = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+
+    def collect(queryset, seller_field, date_field, **aggregates):
+        rows = (
+            queryset.filter(**{f"{seller_field}__in": seller_ids})
+            .annotate(rollup_day=TruncDate(date_field))
+            .values(seller_field, "rollup_day")
+            .annotate(**aggregates)
+            .order_by()
+        )
+        for row in rows:
+            bucket = buckets[(row[seller_field], row["rollup_day"])]
+            for key in aggregates:
+                bucket[key] += row[key] or 0
+
+    collect(Property.objects, "user_id", "created_at", listings_added=Count("property_id"))
+    collect(PropertyImage.objects, "property__user_id", "uploaded_at", images_added=Count("image_id"))
+    collect(
+        Booking.objects, "property__user_id", "booking_date",
+        bookings_created=Count("booking_id"),
+        bookings_pending=Count("booking_id", filter=Q(status="pending")),
+    )
+    collect(Transaction.objects, "booking__property__user_id", "payment_date", revenue=Sum("amount"))
+    if PropertyViewDaily is None:
+        return buckets  # historical app registry from before view tracking (migration 0034)
+    rows = (
+        PropertyViewDaily.objects.filter(property__user_id__in=seller_ids)
+        .values("property__user_id", "day")
+        .annotate(total=Sum("views"))
+        .order_by()
+    )
+    for row in rows:
+        buckets[(row["property__user_id"], row["day"])]["views"] += row["total"] or 0
+    return buckets
+
+
+def rebuild(seller_ids=None, apps=None):
+    """
+    Recompute the rollups from scratch, REBUILD_BATCH_SIZE sellers at a time
+
+    Args:
+        seller_ids: Only these sellers (default: everyone with listings or the seller role)
+        apps: App registry to load models from (migrations pass their historical one)
+
+    Returns:
+        Number of rollup rows written
+    """
+    registry = apps or django_apps
+    models = [registry.get_model("backend", name) for name in ("Property", "PropertyImage", "Booking", "Transaction")]
+    try:
+        models.append(registry.get_model("backend", "PropertyViewDaily"))
+    except LookupError:
+        models.append(None)
+    EstateUser = registry.get_model("backend", "EstateUser")
+    Rollup = registry.get_model("backend", "SellerDailyStats")
+
+    if seller_ids is None:
+        seller_ids = set(models[0].objects.exclude(user_id=None).values_list("user_id", flat=True).distinct())
+        seller_ids |= set(EstateUser.objects.filter(role="seller").values_list("user_id", flat=True))
+    seller_ids = sorted(seller_ids)
+
+    written = 0
+    for start in range(0, len(seller_ids), REBUILD_BATCH_SIZE):
+        batch = seller_ids[start:start + REBUILD_BATCH_SIZE]
+        buckets = _source_buckets(models, batch)
+        rows = [
+            Rollup(seller_id=seller_id, day=day, **values)
+            for (seller_id, day), values in buckets.items()
+            if any(values.values())
+        ]
+        with transaction.atomic():
+            Rollup.objects.filter(seller_id__in=batch).delete()
+            Rollup.objects.bulk_create(rows, batch_size=1000)
+        written += len(rows)
+    logger.info(f"✅ Seller rollups rebuilt for {len(seller_ids)} sellers ({written} rows)")
+    return written
+
+
+# ===========================
+# Dashboard Reads
+# ===========================
+
+def get_summary(seller_id, today=None):
+    """
+    Every seller dashboard figure in one query over the seller's rollup rows
+
+    Returns:
+        Dict with listings, images, pending_bookings, total_views (all-time),
+        month_revenue / prev_month_revenue (calendar months),
+        prev_month_listings, and recent_views / prev_views (last 7 days vs
+        the 7 before)
+    """
+    today = today or timezone.localdate()
+    month_start = today.replace(day=1)
+    prev_month_start = (month_start - datetime.timedelta(days=1)).replace(day=1)
+    week_start = today - datetime.timedelta(days=6)
+    prev_week_start = week_start - datetime.timedelta(days=7)
+
+    totals = SellerDailyStats.objects.filter(seller_id=seller_id).aggregate(
+        listings=Sum("listings_added"),
+        images=Sum("images_added"),
+        pending_bookings=Sum("bookings_pending"),
+        total_views=Sum("views"),
+        prev_month_listings=Sum("listings_added", filter=Q(day__gte=prev_month_start, day__lt=month_start)),
+        month_revenue=Sum("revenue", filter=Q(day__gte=month_start)),
+        prev_month_revenue=Sum("revenue", filter=Q(day__gte=prev_month_start, day__lt=month_start)),
+        recent_views=Sum("views", filter=Q(day__gte=week_start)),
+        prev_views=Sum("views", filter=Q(day__gte=prev_week_start, day__lt=week_start)),
+    )
+    return {key: value or 0 for key, value in totals.items()}
@@ -0,0 +1,230 @@
+"""
+Model signal handlers for the backend app.
+Keeps derived data (search index, dashboard stats, ...) in sync with the source tables.
+"""
+
+import logging
+
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .models import BuyerNotification, EstateUser, Property, PropertyImage, SellerNotification, SupportTicket
+from . import (
+    current_user, dashboard_stats, home_carousel, image_variants, jobs, media_store, notification_counters,
+    property_search_helper, seller_rollups, support_tickets,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# ===========================
+# Property Search Index
+# ===========================
+
+@receiver(post_save, sender=Property)
+def property_saved(sender, instance, **kwargs):
+    """Re-index a property whenever it is created or updated"""
+    property_search_helper.index_property(instance)
+
+
+@receiver(post_delete, sender=Property)
+def property_deleted(sender, instance, **kwargs):
+    """Drop a deleted property from the search index"""
+    property_search_helper.remove_property(instance.property_id)
+
+
+# ===========================
+# Admin Dashboard Stats Snapshot
+# ===========================
+
+def _apply_dashboard_delta(old, new):
+    try:
+        dashboard_stats.apply_delta(old, new)
+    except Exception as e:
+        logger.error(f"❌ Failed to update dashboard stats snapshot: {str(e)}")
+
+
+def stats_row_saving(sender, instance, **kwargs):
+    """Remember what an existing row contributed before it is updated"""
+    instance._dashboard_stats_old = {}
+    if instance._state.adding or instance.pk is None:
+        return
+    old_row = sender.objects.filter(pk=instance.pk).first()
+    if old_row is not None:
+        instance._dashboard_stats_old = dashboard_stats.contribution(old_row)
+
+
+def stats_row_saved(sender, instance, **kwargs):
+    old = getattr(instance, "_dashboard_stats_old", {})
+    _apply_dashboard_delta(old, dashboard_stats.contribution(instance))
+    instance._dashboard_stats_old = {}
+
+
+def stats_row_deleted(sender, instance, **kwargs):
+    _apply_dashboard_delta(dashboard_stats.contribution(instance), {})
+
+
+for _model in dashboard_stats.TRACKED_MODELS:
+    pre_save.connect(stats_row_saving, sender=_model, dispatch_uid=f"dashboard_stats_pre_save_{_model.__name__}")
+    post_save.connect(stats_row_saved, sender=_model, dispatch_uid=f"dashboard_stats_post_save_{_model.__name__}")
+    post_delete.connect(stats_row_deleted, sender=_model, dispatch_uid=f"dashboard_stats_post_delete_{_model.__name__}")
+
+
+# ===========================
+# Seller Dashboard Rollups
+# ===========================
+
+def _apply_rollup_delta(old, new):
+    try:
+        seller_rollups.apply_delta(old, new)
+    except Exception as e:
+        logger.error(f"❌ Failed to update seller rollups: {str(e)}")
+
+
+def rollup_row_saving(sender, instance, **kwargs):
+    """Remember which (seller, day) bucket an existing row contributed to"""
+    instance._seller_rollup_old = {}
+    if instance._state.adding or instance.pk is None:
+        return
+    old_row = sender.objects.filter(pk=instance.pk).first()
+    if old_row is not None:
+        instance._seller_rollup_old = seller_rollups.contribution(old_row)
+
+
+def rollup_row_saved(sender, instance, **kwargs):
+    old = getattr(instance, "_seller_rollup_old", {})
+    _apply_rollup_delta(old, seller_rollups.contribution(instance))
+    instance._seller_rollup_old = {}
+
+
+def rollup_row_deleting(sender, instance, **kwargs):
+    """Resolve the seller while parent rows still exist (cascades may delete them first)"""
+    try:
+        instance._seller_rollup_old = seller_rollups.contribution(instance)
+    except Exception as e:
+        instance._seller_rollup_old = {}
+        logger.error(f"❌ Failed to read seller rollup contribution: {str(e)}")
+
+
+def rollup_row_deleted(sender, instance, **kwargs):
+    _apply_rollup_delta(getattr(instance, "_seller_rollup_old", {}), {})
+    instance._seller_rollup_old = {}
+
+
+for _model in seller_rollups.TRACKED_MODELS:
+    pre_save.connect(rollup_row_saving, sender=_model, dispatch_uid=f"seller_rollups_pre_save_{_model.__name__}")
+    post_save.connect(rollup_row_saved, sender=_model, dispatch_uid=f"seller_rollups_post_save_{_model.__name__}")
+    pre_delete.connect(rollup_row_deleting, sender=_model, dispatch_uid=f"seller_rollups_pre_delete_{_model.__name__}")
+    post_delete.connect(rollup_row_deleted, sender=_model, dispatch_uid=f"seller_rollups_post_delete_{_model.__name__}")
+
+
+# ===========================
+# Support Ticket Stats
+# ===========================
+
+def _apply_ticket_delta(apply, *args):
+    try:
+        apply(*args)
+    except Exception as e:
+        logger.error(f"❌ Failed to update support ticket stats: {str(e)}")
+
+
+@receiver(pre_save, sender=SupportTicket)
+def support_ticket_saving(sender, instance, **kwargs):
+    """Remember the stored status of an existing ticket before it is updated"""
+    instance._ticket_stats_old_status = None
+    if not instance._state.adding and instance.pk is not None:
+        instance._ticket_stats_old_status = (
+            SupportTicket.objects.filter(pk=instance.pk).values_list("status", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=SupportTicket)
+def support_ticket_saved(sender, instance, created, **kwargs):
+    if created:
+        _apply_ticket_delta(support_tickets.ticket_created, instance.status)
+    elif instance._ticket_stats_old_status is not None:
+        _apply_ticket_delta(support_tickets.status_changed, instance._ticket_stats_old_status, instance.status)
+    instance._ticket_stats_old_status = None
+
+
+@receiver(post_delete, sender=SupportTicket)
+def support_ticket_deleted(sender, instance, **kwargs):
+    """Direct and cascaded (user delete) removals"""
+    _apply_ticket_delta(support_tickets.ticket_deleted, instance.status)
+
+
+# ===========================
+# Notification Counters
+# ===========================
+
+@receiver(post_delete, sender=SellerNotification)
+def seller_notification_deleted(sender, instance, **kwargs):
+    """Keep the unread counter exact for direct and cascaded deletes"""
+    notification_counters.notification_deleted(instance.seller_id, "seller", not instance.is_read)
+
+
+@receiver(post_delete, sender=BuyerNotification)
+def buyer_notification_deleted(sender, instance, **kwargs):
+    notification_counters.notification_deleted(instance.buyer_id, "buyer", not instance.is_read)
+
+
+# ===========================
+# Property Image Variants
+# ===========================
+
+@receiver(post_save, sender=PropertyImage)
+def property_image_saved(sender, instance, **kwargs):
+    """Queue thumbnail/WebP generation for new or replaced images"""
+    if image_variants.needs_variants(instance):
+        try:
+            jobs.enqueue_on_commit("images.generate_variants", instance.image_id)
+        except Exception as e:
+            logger.error(f"❌ Failed to queue image variants for image #{instance.image_id}: {str(e)}")
+
+
+# ===========================
+# Content-addressed Media Refcounts
+# ===========================
+
+@receiver(post_save, sender=PropertyImage)
+def property_image_ref_saved(sender, instance, created, **kwargs):
+    """Count a reference to the stored file (and release the previous one on re-point)"""
+    previous = getattr(instance, "_loaded_image_url", None)
+    if created:
+        media_store.add_ref(instance.image_url)
+    elif previous != instance.image_url:
+        media_store.add_ref(instance.image_url)
+        media_store.release(previous)
+    instance._loaded_image_url = instance.image_url
+
+
+@receiver(post_delete, sender=PropertyImage)
+def property_image_ref_deleted(sender, instance, **kwargs):
+    """Release the stored file; gc_media deletes it once nothing references it"""
+    media_store.release(instance.image_url)
+
+
+# ===========================
+# Home Carousel Snapshot
+# ===========================
+
+def carousel_source_changed(sender, instance, **kwargs):
+    """Rebuild the cached home carousel after any listing or image change"""
+    home_carousel.invalidate()
+
+
+for _model in (Property, PropertyImage):
+    post_save.connect(carousel_source_changed, sender=_model, dispatch_uid=f"home_carousel_post_save_{_model.__name__}")
+    post_delete.connect(carousel_source_changed, sender=_model, dispatch_uid=f"home_carousel_post_delete_{_model.__name__}")
+
+
+# ===========================
+# Current User Cache
+# ===========================
+
+@receiver(post_save, sender=EstateUser)
+@receiver(post_delete, sender=EstateUser)
+def estate_user_changed(sender, instance, **kwargs):
+    """Drop the cached row (edit_user, edit_profile, delete_user, password change, ...)"""
+    current_user.invalidate(instance.user_id)
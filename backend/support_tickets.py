@@ -0,0 +1,136 @@
+"""
+Support Ticket Listings and Statistics for Estate Management System
+===================================================================
+The ticket pages used to run a query per ticket (``responses.count()`` and
+``responses.order_by('-created_at').first()``) plus one COUNT per status.
+Now:
+
+- ``annotate_listing(queryset)`` adds ``response_count`` and
+  ``last_response_at`` to each ticket as correlated subqueries, so a
+  listing is a single query whatever its length
+- ``status_counts(queryset)`` returns total and per-status counts with one
+  conditional-aggregation query (``COUNT(*) FILTER (WHERE status = ...)``)
+
+The admin page's site-wide counts can instead come from the single
+``SupportTicketStats`` row (``SUPPORT_TICKET_STATS_CACHED``). Every change
+applies an atomic ``UPDATE ... SET x = x + delta`` in the same transaction:
+the signals in signals.py count saves and deletes of SupportTicket rows
+(including cascades from deleting a user), and the admin status APIs, which
+change the status with a conditional QuerySet.update(), call
+``status_changed`` themselves. Bulk writes that bypass signals are
+corrected by ``reconcile()`` (``python manage.py refresh_ticket_stats``).
+"""
+
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import SupportTicket, SupportTicketStats, TicketResponse
+
+logger = logging.getLogger(__name__)
+
+
+STATS_CACHED = getattr(settings, "SUPPORT_TICKET_STATS_CACHED", True)
+STATUSES = ("open", "in_progress", "resolved", "closed")
+SNAPSHOT_ID = 1
+
+
+# ===========================
+# Listings
+# ===========================
+
+def annotate_listing(queryset):
+    """Tickets with ``response_count`` and ``last_response_at`` (None without responses)"""
+    responses = TicketResponse.objects.filter(ticket=OuterRef("pk")).order_by()
+    return queryset.annotate(
+        response_count=Coalesce(
+            Subquery(responses.values("ticket").annotate(n=Count("pk")).values("n"), output_field=IntegerField()),
+            Value(0),
+        ),
+        last_response_at=Subquery(responses.order_by("-created_at").values("created_at")[:1]),
+    )
+
+
+def status_counts(queryset=None):
+    """
+    Returns:
+        {"total": n, "open": n, "in_progress": n, "resolved": n, "closed": n}
+        for ``queryset`` (default: every ticket), in one query
+    """
+    if queryset is None:
+        queryset = SupportTicket.objects.all()
+    return queryset.order_by().aggregate(
+        total=Count("pk"),
+        **{status: Count("pk", filter=Q(status=status)) for status in STATUSES},
+    )
+
+
+# ===========================
+# Cached Stats Row
+# ===========================
+
+def reconcile():
+    """
+    Rebuild the stats row from the tickets table
+
+    Returns:
+        The refreshed SupportTicketStats instance
+    """
+    with transaction.atomic():
+        stats, _created = SupportTicketStats.objects.update_or_create(
+            stats_id=SNAPSHOT_ID,
+            defaults={**status_counts(), "refreshed_at": timezone.now()},
+        )
+    logger.info("✅ Support ticket stats reconciled")
+    return stats
+
+
+def _apply_delta(delta):
+    delta = {field: change for field, change in delta.items() if change}
+    if not delta:
+        return
+    updated = SupportTicketStats.objects.filter(stats_id=SNAPSHOT_ID).update(
+        updated_at=timezone.now(), **{field: F(field) + change for field, change in delta.items()}
+    )
+    if not updated:
+        reconcile()
+
+
+def ticket_created(status="open"):
+    """Count a new ticket (post_save, inside the transaction that creates it)"""
+    delta = {"total": 1}
+    if status in STATUSES:
+        delta[status] = 1
+    _apply_delta(delta)
+
+
+def ticket_deleted(status):
+    """Uncount a removed ticket (post_delete, so also for cascades)"""
+    delta = {"total": -1}
+    if status in STATUSES:
+        delta[status] = -1
+    _apply_delta(delta)
+
+
+def status_changed(old_status, new_status):
+    """Move one ticket between status counters (call inside the transaction that saves it)"""
+    if old_status == new_status:
+        return
+    delta = {}
+    if old_status in STATUSES:
+        delta[old_status] = -1
+    if new_status in STATUSES:
+        delta[new_status] = delta.get(new_status, 0) + 1
+    _apply_delta(delta)
+
+
+def site_stats():
+    """Site-wide counts by status: the cached row (built on first use) or one aggregate query"""
+    if not STATS_CACHED:
+        return status_counts()
+    stats = SupportTicketStats.objects.filter(stats_id=SNAPSHOT_ID).first() or reconcile()
+    return {"total": stats.total, **{status: getattr(stats, status) for status in STATUSES}}
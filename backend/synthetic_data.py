@@ -0,0 +1,360 @@
+"""
+Synthetic Dataset for Estate Management System
+==============================================
+Realistic volumes for benchmarking (``python manage.py seed_synthetic`` and
+``python manage.py benchmark_hot_paths``). A scale is the number of
+properties; every other table is sized from it:
+
+- users: 1 seller per 20 properties, 1 buyer per 4, plus 2 admins
+- 2 images per property, 1 booking per 2 properties, 1 transaction per
+  confirmed/completed booking
+- 2 activity-log rows per property, 1 seller notification per booking and
+  1 buyer notification per 4 properties
+
+Rows come from ``random.Random(seed)`` and get explicit primary keys
+following the current maximum, so on a fresh database the same seed and
+scale always produce the same rows (dates are relative to "now"). They are written with ``bulk_create`` in chunks of ``CHUNK_SIZE``,
+streamed so 1M properties do not have to fit in memory.
+
+``bulk_create`` skips model signals, so the derived tables (dashboard
+snapshot, seller rollups, notification counters, search index) are rebuilt
+once at the end. Synthetic users have ``SYNTHETIC_EMAIL_DOMAIN`` addresses;
+``purge()`` deletes them and, by cascade, everything they own.
+"""
+
+import datetime
+import logging
+import random
+from array import array
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import (
+    Booking, BuyerNotification, EstateUser, Log, Property, PropertyImage,
+    SellerNotification, Transaction, normalize_email, normalize_phone,
+)
+
+logger = logging.getLogger(__name__)
+
+
+SCALES = {
+    "1k": 1_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+DEFAULT_SEED = 42
+CHUNK_SIZE = 5000
+HISTORY_DAYS = 365
+
+SYNTHETIC_EMAIL_DOMAIN = "synthetic.example.com"
+SYNTHETIC_PASSWORD = "synthetic-password"
+
+CITIES = [
+    ("Mumbai", "Maharashtra"), ("Pune", "Maharashtra"), ("Bengaluru", "Karnataka"),
+    ("Chennai", "Tamil Nadu"), ("Hyderabad", "Telangana"), ("Delhi", "Delhi"),
+    ("Kolkata", "West Bengal"), ("Ahmedabad", "Gujarat"), ("Jaipur", "Rajasthan"),
+    ("Kochi", "Kerala"), ("Indore", "Madhya Pradesh"), ("Lucknow", "Uttar Pradesh"),
+]
+NEIGHBOURHOODS = ["Central", "Lake View", "Hill Side", "Old Town", "Tech Park", "Riverside", "Green Valley", "Station Road"]
+PROPERTY_TYPES = ["Residential", "Apartment", "Villa", "Commercial", "Plot"]
+AMENITIES = ["Parking", "Gym", "Swimming Pool", "Garden", "Security", "Lift", "Power Backup", "Club House"]
+FIRST_NAMES = ["Aarav", "Priya", "Rohan", "Ananya", "Vikram", "Meera", "Arjun", "Kavya", "Rahul", "Sneha", "Karan", "Isha"]
+LAST_NAMES = ["Sharma", "Patel", "Reddy", "Iyer", "Singh", "Nair", "Gupta", "Das", "Mehta", "Rao"]
+
+# (value, weight)
+PROPERTY_STATUSES = [(Property.STATUS_AVAILABLE, 70), (Property.STATUS_PENDING, 10), (Property.STATUS_SOLD, 20)]
+BOOKING_STATUSES = [("pending", 40), ("Confirmed", 30), ("completed", 10), ("cancelled", 20)]
+PAYMENT_STATUSES = [("success", 85), ("pending", 10), ("failed", 5)]
+PAYMENT_METHODS = ["upi", "credit_card", "debit_card", "net_banking"]
+LOG_ACTIONS = [
+    "Logged in", "Browsed available properties", "Viewed dashboard", "Searched properties",
+    "Updated profile", "Viewed bookings", "Logged out",
+]
+
+
+def _weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights)[0]
+
+
+def plan(scale):
+    """Row counts per table for a scale (name from SCALES or a property count)"""
+    properties = SCALES[scale] if scale in SCALES else int(scale)
+    return {
+        "sellers": max(1, properties // 20),
+        "buyers": max(1, properties // 4),
+        "admins": 2,
+        "properties": properties,
+        "images": properties * 2,
+        "bookings": max(1, properties // 2),
+        "logs": properties * 2,
+        "seller_notifications": max(1, properties // 2),
+        "buyer_notifications": max(1, properties // 4),
+    }
+
+
+@contextmanager
+def _explicit_timestamps(*models):
+    """Let bulk_create store the generated dates instead of auto_now_add's "now" """
+    fields = [field for model in models for field in model._meta.concrete_fields if getattr(field, "auto_now_add", False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def _next_id(model):
+    return (model.objects.aggregate(top=Max(model._meta.pk.attname))["top"] or 0) + 1
+
+
+def _bulk(model, rows):
+    """bulk_create an iterable of instances CHUNK_SIZE at a time, returns rows written"""
+    written = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            model.objects.bulk_create(chunk)
+            written += len(chunk)
+            chunk = []
+    if chunk:
+        model.objects.bulk_create(chunk)
+        written += len(chunk)
+    logger.info(f"✅ Seeded {written} {model._meta.db_table} rows")
+    return written
+
+
+# ===========================
+# Row Generators
+# ===========================
+
+class _Generator:
+    def __init__(self, counts, seed, now):
+        self.counts = counts
+        self.rng = random.Random(seed)
+        self.now = now
+        self.password_hash = make_password(SYNTHETIC_PASSWORD, salt=f"synthetic{seed}")
+        self.run = seed  # keeps emails/phones unique between seeds
+
+        self.first_user = _next_id(EstateUser)
+        self.first_property = _next_id(Property)
+        self.first_booking = _next_id(Booking)
+        self.seller_ids = range(self.first_user, self.first_user + counts["sellers"])
+        self.buyer_ids = range(self.seller_ids.stop, self.seller_ids.stop + counts["buyers"])
+        self.admin_ids = range(self.buyer_ids.stop, self.buyer_ids.stop + counts["admins"])
+        self.property_ids = range(self.first_property, self.first_property + counts["properties"])
+        self.booking_ids = range(self.first_booking, self.first_booking + counts["bookings"])
+        # Filled while generating, read by the dependent tables (arrays keep 1M rows small)
+        self.property_seller = array("l")
+        self.property_created = array("d")  # POSIX timestamps
+        self.booking_property = array("l")
+        self.booking_status = array("b")  # index into BOOKING_STATUSES
+        self.booking_date = array("d")
+
+    def _past(self, after=None):
+        """Random moment in the history window (after the ``after`` timestamp if given)"""
+        start = after if after is not None else (self.now - datetime.timedelta(days=HISTORY_DAYS)).timestamp()
+        span = max(1, int(self.now.timestamp() - start))
+        return datetime.datetime.fromtimestamp(start + self.rng.randrange(span), tz=datetime.timezone.utc)
+
+    def _created(self, property_id):
+        return self.property_created[property_id - self.first_property]
+
+    def users(self):
+        for ids, role in ((self.seller_ids, "seller"), (self.buyer_ids, "buyer"), (self.admin_ids, "admin")):
+            for user_id in ids:
+                name = f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+                email = f"{role}{user_id}.s{self.run}@{SYNTHETIC_EMAIL_DOMAIN}"
+                phone = f"9{self.run % 100:02d}{user_id:07d}"[-10:]
+                yield EstateUser(
+                    user_id=user_id, name=name, role=role, password_hash=self.password_hash,
+                    email=email, email_normalized=normalize_email(email),
+                    phone=phone, phone_normalized=normalize_phone(phone),
+                    address=f"{self.rng.randint(1, 999)} {self.rng.choice(NEIGHBOURHOODS)}",
+                    created_at=self._past(),
+                )
+
+    def properties(self):
+        for property_id in self.property_ids:
+            seller_id = self.rng.choice(self.seller_ids)
+            city, state = self.rng.choice(CITIES)
+            neighbourhood = self.rng.choice(NEIGHBOURHOODS)
+            property_type = self.rng.choice(PROPERTY_TYPES)
+            bedrooms = self.rng.randint(1, 5)
+            area = self.rng.randint(400, 4000)
+            created_at = self._past()
+            self.property_seller.append(seller_id)
+            self.property_created.append(created_at.timestamp())
+            yield Property(
+                property_id=property_id, user_id=seller_id,
+                title=f"{bedrooms} BHK {property_type} in {neighbourhood}, {city}",
+                description=f"Spacious {property_type.lower()} with {bedrooms} bedrooms near {neighbourhood}.",
+                location=f"{neighbourhood}, {city}", city=city, state=state,
+                address=f"{self.rng.randint(1, 999)} {neighbourhood} Road, {city}",
+                price=float(self.rng.randrange(1_500_000, 50_000_000, 50_000)),
+                area_sqft=float(area), bedrooms=bedrooms, bathrooms=max(1, bedrooms - self.rng.randint(0, 1)),
+                property_type=property_type,
+                amenities=", ".join(self.rng.sample(AMENITIES, self.rng.randint(1, 4))),
+                contact=f"98{self.rng.randrange(10**8):08d}",
+                status=_weighted(self.rng, PROPERTY_STATUSES),
+                created_at=created_at,
+            )
+
+    def images(self):
+        image_id = _next_id(PropertyImage)
+        for property_id in self.property_ids:
+            created_at = self._created(property_id)
+            for position in range(self.counts["images"] // self.counts["properties"]):
+                yield PropertyImage(
+                    image_id=image_id, property_id=property_id,
+                    image_url=f"/media/property_images/synthetic_{property_id}_{position}.jpg",
+                    uploaded_at=self._past(created_at),
+                )
+                image_id += 1
+
+    def bookings(self):
+        for booking_id in self.booking_ids:
+            property_id = self.rng.choice(self.property_ids)
+            booking_date = self._past(self._created(property_id))
+            status = _weighted(self.rng, BOOKING_STATUSES)
+            self.booking_property.append(property_id)
+            self.booking_status.append([value for value, _weight in BOOKING_STATUSES].index(status))
+            self.booking_date.append(booking_date.timestamp())
+            yield Booking(
+                booking_id=booking_id, property_id=property_id, user_id=self.rng.choice(self.buyer_ids),
+                status=status, booking_date=booking_date,
+            )
+
+    def transactions(self):
+        txn_id = _next_id(Transaction)
+        for position, booking_id in enumerate(self.booking_ids):
+            if BOOKING_STATUSES[self.booking_status[position]][0] not in ("Confirmed", "completed"):
+                continue
+            yield Transaction(
+                txn_id=txn_id, booking_id=booking_id,
+                amount=Decimal(self.rng.randrange(10_000, 500_000, 500)),
+                payment_status=_weighted(self.rng, PAYMENT_STATUSES),
+                payment_method=self.rng.choice(PAYMENT_METHODS),
+                payment_date=self._past(self.booking_date[position]),
+            )
+            txn_id += 1
+
+    def logs(self):
+        log_id = _next_id(Log)
+        everyone = range(self.first_user, self.admin_ids.stop)
+        for _ in range(self.counts["logs"]):
+            yield Log(log_id=log_id, user_id=self.rng.choice(everyone), action=self.rng.choice(LOG_ACTIONS), timestamp=self._past())
+            log_id += 1
+
+    def seller_notifications(self):
+        notification_id = _next_id(SellerNotification)
+        for position, booking_id in enumerate(self.booking_ids[:self.counts["seller_notifications"]]):
+            property_id = self.booking_property[position]
+            yield SellerNotification(
+                notification_id=notification_id, seller_id=self.property_seller[property_id - self.first_property],
+                property_id=property_id, booking_id=booking_id, notification_type="booking_received",
+                title="New booking request", message=f"A buyer requested a visit (booking #{booking_id}).",
+                is_read=self.rng.random() < 0.7,
+                created_at=datetime.datetime.fromtimestamp(self.booking_date[position], tz=datetime.timezone.utc),
+            )
+            notification_id += 1
+
+    def buyer_notifications(self):
+        notification_id = _next_id(BuyerNotification)
+        for _ in range(self.counts["buyer_notifications"]):
+            yield BuyerNotification(
+                notification_id=notification_id, buyer_id=self.rng.choice(self.buyer_ids),
+                notification_type=self.rng.choice(["booking_confirmed", "payment_success", "property_status_changed"]),
+                title="Update on your booking", message="Your booking status has changed.",
+                is_read=self.rng.random() < 0.6, created_at=self._past(),
+            )
+            notification_id += 1
+
+
+# ===========================
+# Public API
+# ===========================
+
+def seed(scale, seed=DEFAULT_SEED, rebuild_derived=True):
+    """
+    Generate one synthetic dataset
+
+    Args:
+        scale: Key of SCALES ("1k", "100k", "1m") or a property count
+        seed: RNG seed; the same seed and scale give the same rows
+        rebuild_derived: Recompute signal-maintained tables afterwards
+
+    Returns:
+        Dict of rows written per table
+    """
+    counts = plan(scale)
+    generator = _Generator(counts, seed, timezone.now())
+    written = {}
+    with _explicit_timestamps(EstateUser, Property, PropertyImage, Booking, Transaction, SellerNotification, BuyerNotification):
+        with transaction.atomic():
+            written["users"] = _bulk(EstateUser, generator.users())
+            written["properties"] = _bulk(Property, generator.properties())
+            written["images"] = _bulk(PropertyImage, generator.images())
+            written["bookings"] = _bulk(Booking, generator.bookings())
+            written["transactions"] = _bulk(Transaction, generator.transactions())
+            written["logs"] = _bulk(Log, generator.logs())
+            written["seller_notifications"] = _bulk(SellerNotification, generator.seller_notifications())
+            written["buyer_notifications"] = _bulk(BuyerNotification, generator.buyer_notifications())
+    if rebuild_derived:
+        rebuild_derived_tables()
+    return written
+
+
+def purge():
+    """Delete all synthetic users and (by cascade) their properties, bookings, logs, ..."""
+    users = EstateUser.objects.filter(email_normalized__endswith=f"@{SYNTHETIC_EMAIL_DOMAIN}")
+    # Chunked so SQLite's variable limit and memory stay bounded at 1M scale
+    deleted = 0
+    while True:
+        ids = list(users.values_list("user_id", flat=True)[:CHUNK_SIZE])
+        if not ids:
+            break
+        with transaction.atomic():
+            deleted += EstateUser.objects.filter(user_id__in=ids).delete()[0]
+    return deleted
+
+
+def rebuild_derived_tables():
+    """Recompute everything signals would have maintained for bulk-created rows"""
+    from . import (
+        current_user, dashboard_stats, home_carousel, notification_counters, property_search_helper, seller_rollups,
+        support_tickets,
+    )
+
+    dashboard_stats.reconcile()
+    support_tickets.reconcile()
+    seller_rollups.rebuild()
+    notification_counters.repair_all()
+    property_search_helper.rebuild_index()
+    home_carousel.invalidate()
+    current_user.clear()
+
+
+def sample_users():
+    """One synthetic user id per role ({"seller": id, "buyer": id, "admin": id}), for benchmarks"""
+    users = EstateUser.objects.filter(email_normalized__endswith=f"@{SYNTHETIC_EMAIL_DOMAIN}")
+    sample = {}
+    for role in ("seller", "buyer", "admin"):
+        # The busiest seller / buyer, so dashboards are not trivially empty
+        if role == "seller":
+            row = Property.objects.filter(user__in=users.filter(role=role)).values("user_id").annotate(n=Count("property_id")).order_by("-n").first()
+        elif role == "buyer":
+            row = Booking.objects.filter(user__in=users.filter(role=role)).values("user_id").annotate(n=Count("booking_id")).order_by("-n").first()
+        else:
+            row = users.filter(role=role).values("user_id").first()
+        if row is not None:
+            sample[role] = row["user_id"]
+    return sample
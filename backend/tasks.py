@@ -0,0 +1,113 @@
+"""
+Background Job Tasks for Estate Management System
+=================================================
+Side effects that request handlers queue with ``jobs.enqueue_on_commit``.
+Each task takes ids (JSON-serialisable), reloads what it needs and raises
+on failure so the queue retries it. A task runs inside its own transaction,
+so a retry never leaves half-written notifications behind.
+"""
+
+import logging
+
+from . import notification_service
+from .jobs import task
+from .models import Booking, Property, SupportTicket
+
+logger = logging.getLogger(__name__)
+
+
+class TaskFailed(Exception):
+    """The wrapped call reported failure (it logs the cause itself)"""
+
+
+def _check(result, what):
+    """
+    Raise TaskFailed unless every part of ``result`` succeeded: the service
+    returns None for a failed part, also inside dicts such as
+    ``{'buyer': None, 'admins': [...]}``
+    """
+    if result is None:
+        raise TaskFailed(f"{what} failed")
+    if isinstance(result, dict):
+        failed = [part for part, value in result.items() if value is None]
+        if failed:
+            raise TaskFailed(f"{what} failed ({', '.join(failed)})")
+    return result
+
+
+# ===========================
+# Notification Tasks
+# ===========================
+
+@task("notifications.seller")
+def notify_seller(seller_id, title, message, notification_type, property_id=None, booking_id=None):
+    """Single seller notification with optional property/booking links"""
+    property_obj = Property.objects.filter(property_id=property_id).first() if property_id else None
+    booking_obj = Booking.objects.filter(booking_id=booking_id).first() if booking_id else None
+    _check(notification_service.create_seller_notification(
+        seller_id=seller_id,
+        title=title,
+        message=message,
+        notification_type=notification_type,
+        property_obj=property_obj,
+        booking_obj=booking_obj
+    ), f"Seller notification for #{seller_id}")
+
+
+@task("notifications.buyer")
+def notify_buyer(buyer_id, title, message, notification_type, ticket_id=None):
+    """Single buyer notification with an optional support ticket link"""
+    ticket = SupportTicket.objects.filter(ticket_id=ticket_id).first() if ticket_id else None
+    _check(notification_service.create_buyer_notification(
+        buyer_id=buyer_id,
+        title=title,
+        message=message,
+        notification_type=notification_type,
+        support_ticket=ticket
+    ), f"Buyer notification for #{buyer_id}")
+
+
+@task("notifications.fan_out")
+def fan_out(recipients, title, message, notification_type, property_id=None, booking_id=None, ticket_id=None):
+    """Same notification for many (user_id, role) recipients (fan_out_notifications(background=True))"""
+    property_obj = Property.objects.filter(property_id=property_id).first() if property_id else None
+    booking_obj = Booking.objects.filter(booking_id=booking_id).first() if booking_id else None
+    ticket = SupportTicket.objects.filter(ticket_id=ticket_id).first() if ticket_id else None
+    notification_service.fan_out_notifications(
+        [tuple(recipient) for recipient in recipients], title, message, notification_type,
+        property_obj=property_obj, booking_obj=booking_obj, support_ticket=ticket
+    )
+
+
+@task("notifications.booking_confirmed")
+def notify_booking_confirmed(booking_id):
+    _check(notification_service.notify_booking_confirmed(booking_id), f"Booking #{booking_id} confirmation")
+
+
+@task("notifications.booking_cancelled")
+def notify_booking_cancelled(booking_id, cancelled_by="buyer"):
+    _check(
+        notification_service.notify_booking_cancelled(booking_id, cancelled_by=cancelled_by),
+        f"Booking #{booking_id} cancellation"
+    )
+
+
+@task("notifications.property_added")
+def notify_property_added(property_id):
+    _check(notification_service.notify_property_added(property_id), f"Property #{property_id} added")
+
+
+@task("notifications.ticket_resolved")
+def notify_ticket_resolved(ticket_id):
+    _check(notification_service.notify_ticket_resolved(ticket_id), f"Ticket #{ticket_id} resolved")
+
+
+# ===========================
+# Image Tasks
+# ===========================
+
+@task("images.generate_variants", max_attempts=3)
+def generate_image_variants(image_id):
+    """Thumbnail/card/large JPEG + WebP copies of an uploaded property image"""
+    from . import image_variants
+    image_variants.generate_variants(image_id)
@@ -0,0 +1,134 @@
+"""
+Streaming Image Uploads for Estate Management System
+====================================================
+Property image uploads are streamed chunk by chunk instead of
+``default_storage.save(name, ContentFile(img.read()))``, which held every
+image of a request in memory at once.
+
+``save_image_upload`` checks the declared size and the file's magic bytes
+from the first chunk before anything is written, then writes the content to
+a temporary name, hashing it chunk by chunk on the way through (enforcing
+the size limit on the bytes actually received), so each chunk is read once.
+The content-addressed store in media_store.py then renames that file into
+place, or deletes it when the same image is already stored. Memory per
+upload is one chunk (``UPLOAD_CHUNK_SIZE``), no matter how many images are
+attached.
+Uploads larger than ``FILE_UPLOAD_MAX_MEMORY_SIZE`` are spooled to a
+temporary file by Django while the request is parsed, so request.FILES
+itself stays small too.
+"""
+
+import hashlib
+from collections import namedtuple
+from itertools import chain
+
+from django.conf import settings
+from django.core.files.base import File
+from django.core.files.storage import default_storage
+
+from . import media_store
+
+
+MAX_IMAGE_SIZE = getattr(settings, "PROPERTY_IMAGE_MAX_SIZE", 5 * 1024 * 1024)
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Detected type -> file extension. The extension is taken from the content,
+# never from the client's file name.
+IMAGE_EXTENSIONS = {
+    "jpeg": "jpg",
+    "png": "png",
+    "webp": "webp",
+}
+
+StoredUpload = namedtuple("StoredUpload", ["name", "size", "sha256", "image_type", "written"])
+
+
+class InvalidUpload(ValueError):
+    """The uploaded file is not an acceptable image (message is user-facing)"""
+
+
+class _StreamedContent(File):
+    """Content for default_storage.save() that yields already-started upload chunks"""
+
+    def __init__(self, chunks, name):
+        super().__init__(None, name)
+        self._chunks = chunks
+
+    def chunks(self, chunk_size=None):
+        return self._chunks
+
+
+def detect_image_type(header):
+    """Image type from the first bytes of a file, or None if not an allowed image"""
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def _first_chunk(chunks, minimum=12):
+    """Read just enough of the stream to identify the file type"""
+    header = b""
+    for chunk in chunks:
+        header += chunk
+        if len(header) >= minimum:
+            break
+    return header
+
+
+def save_image_upload(upload, max_size=MAX_IMAGE_SIZE):
+    """
+    Validate one uploaded image and store it content-addressed (media_store.py)
+
+    Args:
+        upload: UploadedFile from request.FILES
+        max_size: Size limit in bytes
+
+    Returns:
+        StoredUpload(name, size, sha256, image_type, written); ``written`` is
+        False when identical content was already stored
+
+    Raises:
+        InvalidUpload: Too large, empty, or not a JPEG/PNG/WebP image
+    """
+    if upload.size is not None and upload.size > max_size:
+        raise InvalidUpload(f"exceeds {max_size // (1024 * 1024)}MB size limit")
+
+    chunks = upload.chunks(UPLOAD_CHUNK_SIZE)
+    first_chunk = _first_chunk(chunks)
+    if not first_chunk:
+        raise InvalidUpload("is empty")
+    image_type = detect_image_type(first_chunk)
+    if image_type is None:
+        raise InvalidUpload("has invalid format. Allowed: jpg, jpeg, png, webp")
+
+    # Write the stream to a temporary name, hashing and counting each chunk as
+    # storage consumes it, one chunk in memory at a time
+    hasher = hashlib.sha256()
+    received = 0
+
+    def hashed_chunks():
+        nonlocal received
+        for chunk in chain([first_chunk], chunks):
+            received += len(chunk)
+            if received > max_size:
+                raise InvalidUpload(f"exceeds {max_size // (1024 * 1024)}MB size limit")
+            hasher.update(chunk)
+            yield chunk
+
+    ext = IMAGE_EXTENSIONS[image_type]
+    incoming = media_store.incoming_path(ext)
+    try:
+        incoming = default_storage.save(incoming, _StreamedContent(hashed_chunks(), incoming))
+    except Exception:
+        default_storage.delete(incoming)
+        raise
+    sha256 = hasher.hexdigest()
+
+    # The final name is the content hash: the file is renamed into place, or
+    # dropped when identical content is already stored
+    name, written = media_store.put(incoming, sha256, ext, received)
+    return StoredUpload(name, received, sha256, image_type, written)
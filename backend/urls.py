@@ -21,6 +21,7 @@ urlpatterns = [
     path("transactions/html/", views.transactions_html, name="transactions_html"),
     path("logs/", views.logs_html, name="logs"),
     path("price_data_model/html/", views.price_data_model_html, name="price_data_model_html"),
+    path("api/listings/<str:listing>/page/", views.listing_page_api, name="listing_page_api"),
 
     # Login & Dashboard
     path('login/', views.login_view, name="login"),
@@ -34,6 +35,7 @@ urlpatterns = [
     path("users/block/<int:user_id>/", views.block_user, name="block_user"),
     path("signup/", views.signup_view, name="signup"),
     path("forgot-password/", views.forgot_password_view, name="forgot_password"),
+    path("reset-password/<str:token>/", views.reset_password_view, name="reset_password"),
 
     # Seller dashboards
     path('buyer-home/', views.buyer_dashboard_view, name="buyer_dashboard"),
@@ -62,6 +64,8 @@ urlpatterns = [
     # Buyer Dashboard API Endpoints
     path("api/buyer/profile/", views.buyer_profile_api, name="buyer_profile_api"),
     path("api/buyer/quick-search/", views.buyer_quick_search_api, name="buyer_quick_search_api"),
+    path("api/buyer/properties/facets/", views.buyer_property_facets_api, name="buyer_property_facets_api"),
+    path("api/properties/<int:property_id>/view/", views.record_property_view_api, name="record_property_view_api"),
     path("api/buyer/saved-properties/", views.buyer_saved_properties_api, name="buyer_saved_properties_api"),
     path("api/buyer/saved-properties/<int:saved_id>/notes/", views.update_saved_property_notes, name="update_saved_property_notes"),
     path("api/buyer/saved-properties/<int:saved_id>/remove/", views.remove_saved_property, name="remove_saved_property"),
@@ -97,6 +101,20 @@ urlpatterns = [
     # Activity Logs Bulk Delete
     path("api/logs/bulk-delete/", views.bulk_delete_logs_api, name="bulk_delete_logs_api"),
 
+    # Background Job Queue
+    path("api/admin/jobs/stats/", views.admin_job_stats_api, name="admin_job_stats_api"),
+
+    # Query Inspector (development)
+    path("admin/query-inspector/", views.admin_query_inspector, name="admin_query_inspector"),
+
+    # Request Metrics (Prometheus)
+    path("metrics/", views.metrics_view, name="metrics"),
+
+    # Request Profiler
+    path("api/admin/profiler/token/", views.admin_profiler_token_api, name="admin_profiler_token_api"),
+    path("api/admin/profiler/profiles/", views.admin_profiles_api, name="admin_profiles_api"),
+    path("admin/profiler/files/<str:filename>", views.admin_profile_download, name="admin_profile_download"),
+
     # AI Chatbot Endpoints
     path("api/chatbot/message/", chatbot_views.chatbot_message_api, name="chatbot_message_api"),
     path("api/chatbot/history/", chatbot_views.chatbot_history_api, name="chatbot_history_api"),
@@ -9,7 +9,7 @@ from django.views.decorators.http import require_POST
 import json
 
 # Restore users_html view
-def users_html(request):
+def users_listing(request):
     query = request.GET.get("q")
     users = EstateUser.objects.all()
 
@@ -24,7 +24,13 @@ def users_html(request):
             # Name par partial search
             users = EstateUser.objects.filter(name__icontains=query)
 
-    return render(request, "backend/users.html", {"users": users, "query": query})
+    return users
+
+
+def users_html(request):
+    from .pagination import paginate_request
+    page = paginate_request(request, users_listing(request), LISTING_KEYS['users'])
+    return render(request, "backend/users.html", {"users": page.items, "page": page, "query": request.GET.get("q")})
 
 # User Management Views for Admin
 from django.http import JsonResponse
@@ -43,8 +49,8 @@ def delete_user(request, user_id):
         user_name = user_to_delete.name
         
         # Log the action before deletion
-        admin_user = EstateUser.objects.get(user_id=request.session['user_id'])
-        Log.objects.create(
+        admin_user = request_user(request)
+        log_activity(
             user=admin_user, 
             action=f"Deleted user: {user_name} (ID: {user_id})"
         )
@@ -80,11 +86,14 @@ def edit_user(request, user_id):
         user_to_edit.email = data.get('email', user_to_edit.email)
         user_to_edit.role = data.get('role', user_to_edit.role)
         
-        user_to_edit.save()
+        try:
+            user_to_edit.save(update_fields=['name', 'phone', 'email', 'role'])
+        except IntegrityError:
+            return JsonResponse({"error": "Email or phone number is already used by another account"}, status=400)
         
         # Log the action
-        admin_user = EstateUser.objects.get(user_id=request.session['user_id'])
-        Log.objects.create(
+        admin_user = request_user(request)
+        log_activity(
             user=admin_user,
             action=f"Edited user: {user_to_edit.name} (ID: {user_id})"
         )
@@ -122,16 +131,16 @@ def block_user(request, user_id):
         # You might want to add a 'is_blocked' field to your EstateUser model
         # For this implementation, we'll log the action but not change the user
         
-        admin_user = EstateUser.objects.get(user_id=request.session['user_id'])
+        admin_user = request_user(request)
         
         if action == 'block':
-            Log.objects.create(
+            log_activity(
                 user=admin_user,
                 action=f"Blocked user: {user_to_block.name} (ID: {user_id})"
             )
             message = f"User '{user_to_block.name}' has been blocked successfully."
         else:
-            Log.objects.create(
+            log_activity(
                 user=admin_user,
                 action=f"Unblocked user: {user_to_block.name} (ID: {user_id})"
             )
@@ -150,139 +159,25 @@ def block_user(request, user_id):
 
 # Restore home view for root URL
 def home(request):
-    # Get all images with property details for carousel
-    from .models import PropertyImage, Property
-    from django.conf import settings
-    import json
-    import os
+    # Carousel comes from a cached snapshot (see home_carousel.py): one cache read
+    from . import home_carousel
     
-    # Check if user is logged in
-    is_logged_in = 'role' in request.session and 'user_id' in request.session
+    # Logged-in user (cached, usually no query); a guest or a deleted
+    # account gets the guest carousel
+    try:
+        user = request_user(request)
+    except EstateUser.DoesNotExist:
+        user = None
+    is_logged_in = user is not None
     user_role = request.session.get('role', None) if is_logged_in else None
-    user_name = None
-    user_id = None
-    
-    # Get user details if logged in
-    if is_logged_in:
-        user_id = request.session.get('user_id')
-        try:
-            from .models import EstateUser
-            user = EstateUser.objects.get(user_id=user_id)
-            user_name = user.name
-            
-            # Log the home page visit for logged-in users
-            from .models import Log
-            Log.objects.create(user=user, action="Visited home page")
-        except EstateUser.DoesNotExist:
-            is_logged_in = False
-            user_role = None
-    
-    # Get images from PropertyImage model with related property data
-    property_images = PropertyImage.objects.select_related('property').order_by('-uploaded_at')
-    carousel_data = []
-    image_urls = []
-    
-    # Add PropertyImage URLs with property details
-    for img in property_images:
-        if img.property:  # Only include images that have associated properties
-            url = img.image_url
-            if url:
-                # Handle different URL formats
-                if url.startswith('http'):
-                    full_url = url
-                elif url.startswith('/media/'):
-                    full_url = url
-                else:
-                    full_url = settings.MEDIA_URL + url
-                
-                # Create carousel item with property details
-                # Hide sensitive info if user is not logged in
-                carousel_item = {
-                    'image_url': full_url,
-                    'title': img.property.title,
-                    'description': img.property.description,
-                    'location': img.property.location,
-                    'city': img.property.city,
-                    'state': img.property.state,
-                    'price': float(img.property.price) if (img.property.price and is_logged_in) else 0,
-                    'property_type': img.property.property_type,
-                    'bedrooms': img.property.bedrooms,
-                    'bathrooms': img.property.bathrooms,
-                    'area_sqft': float(img.property.area_sqft) if img.property.area_sqft else 0,
-                    'status': img.property.status,
-                    'contact': img.property.contact if is_logged_in else 'Login to view contact',
-                    'is_logged_in': is_logged_in,
-                    'show_sensitive_info': is_logged_in
-                }
-                carousel_data.append(carousel_item)
-                image_urls.append(full_url)
-    
-    # Add some default images if no property images exist
-    default_images_data = [
-        {'name': 'apartment.jpeg', 'title': 'Modern Apartment', 'location': 'Mumbai, Maharashtra', 'price': 5000000, 'type': 'Apartment'},
-        {'name': 'download.jpeg', 'title': 'Luxury Villa', 'location': 'Pune, Maharashtra', 'price': 8500000, 'type': 'Villa'},
-        {'name': 'download1.jpeg', 'title': 'Family Home', 'location': 'Delhi, Delhi', 'price': 4500000, 'type': 'House'},
-        {'name': 'shiva1.jpg', 'title': 'Commercial Space', 'location': 'Bangalore, Karnataka', 'price': 7500000, 'type': 'Commercial'},
-        {'name': 'shiva2.jpg', 'title': 'Studio Apartment', 'location': 'Chennai, Tamil Nadu', 'price': 2500000, 'type': 'Studio'},
-        {'name': 'shiva3.jpg', 'title': 'Penthouse', 'location': 'Hyderabad, Telangana', 'price': 12000000, 'type': 'Penthouse'},
-    ]
+    user_id = user.user_id if is_logged_in else None
+    user_name = user.name if is_logged_in else None
     
-    # Add default images if we don't have enough property images
-    for default_img in default_images_data:
-        default_url = settings.MEDIA_URL + default_img['name']
-        media_path = os.path.join(settings.MEDIA_ROOT, default_img['name'])
-        
-        if os.path.exists(media_path) and default_url not in image_urls:
-            carousel_item = {
-                'image_url': default_url,
-                'title': default_img['title'],
-                'description': f"Beautiful {default_img['type'].lower()} with modern amenities and excellent location.",
-                'location': default_img['location'],
-                'city': default_img['location'].split(',')[0].strip(),
-                'state': default_img['location'].split(',')[1].strip() if ',' in default_img['location'] else '',
-                'price': default_img['price'] if is_logged_in else 0,
-                'property_type': default_img['type'],
-                'bedrooms': 2,
-                'bathrooms': 2,
-                'area_sqft': 1200,
-                'status': 'Available',
-                'contact': '+91-9876543210' if is_logged_in else 'Login to view contact',
-                'is_logged_in': is_logged_in,
-                'show_sensitive_info': is_logged_in
-            }
-            carousel_data.append(carousel_item)
-            image_urls.append(default_url)
-    
-    # Ensure we have at least one image
-    if not carousel_data:
-        carousel_data = [{
-            'image_url': settings.MEDIA_URL + 'estatelogo.png',
-            'title': 'Estate Management System',
-            'description': 'Welcome to our AI-powered estate management platform',
-            'location': 'All Cities, India',
-            'city': 'All Cities',
-            'state': 'India',
-            'price': 0,
-            'property_type': 'Platform',
-            'bedrooms': 0,
-            'bathrooms': 0,
-            'area_sqft': 0,
-            'status': 'Active',
-            'contact': 'support@estate.com' if is_logged_in else 'Login to view contact',
-            'is_logged_in': is_logged_in,
-            'show_sensitive_info': is_logged_in
-        }]
-        image_urls = [settings.MEDIA_URL + 'estatelogo.png']
-    
-    # Convert to JSON for JavaScript
-    image_urls_json = json.dumps(image_urls)
-    carousel_data_json = json.dumps(carousel_data)
+    carousel = home_carousel.get_carousel(is_logged_in)
     
     return render(request, "backend/home.html", {
-        "image_urls": image_urls,
-        "image_urls_json": image_urls_json,
-        "carousel_data": carousel_data,
-        "carousel_data_json": carousel_data_json,
+        "image_urls_json": carousel["image_urls_json"],
+        "carousel_data_json": carousel["carousel_data_json"],
         "is_logged_in": is_logged_in,
         "user_role": user_role,
         "user_name": user_name,
@@ -292,8 +187,7 @@ def home(request):
 def buyer_profile(request):
     if 'role' not in request.session or request.session['role'] != "buyer":
         return redirect("/backend/login/")
-    buyer_id = request.session.get('buyer_id') or request.session.get('user_id')
-    user = EstateUser.objects.get(user_id=buyer_id)
+    user = request_user(request)
     address = user.address if hasattr(user, 'address') else None
     account_created = user.created_at if hasattr(user, 'created_at') else None
     last_login = user.last_login if hasattr(user, 'last_login') else None
@@ -307,8 +201,7 @@ def buyer_profile(request):
 def admin_profile(request):
     if 'role' not in request.session or request.session['role'] != "admin":
         return redirect("/backend/login/")
-    admin_id = request.session.get('admin_user') or request.session.get('user_id')
-    user = EstateUser.objects.get(user_id=admin_id)
+    user = request_user(request)
     address = user.address if hasattr(user, 'address') else None
     account_created = user.created_at if hasattr(user, 'created_at') else None
     last_login = user.last_login if hasattr(user, 'last_login') else None
@@ -339,7 +232,7 @@ def seller_transactions(request):
         return redirect("/backend/login/")
     seller_id = request.session['user_id']
     query = request.GET.get("q", "").strip().lower()
-    transactions = Transaction.objects.filter(booking__property__user_id=seller_id)
+    transactions = Transaction.objects.select_related('booking__user', 'booking__property').filter(booking__property__user_id=seller_id)
     if query:
         transactions = transactions.filter(models.Q(booking__property__title__icontains=query))
     return render(request, "backend/transactions.html", {"transactions": transactions, "query": query, "user_role": "seller"})
@@ -354,13 +247,12 @@ def seller_logs(request):
 def seller_profile(request):
     if 'role' not in request.session or request.session['role'] != "seller":
         return redirect("/backend/login/")
-    seller_id = request.session['user_id']
-    user = EstateUser.objects.get(user_id=seller_id)
+    user = request_user(request)
     total_properties = user.properties.count()
     address = user.address if hasattr(user, 'address') else None
     account_created = user.created_at if hasattr(user, 'created_at') else None
     last_login = user.last_login if hasattr(user, 'last_login') else None
-    Log.objects.create(user=user, action="Viewed profile")
+    log_activity(user=user, action="Viewed profile")
     return render(request, "backend/profile.html", {
         "user": user,
         "total_properties": total_properties,
@@ -398,12 +290,13 @@ def upload_profile_photo(request):
         return redirect("/backend/login/")
 
     if request.method == "POST":
-        user = EstateUser.objects.get(user_id=user_id)
+        user = request_user(request)
         photo = request.FILES.get('profile_photo')
         if photo:
             user.profile_photo = photo
-            user.save()
-            Log.objects.create(user=user, action="Uploaded profile photo")
+            # request_user() is a cached copy: write only this column, never stale password/role
+            user.save(update_fields=['profile_photo'])
+            log_activity(user=user, action="Uploaded profile photo")
             messages.success(request, "Profile photo changed successfully!")
         else:
             messages.error(request, "No photo selected.")
@@ -412,23 +305,16 @@ def upload_profile_photo(request):
 
 from django.shortcuts import render, redirect
 from django.contrib import messages
-from .models import EstateUser, Property, PropertyImage, Booking, Transaction, Log, PriceDataModel
+from .models import EstateUser, Property, PropertyImage, Booking, Transaction, Log, PriceDataModel, normalize_email, normalize_phone
+from django.db import IntegrityError
+from .activity_log import log_activity
+from .current_user import login_required, request_user, session_user_id
+from . import passwords
 from django.http import JsonResponse
 from django.core.mail import send_mail
 from django.db import models
 
 
-# Login required decorator
-def login_required(allowed_roles=None):
-    def decorator(view_func):
-        def wrapper(request, *args, **kwargs):
-            if 'role' not in request.session:
-                return redirect("/backend/login/")
-            if allowed_roles and request.session['role'] not in allowed_roles:
-                return redirect("/backend/login/")
-            return view_func(request, *args, **kwargs)
-        return wrapper
-    return decorator
 
 # ---------------------------
 # JSON APIs
@@ -437,8 +323,7 @@ def profile_view(request):
     if 'role' not in request.session:
         return redirect("/backend/login/")
     role = request.session['role']
-    user_id = request.session.get('user_id')
-    user = EstateUser.objects.get(user_id=user_id)
+    user = request_user(request)
     address = getattr(user, 'address', None)
     account_created = getattr(user, 'created_at', None)
     last_login = getattr(user, 'last_login', None)
@@ -451,7 +336,7 @@ def profile_view(request):
     }
     if role == "seller":
         context["total_properties"] = user.properties.count()
-        Log.objects.create(user=user, action="Viewed profile")
+        log_activity(user=user, action="Viewed profile")
     return render(request, "backend/profile.html", context)
 
 def edit_profile(request):
@@ -459,17 +344,21 @@ def edit_profile(request):
         return redirect("/backend/login/")
     
     role = request.session['role']
-    user_id = request.session.get('user_id')
-    user = EstateUser.objects.get(user_id=user_id)
+    user = request_user(request)
     
     if request.method == "POST":
         user.name = request.POST.get("name", user.name)
         user.email = request.POST.get("email", user.email)
         user.phone = request.POST.get("phone", user.phone)
         user.address = request.POST.get("address", user.address)
-        user.save()
+        try:
+            # request_user() is a cached copy: write only the edited fields, never stale password/role
+            user.save(update_fields=['name', 'email', 'phone', 'address'])
+        except IntegrityError:
+            messages.error(request, "Email or phone number is already used by another account.")
+            return render(request, "backend/edit_profile.html", {"user": user, "role": role})
         messages.success(request, "Profile updated successfully!")
-        Log.objects.create(user=user, action="Edited profile")
+        log_activity(user=user, action="Edited profile")
         
         # Redirect based on role
         if role == "admin":
@@ -488,8 +377,7 @@ def change_password(request):
         return redirect("/backend/login/")
     
     role = request.session['role']
-    user_id = request.session.get('user_id')
-    user = EstateUser.objects.get(user_id=user_id)
+    user = request_user(request)
     
     if request.method == "POST":
         old_password = request.POST.get("old_password")
@@ -500,11 +388,20 @@ def change_password(request):
             messages.error(request, "New passwords do not match!")
         elif len(new_password) < 6:
             messages.error(request, "Password must be at least 6 characters long!")
-        elif user.password_hash == old_password:
-            user.password_hash = new_password
-            user.save()
+        else:
+            try:
+                matches, _ = passwords.verify_password(old_password, user.password_hash, rehash=False)
+                new_hash = passwords.hash_password(new_password) if matches else None
+            except passwords.PasswordPoolBusy:
+                messages.error(request, "Server is busy. Please try again in a few seconds.")
+                return render(request, "backend/change_password.html", {"user": user, "role": role}, status=503)
+            if not matches:
+                messages.error(request, "Current password is incorrect.")
+                return render(request, "backend/change_password.html", {"user": user, "role": role})
+            user.password_hash = new_hash
+            user.save(update_fields=['password_hash'])
             messages.success(request, "Password changed successfully!")
-            Log.objects.create(user=user, action="Changed password")
+            log_activity(user=user, action="Changed password")
             
             # Redirect based on role
             if role == "admin":
@@ -515,12 +412,10 @@ def change_password(request):
                 return redirect("/backend/seller/profile/")
             else:
                 return redirect("/backend/profile/")
-        else:
-            messages.error(request, "Current password is incorrect.")
     
     return render(request, "backend/change_password.html", {"user": user, "role": role})
 
-def properties_html(request):
+def properties_listing(request):
     query = request.GET.get("q")
     properties = Property.objects.prefetch_related('images').all()
 
@@ -534,20 +429,26 @@ def properties_html(request):
                 models.Q(title__icontains=query) | models.Q(location__icontains=query)
             )
 
-    return render(request, "backend/properties.html", {"properties": properties, "query": query})
+    return properties
+
+
+def properties_html(request):
+    from .pagination import paginate_request
+    page = paginate_request(request, properties_listing(request), LISTING_KEYS['properties'])
+    return render(request, "backend/properties.html", {"properties": page.items, "page": page, "query": request.GET.get("q")})
 
 # ---------------------------
 def property_images_html(request):
     query = request.GET.get("q", "").strip().lower()
-    property_images = PropertyImage.objects.all()
+    property_images = PropertyImage.objects.select_related('property')
 
     if query:
         if query.isdigit():  
             # Agar sirf numbers hai to ID search karo
-            property_images = PropertyImage.objects.filter(image_id=int(query))
+            property_images = PropertyImage.objects.select_related('property').filter(image_id=int(query))
         else:
             # Name/description ko case-insensitive search karo
-            property_images = PropertyImage.objects.filter(
+            property_images = PropertyImage.objects.select_related('property').filter(
                 models.Q(image_url__icontains=query) |
                 models.Q(description__icontains=query)
             )
@@ -576,26 +477,15 @@ def property_images_html(request):
     })
 
 
-def bookings_html(request):
+def bookings_listing(request):
     # Check user role and show appropriate bookings
     role = request.session.get('role')
-    
-    if not role:
-        return redirect("/backend/login/")
-    
     query = request.GET.get("q")
     
     if role == "buyer":
         # Show only buyer's own bookings
         user_id = request.session.get('buyer_id') or request.session.get('user_id')
         bookings = Booking.objects.filter(user_id=user_id).select_related('property', 'property__user').prefetch_related('property__images', 'transactions')
-        
-        # Log activity
-        try:
-            buyer = EstateUser.objects.get(user_id=user_id)
-            Log.objects.create(user=buyer, action="Viewed my bookings")
-        except EstateUser.DoesNotExist:
-            pass
             
     elif role == "seller":
         # Show bookings for seller's properties
@@ -618,16 +508,37 @@ def bookings_html(request):
             )
     
     # Order by most recent first
-    bookings = bookings.order_by('-booking_date')
+    return bookings.order_by('-booking_date')
+
+
+def bookings_html(request):
+    role = request.session.get('role')
+    
+    if not role:
+        return redirect("/backend/login/")
+    
+    from .pagination import paginate_request
+    bookings = bookings_listing(request)
+    
+    if role == "buyer":
+        # Log activity
+        try:
+            buyer = request_user(request)
+            log_activity(user=buyer, action="Viewed my bookings")
+        except EstateUser.DoesNotExist:
+            pass
     
     # Calculate status counts for buyer dashboard
     total_count = bookings.count()
     pending_count = bookings.filter(status='pending').count()
     confirmed_count = bookings.filter(status='confirmed').count()
+    
+    page = paginate_request(request, bookings, LISTING_KEYS['bookings'])
 
     return render(request, "backend/bookings.html", {
-        "bookings": bookings, 
-        "query": query,
+        "bookings": page.items, 
+        "page": page,
+        "query": request.GET.get("q"),
         "role": role,
         "total_count": total_count,
         "pending_count": pending_count,
@@ -661,73 +572,69 @@ def update_booking_status(request, booking_id):
             if booking.property.user_id != seller_id:
                 return JsonResponse({"error": "Unauthorized - You don't own this property"}, status=403)
         
-        # Update the booking status
-        old_status = booking.status
-        booking.status = new_status
-        booking.save()
-        
-        # ✅ CRITICAL FIX: If booking is confirmed/completed, mark property as Sold
-        if new_status in ['confirmed', 'completed']:
-            property_obj = booking.property
-            if property_obj and property_obj.status != 'Sold':
-                property_obj.status = 'Sold'
-                property_obj.save()
-                
-                # Notify seller that property is sold
-                from . import notification_service
-                seller = property_obj.user
-                if seller:
-                    notification_service.create_seller_notification(
-                        seller_id=seller.user_id,
-                        title=f'🎉 Property Sold: {property_obj.title}',
-                        message=f'Your property "{property_obj.title}" has been marked as SOLD. Booking #{booking_id} is now {new_status}. Buyer: {booking.user.name if booking.user else "Unknown"}',
-                        notification_type=notification_service.NotificationType.PAYMENT_RECEIVED,
-                        property_obj=property_obj,
-                        booking_obj=booking
-                    )
-        
-        # If booking is cancelled and property was sold, mark it back as Available (optional)
-        elif new_status == 'cancelled':
-            property_obj = booking.property
-            if property_obj and property_obj.status == 'Sold':
-                # Check if there are other confirmed bookings for this property
-                other_confirmed_bookings = Booking.objects.filter(
-                    property=property_obj,
-                    status__in=['confirmed', 'completed']
-                ).exclude(booking_id=booking_id).exists()
-                
-                if not other_confirmed_bookings:
-                    # No other confirmed bookings, mark property as Available again
-                    property_obj.status = 'Available'
-                    property_obj.save()
+        admin_or_seller = request_user(request)
         
-        # Get the user making the change
-        user_id = request.session.get('user_id')
-        if role == 'seller':
-            user_id = request.session.get('seller_id') or user_id
-        elif role == 'admin':
-            user_id = request.session.get('admin_user') or user_id
+        from django.db import transaction as db_transaction
+        from . import jobs, notification_service
         
-        admin_or_seller = EstateUser.objects.get(user_id=user_id)
+        # Status writes commit together with their queued notifications
+        with db_transaction.atomic():
+            # Update the booking status
+            old_status = booking.status
+            booking.status = new_status
+            booking.save()
+            
+            # ✅ CRITICAL FIX: If booking is confirmed/completed, mark property as Sold
+            if new_status in ['confirmed', 'completed']:
+                property_obj = booking.property
+                if property_obj and property_obj.status != 'Sold':
+                    property_obj.status = 'Sold'
+                    property_obj.save()
+                    
+                    # Notify seller that property is sold
+                    seller_id = property_obj.user_id
+                    if seller_id:
+                        jobs.enqueue_on_commit(
+                            "notifications.seller",
+                            seller_id=seller_id,
+                            title=f'🎉 Property Sold: {property_obj.title}',
+                            message=f'Your property "{property_obj.title}" has been marked as SOLD. Booking #{booking_id} is now {new_status}. Buyer: {booking.user.name if booking.user else "Unknown"}',
+                            notification_type=notification_service.NotificationType.PAYMENT_RECEIVED,
+                            property_id=property_obj.property_id,
+                            booking_id=booking.booking_id
+                        )
+            
+            # If booking is cancelled and property was sold, mark it back as Available (optional)
+            elif new_status == 'cancelled':
+                property_obj = booking.property
+                if property_obj and property_obj.status == 'Sold':
+                    # Check if there are other confirmed bookings for this property
+                    other_confirmed_bookings = Booking.objects.filter(
+                        property=property_obj,
+                        status__in=['confirmed', 'completed']
+                    ).exclude(booking_id=booking_id).exists()
+                    
+                    if not other_confirmed_bookings:
+                        # No other confirmed bookings, mark property as Available again
+                        property_obj.status = 'Available'
+                        property_obj.save()
+            
+            # Notify buyer and admin about the status change
+            if new_status == 'confirmed':
+                jobs.enqueue_on_commit("notifications.booking_confirmed", booking.booking_id)
+            elif new_status == 'cancelled':
+                # Determine who cancelled - if seller/admin, notify buyer
+                cancelled_by = 'seller' if role == 'seller' else 'admin'
+                jobs.enqueue_on_commit("notifications.booking_cancelled", booking.booking_id, cancelled_by=cancelled_by)
         
         # Log the action
-        Log.objects.create(
+        log_activity(
             user=admin_or_seller,
             action=f"Updated booking #{booking_id} status from '{old_status}' to '{new_status}' for property: {booking.property.title}"
         )
         
-        # Notify buyer and admin about the status change using notification service
-        from . import notification_service
-        
-        if new_status == 'confirmed':
-            notification_service.notify_booking_confirmed(booking_id)
-        elif new_status == 'cancelled':
-            # Determine who cancelled - if seller/admin, notify buyer
-            cancelled_by = 'seller' if role == 'seller' else 'admin'
-            notification_service.notify_booking_cancelled(booking_id, cancelled_by=cancelled_by)
-        
         # Log activity for the buyer as well
-        Log.objects.create(
+        log_activity(
             user=booking.user,
             action=f"Booking #{booking_id} status changed to '{new_status}' for property: {booking.property.title}"
         )
@@ -746,58 +653,70 @@ def update_booking_status(request, booking_id):
     except Exception as e:
         return JsonResponse({"error": f"Update failed: {str(e)}"}, status=500)
 
-def transactions_html(request):
+def transactions_listing(request):
     query = request.GET.get("q")
-    transactions = Transaction.objects.all()
+    transactions = Transaction.objects.select_related('booking__user', 'booking__property')
 
     if query:
         if query.isdigit():
-            transactions = Transaction.objects.filter(txn_id=query)  # fix: correct pk
+            transactions = transactions.filter(txn_id=query)  # fix: correct pk
         else:
             # abhi Transaction me buyer/seller direct nahi hai
-            transactions = Transaction.objects.filter(
+            transactions = transactions.filter(
                 booking__user__name__icontains=query
             )
 
-    return render(request, "backend/transactions.html", {"transactions": transactions, "query": query})
+    return transactions
 
-def logs_html(request):
+
+def transactions_html(request):
+    from .pagination import paginate_request
+    page = paginate_request(request, transactions_listing(request), LISTING_KEYS['transactions'])
+    return render(request, "backend/transactions.html", {"transactions": page.items, "page": page, "query": request.GET.get("q")})
+
+def logs_listing(request):
     query = request.GET.get("q")
-    recent = request.GET.get("recent")
     role = request.session.get('role')
     if role == 'admin':
-        logs = Log.objects.all()
+        logs = Log.objects.select_related('user')
     else:
         user_id = request.session.get('buyer_id') or request.session.get('seller_id') or request.session.get('user_id')
-        logs = Log.objects.filter(user_id=user_id)
+        logs = Log.objects.select_related('user').filter(user_id=user_id)
 
-    # If ?recent=1, show only recent property views for current user (for admin, show all recent property views)
+    if query:
+        logs = logs.filter(
+            models.Q(action__icontains=query) | models.Q(user__name__icontains=query)
+        )
+
+    return logs
+
+
+def logs_html(request):
+    from . import activity_log
+    activity_log.flush()  # show this process's buffered entries too
+
+    query = request.GET.get("q")
+    recent = request.GET.get("recent")
+    role = request.session.get('role')
+
+    # If ?recent=1, show the recently viewed properties of the current user (for admin, latest views of everyone)
     if recent == "1":
-        if role == 'admin':
-            logs_recent = logs.filter(action__icontains="Viewed properties list").order_by('-timestamp')[:20]
-        else:
-            logs_recent = logs.filter(action__icontains="Viewed properties list").order_by('-timestamp')[:20]
+        from . import property_views
+        property_views.flush()  # include this process's buffered views
+        viewer_id = None if role == 'admin' else session_user_id(request.session)
         recent_props = []
-        for log in logs_recent:
-            import re
-            match = re.search(r'property\s*(\d+)', log.action)
-            prop = None
-            if match:
-                prop_id = int(match.group(1))
-                try:
-                    prop = Property.objects.get(property_id=prop_id)
-                except Property.DoesNotExist:
-                    prop = None
-            if prop:
-                image = prop.images.first().image_url if prop.images.exists() else None
+        if role == 'admin' or viewer_id:
+            for view in property_views.recently_viewed(viewer_id):
+                prop = view.property
+                images = list(prop.images.all())
                 recent_props.append({
                     'title': prop.title,
                     'location': prop.location,
                     'city': prop.city,
                     'state': prop.state,
                     'address': prop.address,
-                    'image': image,
-                    'viewed_at': log.timestamp,
+                    'image': images[0].image_url if images else None,
+                    'viewed_at': view.viewed_at,
                     'description': prop.description,
                     'price': prop.price,
                     'type': prop.property_type,
@@ -810,14 +729,11 @@ def logs_html(request):
                 })
         return render(request, "backend/logs.html", {"recent_props": recent_props, "recent": True})
 
-    if query:
-        logs = logs.filter(
-            models.Q(action__icontains=query) | models.Q(user__name__icontains=query)
-        )
-
-    return render(request, "backend/logs.html", {"logs": logs, "query": query})
+    from .pagination import paginate_request
+    page = paginate_request(request, logs_listing(request), LISTING_KEYS['logs'])
+    return render(request, "backend/logs.html", {"logs": page.items, "page": page, "query": query})
 
-def price_data_model_html(request):
+def price_data_model_listing(request):
     query = request.GET.get("q")
     price_data_model = PriceDataModel.objects.all()
 
@@ -827,71 +743,268 @@ def price_data_model_html(request):
         else:
             price_data_model = PriceDataModel.objects.filter(location__icontains=query)
 
-    return render(request, "backend/price_data_model.html", {"prices": price_data_model, "query": query})
+    return price_data_model
+
+
+def price_data_model_html(request):
+    from .pagination import paginate_request
+    page = paginate_request(request, price_data_model_listing(request), LISTING_KEYS['price_data_model'])
+    return render(request, "backend/price_data_model.html", {
+        "prices": page.items,
+        "price_data_model": page.items,
+        "page": page,
+        "query": request.GET.get("q")
+    })
+
+
+# ---------------------------
+# Keyset-paginated listing page API
+# ---------------------------
+# Sort keys per listing: newest first, primary key as the unique tie-breaker
+LISTING_KEYS = {
+    'properties': ('-created_at', '-property_id'),
+    'users': ('-created_at', '-user_id'),
+    'logs': ('-timestamp', '-log_id'),
+    'transactions': ('-payment_date', '-txn_id'),
+    'bookings': ('-booking_date', '-booking_id'),
+    'price_data_model': ('-data_id',),
+}
+
+
+def _serialize_property_row(prop):
+    return {
+        'property_id': prop.property_id,
+        'title': prop.title,
+        'location': prop.location,
+        'city': prop.city,
+        'state': prop.state,
+        'price': float(prop.price),
+        'property_type': prop.property_type,
+        'status': prop.status,
+        'owner_id': prop.user_id,
+        'created_at': prop.created_at.strftime('%Y-%m-%d %H:%M'),
+    }
+
+
+def _serialize_user_row(user):
+    return {
+        'user_id': user.user_id,
+        'name': user.name,
+        'role': user.role,
+        'email': user.email,
+        'phone': user.phone,
+        'created_at': user.created_at.strftime('%Y-%m-%d %H:%M'),
+    }
+
+
+def _serialize_log_row(log):
+    return {
+        'log_id': log.log_id,
+        'user_id': log.user_id,
+        'user_name': log.user.name if log.user else None,
+        'action': log.action,
+        'timestamp': log.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def _serialize_transaction_row(txn):
+    return {
+        'txn_id': txn.txn_id,
+        'booking_id': txn.booking_id,
+        'amount': float(txn.amount),
+        'payment_status': txn.payment_status,
+        'payment_method': txn.payment_method,
+        'payment_date': txn.payment_date.strftime('%Y-%m-%d %H:%M'),
+    }
+
+
+def _serialize_booking_row(booking):
+    return {
+        'booking_id': booking.booking_id,
+        'property_id': booking.property_id,
+        'property_title': booking.property.title if booking.property else None,
+        'user_id': booking.user_id,
+        'status': booking.status,
+        'booking_date': booking.booking_date.strftime('%Y-%m-%d %H:%M'),
+    }
+
+
+def _serialize_price_data_row(price):
+    return {
+        'data_id': price.data_id,
+        'location': price.location,
+        'area_sqft': price.area_sqft,
+        'bedrooms': price.bedrooms,
+        'bathrooms': price.bathrooms,
+        'property_type': price.property_type,
+        'actual_price': float(price.actual_price),
+    }
+
+
+# listing name -> (queryset builder, row serializer, roles allowed)
+LISTINGS = {
+    'properties': (properties_listing, _serialize_property_row, ['admin']),
+    'users': (users_listing, _serialize_user_row, ['admin']),
+    'logs': (logs_listing, _serialize_log_row, ['admin', 'seller', 'buyer']),
+    'transactions': (transactions_listing, _serialize_transaction_row, ['admin']),
+    'bookings': (bookings_listing, _serialize_booking_row, ['admin', 'seller', 'buyer']),
+    'price_data_model': (price_data_model_listing, _serialize_price_data_row, ['admin']),
+}
+
+
+@csrf_exempt
+def listing_page_api(request, listing):
+    """
+    Keyset-paginated JSON page of a listing (infinite scroll)
+    GET /backend/api/listings/<listing>/page/?cursor=<opaque>&page_size=50&q=...
+    """
+    if listing not in LISTINGS:
+        return JsonResponse({"error": "Unknown listing"}, status=404)
+    
+    builder, serializer, allowed_roles = LISTINGS[listing]
+    if request.session.get('role') not in allowed_roles:
+        return JsonResponse({"error": "Unauthorized"}, status=403)
+    
+    from .pagination import paginate_queryset, InvalidCursor, DEFAULT_PAGE_SIZE
+    
+    try:
+        page_size = int(request.GET.get('page_size', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return JsonResponse({"error": "page_size must be an integer"}, status=400)
+    
+    try:
+        page = paginate_queryset(
+            builder(request),
+            LISTING_KEYS[listing],
+            cursor=request.GET.get('cursor') or None,
+            page_size=page_size
+        )
+    except InvalidCursor as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+    
+    return JsonResponse({
+        'success': True,
+        'listing': listing,
+        'results': [serializer(row) for row in page.items],
+        'count': len(page.items),
+        'page_size': page.page_size,
+        'has_next': page.has_next,
+        'next_cursor': page.next_cursor
+    })
 
 # Buyer - Browse Properties view
 def buyer_properties_view(request):
     if 'role' not in request.session or request.session['role'] != "buyer":
         return redirect("/backend/login/")
     
-    query = request.GET.get("q")
-    property_type = request.GET.get("type")
-    city = request.GET.get("city")
-    min_price = request.GET.get("min_price")
-    max_price = request.GET.get("max_price")
+    from . import property_facets
     
     # ✅ CRITICAL: Only show Available properties to buyers
     # Sold properties are automatically hidden from buyer search
     # This prevents buyers from trying to purchase already-sold properties
-    properties = Property.objects.prefetch_related('images').filter(status="Available")
-    
-    # Apply filters
-    if query:
-        properties = properties.filter(
-            models.Q(title__icontains=query) |
-            models.Q(description__icontains=query) |
-            models.Q(city__icontains=query) |
-            models.Q(state__icontains=query) |
-            models.Q(location__icontains=query)
-        )
-    
-    if property_type:
-        properties = properties.filter(property_type=property_type)
-    
-    if city:
-        properties = properties.filter(city__icontains=city)
-    
-    if min_price:
-        try:
-            properties = properties.filter(price__gte=int(min_price))
-        except ValueError:
-            pass
-    
-    if max_price:
-        try:
-            properties = properties.filter(price__lte=int(max_price))
-        except ValueError:
-            pass
+    filters = property_facets.parse_filters(request.GET)
+    properties = property_facets.filter_results(filters).select_related('user').prefetch_related('images')
     
     # Order by price (default)
     properties = properties.order_by('price')
     
+    # Facet counts for the filter sidebar (single grouped query)
+    facets = property_facets.compute_facets(filters)
+    
     # Log the activity
     try:
-        buyer = EstateUser.objects.get(user_id=request.session['user_id'])
-        Log.objects.create(user=buyer, action="Browsed available properties")
+        buyer = request_user(request)
+        log_activity(user=buyer, action="Browsed available properties")
     except EstateUser.DoesNotExist:
         pass
     
     return render(request, "backend/buyer_properties.html", {
         "properties": properties, 
-        "query": query,
-        "property_type": property_type,
-        "city": city,
-        "min_price": min_price,
-        "max_price": max_price
+        "query": filters['query'],
+        "property_type": filters['property_type'],
+        "city": filters['city'],
+        "min_price": request.GET.get("min_price"),
+        "max_price": request.GET.get("max_price"),
+        "bedrooms": filters['bedrooms'],
+        "bathrooms": filters['bathrooms'],
+        "price_bucket": filters['price_bucket'],
+        "facets": facets
     })
 
+
+@csrf_exempt
+def record_property_view_api(request, property_id):
+    """API endpoint the property details modal calls to count a view (buffered, see property_views.py)"""
+    if 'role' not in request.session:
+        return JsonResponse({"error": "Login required"}, status=403)
+    
+    if request.method != "POST":
+        return JsonResponse({"error": "POST method required"}, status=405)
+    
+    from . import property_views
+    property_views.record_view(property_id, session_user_id(request.session))
+    return JsonResponse({'success': True}, status=202)
+
+
+@csrf_exempt
+def buyer_property_facets_api(request):
+    """
+    Faceted property search API for the buyer browse page
+    Returns one page of results plus counts by type, city, bedrooms, bathrooms and price bucket
+    """
+    if 'role' not in request.session or request.session['role'] != 'buyer':
+        return JsonResponse({"error": "Buyer access required"}, status=403)
+    
+    try:
+        from . import image_variants, property_facets
+        
+        try:
+            page = int(request.GET.get('page', 1))
+            page_size = int(request.GET.get('page_size', property_facets.DEFAULT_PAGE_SIZE))
+        except ValueError:
+            return JsonResponse({"error": "page and page_size must be integers"}, status=400)
+        
+        search = property_facets.faceted_search(request.GET, page=page, page_size=page_size)
+        
+        results = []
+        for prop in search['results']:
+            image = image_variants.card_image_payload(
+                image_variants.first_image(prop), default=settings.MEDIA_URL + 'default_property.jpg'
+            )
+            
+            results.append({
+                'property_id': prop.property_id,
+                'title': prop.title,
+                'location': prop.location,
+                'city': prop.city,
+                'state': prop.state,
+                'price': float(prop.price),
+                'area_sqft': float(prop.area_sqft) if prop.area_sqft else None,
+                'bedrooms': prop.bedrooms,
+                'bathrooms': prop.bathrooms,
+                'property_type': prop.property_type,
+                'status': prop.status,
+                **image
+            })
+        
+        return JsonResponse({
+            'success': True,
+            'properties': results,
+            'facets': search['facets'],
+            'total': search['total'],
+            'page': search['page'],
+            'page_size': search['page_size'],
+            'has_next': search['page'] * search['page_size'] < search['total']
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=500)
+
 # ---------------------------
 # Authentication & Dashboard Views
 # ---------------------------
@@ -905,23 +1018,29 @@ def login_view(request):
         user = None
 
         # 1) agar identifier me '@' hai -> treat as email
+        # Both lookups hit a unique index on the normalized column
         if "@" in identifier:
-            try:
-                user = EstateUser.objects.filter(email__iexact=identifier).first()
-            except EstateUser.DoesNotExist:
-                user = None
+            email_key = normalize_email(identifier)
+            user = EstateUser.objects.filter(email_normalized=email_key).first() if email_key else None
         else:
-            # 2) otherwise treat as phone (also try exact match)
-            ph = ''.join(ch for ch in identifier if ch.isdigit())  # normalize: keep only digits
-            try:
-                user = EstateUser.objects.filter(phone__icontains=ph).first()
-            except EstateUser.DoesNotExist:
-                user = None
+            # 2) otherwise treat as phone (any formatting: spaces, dashes, +91, leading 0)
+            phone_key = normalize_phone(identifier)
+            user = EstateUser.objects.filter(phone_normalized=phone_key).first() if phone_key else None
 
-        # 3) verify user and password (note: currently using plain text compare)
+        # 3) verify user and password (hashing runs in the bounded pool, see passwords.py)
         if user:
-            # if you store plain text (password_hash holds plain) compare directly:
-            if user.password_hash == password:
+            try:
+                matches, new_hash = passwords.verify_password(password, user.password_hash)
+            except passwords.PasswordPoolBusy:
+                messages.error(request, "Too many sign-ins right now. Please try again in a few seconds.")
+                response = render(request, "backend/login.html", status=503)
+                response['Retry-After'] = '5'
+                return response
+            if matches and new_hash:
+                # Legacy plaintext (or outdated hash) -> current hasher
+                user.password_hash = new_hash
+                user.save(update_fields=['password_hash'])
+            if matches:
                 # optional: check role if you require role match
                 if role and role != user.role:
                     messages.error(request, "Role does not match this account.")
@@ -939,7 +1058,7 @@ def login_view(request):
                     request.session['seller_id'] = user.user_id
                 
                 # Log successful login
-                Log.objects.create(user=user, action=f"Logged in as {user.role}")
+                log_activity(user=user, action=f"Logged in as {user.role}")
                 
                 # Check if there's a redirect parameter from URL
                 redirect_url = request.GET.get('next', '')
@@ -975,9 +1094,8 @@ def logout_view(request):
     # Log the logout activity before clearing session
     if 'user_id' in request.session:
         try:
-            user_id = request.session.get('user_id')
-            user = EstateUser.objects.get(user_id=user_id)
-            Log.objects.create(user=user, action="Logged out from system")
+            user = request_user(request)
+            log_activity(user=user, action="Logged out from system")
         except EstateUser.DoesNotExist:
             pass
     
@@ -996,26 +1114,38 @@ def signup_view(request):
         address = request.POST.get("address")
 
         # Check if username, email or phone already exists
+        email_key = normalize_email(email)
+        phone_key = normalize_phone(phone)
         if EstateUser.objects.filter(name=username).exists():
             messages.error(request, "❌ Username already exists. Please choose a different username.")
-        elif EstateUser.objects.filter(email=email).exists():
+        elif email_key and EstateUser.objects.filter(email_normalized=email_key).exists():
             messages.error(request, "❌ Email already registered. Please use a different email or try logging in.")
-        elif EstateUser.objects.filter(phone=phone).exists():
+        elif phone_key and EstateUser.objects.filter(phone_normalized=phone_key).exists():
             messages.error(request, "❌ Phone number already registered. Please use a different number or try logging in.")
         else:
+            try:
+                password_hash = passwords.hash_password(password or "")
+            except passwords.PasswordPoolBusy:
+                messages.error(request, "Server is busy. Please try again in a few seconds.")
+                return render(request, "backend/login.html", status=503)
             # Create new user
             user = EstateUser(
                 name=username,
                 email=email,
                 phone=phone,
                 role=role,
-                password_hash=password,
+                password_hash=password_hash,
                 address=address
             )
-            user.save()
+            try:
+                user.save()
+            except IntegrityError:
+                # Same email/phone registered concurrently (unique lookup columns)
+                messages.error(request, "❌ Email or phone number already registered. Please try logging in.")
+                return render(request, "backend/login.html")
             
             # Log account creation
-            Log.objects.create(user=user, action=f"Account created as {role}")
+            log_activity(user=user, action=f"Account created as {role}")
             
             # Auto-login after successful signup for better UX
             request.session['role'] = user.role
@@ -1041,143 +1171,120 @@ def signup_view(request):
     return render(request, "backend/login.html")
 
 def forgot_password_view(request):
+    """
+    Email a password reset link (the password itself only changes when the link is used)
+    POST /backend/forgot-password/
+    """
     if request.method == "POST":
         email = request.POST.get("email")
-        try:
-            user = EstateUser.objects.get(email=email)
+        user = EstateUser.objects.filter(email_normalized=normalize_email(email)).first() if email else None
+        if user is not None:
+            token = passwords.make_reset_token(user)
+            reset_url = request.build_absolute_uri(f"/backend/reset-password/{token}/")
             # Log password recovery attempt
-            Log.objects.create(user=user, action="Requested password recovery")
+            log_activity(user=user, action="Requested password recovery")
             
             send_mail(
                 "Estate Management Password Recovery",
-                f"Hello {user.name},\n\nYour password is: {user.password_hash}\n\nPlease login and consider changing your password for security.\n\nBest regards,\nEstate Management Team",
+                f"Hello {user.name},\n\nTo choose a new password, open this link within {passwords.RESET_MAX_AGE // 60} minutes:\n{reset_url}\n\nIf you did not ask for this, ignore this email; your password has not been changed.\n\nBest regards,\nEstate Management Team",
                 "from@example.com",
-                [email],
+                [user.email],
                 fail_silently=False,
             )
-            messages.success(request, "✅ Password recovery email has been sent! Please check your inbox.")
-        except EstateUser.DoesNotExist:
-            messages.error(request, "❌ Email address not found in our records. Please check and try again.")
+        # Same answer whether or not the address is registered
+        messages.success(request, "✅ If this email is registered, a password reset link has been sent. Please check your inbox.")
     return redirect("/backend/login/")
 
 
+def reset_password_view(request, token):
+    """
+    Set a new password from an emailed reset link
+    GET/POST /backend/reset-password/<token>/
+    """
+    user = passwords.user_for_reset_token(token)
+    if user is None:
+        messages.error(request, "❌ This password reset link is invalid or has expired. Please request a new one.")
+        return redirect("/backend/login/")
+    
+    if request.method == "POST":
+        new_password = request.POST.get("new_password") or ""
+        confirm_password = request.POST.get("confirm_password")
+        
+        if new_password != confirm_password:
+            messages.error(request, "Passwords do not match!")
+        elif len(new_password) < 6:
+            messages.error(request, "Password must be at least 6 characters long!")
+        else:
+            try:
+                user.password_hash = passwords.hash_password(new_password)
+            except passwords.PasswordPoolBusy:
+                messages.error(request, "Server is busy. Please try again in a few seconds.")
+                return render(request, "backend/reset_password.html", {"user": user}, status=503)
+            user.save(update_fields=['password_hash'])
+            log_activity(user=user, action="Reset password from email link")
+            messages.success(request, "✅ Password has been reset. Please login with your new password.")
+            return redirect("/backend/login/")
+    
+    return render(request, "backend/reset_password.html", {"user": user})
+
+
 
 @login_required(allowed_roles=["admin", "buyer", "seller"])
 def dashboard_view(request):
     role = request.session['role']
     if role == "admin":
-        admin_id = request.session.get('admin_user') or request.session.get('user_id')
-        user = EstateUser.objects.get(user_id=admin_id)
+        user = request_user(request)
         
         # Log admin dashboard visit
-        Log.objects.create(user=user, action="Viewed admin dashboard")
-        
-        # Calculate real admin dashboard statistics
-        from django.db.models import Sum, Count
-        from datetime import datetime, timedelta
-        from django.utils import timezone
+        log_activity(user=user, action="Viewed admin dashboard")
         
-        # Total system statistics
-        total_users = EstateUser.objects.count()
-        total_properties = Property.objects.count()
-        total_bookings = Booking.objects.count()
-        total_transactions = Transaction.objects.count()
-        
-        # Active statistics
-        active_sellers = EstateUser.objects.filter(role='seller').count()
-        active_buyers = EstateUser.objects.filter(role='buyer').count()
-        pending_bookings = Booking.objects.filter(status='pending').count()
-        
-        # Revenue statistics
-        current_month = timezone.now().month
-        current_year = timezone.now().year
-        total_revenue = Transaction.objects.aggregate(total=Sum('amount'))['total'] or 0
-        monthly_revenue = Transaction.objects.filter(
-            payment_date__month=current_month,
-            payment_date__year=current_year
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        # Growth calculations
-        prev_month = current_month - 1 if current_month > 1 else 12
-        prev_year = current_year if current_month > 1 else current_year - 1
-        
-        prev_month_users = EstateUser.objects.filter(
-            created_at__month=prev_month,
-            created_at__year=prev_year
-        ).count()
-        
-        prev_month_properties = Property.objects.filter(
-            created_at__month=prev_month,
-            created_at__year=prev_year
-        ).count()
-        
-        # Calculate growth percentages
-        def calculate_growth(current, previous):
-            if previous == 0:
-                return f"+{current} new" if current > 0 else "No growth"
-            growth = round(((current - previous) / previous) * 100, 1)
-            return f"+{growth}%" if growth > 0 else f"{growth}%"
+        # Admin dashboard statistics come from the precomputed snapshot row
+        from . import dashboard_stats
+        snapshot = dashboard_stats.get_snapshot()
         
         # Recent system activity
-        recent_activities = Log.objects.all().order_by('-timestamp')[:10]
-        
-        # Additional system statistics
-        total_images = PropertyImage.objects.count()
-        
-        # Property status breakdown
-        properties_available = Property.objects.filter(status='Available').count()
-        properties_sold = Property.objects.filter(status='Sold').count()
-        properties_pending = Property.objects.filter(status='Pending').count()
-        
-        # Buyer purchase information
-        confirmed_bookings = Booking.objects.filter(status='Confirmed').count()
-        completed_transactions = Transaction.objects.filter(payment_status='success').count()
-        
-        # Calculate successful purchases (confirmed bookings with successful transactions)
-        successful_purchases = Transaction.objects.filter(
-            payment_status='success',
-            booking__status='Confirmed'
-        ).count()
+        recent_activities = Log.objects.select_related('user').order_by('-timestamp')[:10]
         
         # Real-time notifications count (pending actions for admin)
-        pending_notifications = pending_bookings + (1 if total_transactions == 0 else 0)
+        pending_notifications = snapshot.bookings_pending + (1 if snapshot.total_transactions == 0 else 0)
         
         # Admin dashboard statistics
         admin_stats = {
             'total_users': {
-                'count': total_users,
-                'growth': f"+{prev_month_users} this month" if prev_month_users > 0 else "No new users"
+                'count': snapshot.total_users,
+                'growth': f"+{snapshot.prev_month_users} this month" if snapshot.prev_month_users > 0 else "No new users"
             },
             'total_properties': {
-                'count': total_properties,
-                'growth': f"+{prev_month_properties} this month" if prev_month_properties > 0 else "No new properties"
+                'count': snapshot.total_properties,
+                'growth': f"+{snapshot.prev_month_properties} this month" if snapshot.prev_month_properties > 0 else "No new properties"
             },
             'properties_by_status': {
-                'available': properties_available,
-                'sold': properties_sold,
-                'pending': properties_pending
+                'available': snapshot.properties_available,
+                'sold': snapshot.properties_sold,
+                'pending': snapshot.properties_pending
             },
             'active_bookings': {
-                'count': pending_bookings,
-                'total': total_bookings,
-                'confirmed': confirmed_bookings
+                'count': snapshot.bookings_pending,
+                'total': snapshot.total_bookings,
+                'confirmed': snapshot.bookings_confirmed
             },
             'system_revenue': {
-                'total': total_revenue,
-                'monthly': monthly_revenue
+                'total': snapshot.total_revenue,
+                'monthly': snapshot.monthly_revenue
             },
             'transactions': {
-                'total': total_transactions,
-                'completed': completed_transactions,
-                'successful_purchases': successful_purchases
+                'total': snapshot.total_transactions,
+                'completed': snapshot.transactions_success,
+                'successful_purchases': snapshot.successful_purchases
             },
             'user_breakdown': {
-                'sellers': active_sellers,
-                'buyers': active_buyers,
-                'admins': EstateUser.objects.filter(role='admin').count()
+                'sellers': snapshot.users_sellers,
+                'buyers': snapshot.users_buyers,
+                'admins': snapshot.users_admins
             },
-            'total_images': total_images,
-            'notifications_count': pending_notifications
+            'total_images': snapshot.total_images,
+            'notifications_count': pending_notifications,
+            'last_refreshed': snapshot.updated_at
         }
         
         return render(request, "backend/admin_dashboard.html", {
@@ -1201,7 +1308,7 @@ def buyer_dashboard_view(request):
     if 'role' not in request.session or request.session['role'] != 'buyer':
         return redirect('/backend/login/')
     user_id = request.session.get('buyer_id') or request.session.get('user_id')
-    user = EstateUser.objects.get(user_id=user_id)
+    user = request_user(request)
     
     # Calculate real buyer dashboard statistics
     from django.db.models import Count, Avg, Q
@@ -1228,13 +1335,6 @@ def buyer_dashboard_view(request):
     ).prefetch_related('images').order_by('-created_at')[:6]
     featured_properties = list(featured_properties_qs)  # Convert QuerySet to list for template
     
-    # Debug: Print featured properties count
-    print(f"🔍 DEBUG: Total properties in DB: {Property.objects.count()}")
-    print(f"🔍 DEBUG: Available properties: {available_properties}")
-    print(f"🔍 DEBUG: Featured properties count: {len(featured_properties)}")
-    for prop in featured_properties:
-        print(f"   - Property: {prop.title}, Images: {prop.images.count()}, Status: {prop.status}")
-    
     # Popular locations (top 5 by property count) - CONVERT TO LIST
     popular_locations = list(Property.objects.filter(
         Q(status__iexact='available') | Q(status__iexact='Available')
@@ -1253,7 +1353,7 @@ def buyer_dashboard_view(request):
     )
     
     # Log buyer dashboard visit
-    Log.objects.create(user=user, action="Viewed buyer dashboard")
+    log_activity(user=user, action="Viewed buyer dashboard")
     
     # Recent activities for this buyer - CONVERT TO LIST
     recent_activities = list(Log.objects.filter(user=user_id).order_by('-timestamp')[:5])
@@ -1284,13 +1384,6 @@ def buyer_dashboard_view(request):
         'new_properties_count': new_properties_count
     }
     
-    # Debug: Print stats being passed to template
-    print(f"🔍 DEBUG: Stats being passed to template:")
-    print(f"   - available_properties: {buyer_stats['available_properties']}")
-    print(f"   - featured_properties count: {len(buyer_stats['featured_properties'])}")
-    print(f"   - my_bookings total: {buyer_stats['my_bookings']['total']}")
-    print(f"   - my_bookings pending: {buyer_stats['my_bookings']['pending']}")
-    
     # Create response with no-cache headers to ensure fresh data
     response = render(request, 'backend/buyer_dashboard.html', {
         'user': user,
@@ -1310,55 +1403,22 @@ def seller_dashboard_view(request):
         return redirect("/backend/login/")
     
     seller_id = request.session['user_id']
-    user = EstateUser.objects.get(user_id=seller_id)
+    user = request_user(request)
     
     # Log seller dashboard visit
-    Log.objects.create(user=user, action="Viewed seller dashboard")
+    log_activity(user=user, action="Viewed seller dashboard")
     
-    # Calculate real dashboard statistics
-    from django.db.models import Sum, Count
-    from datetime import datetime, timedelta
-    from django.utils import timezone
+    # Dashboard figures come from the per-seller daily rollups (seller_rollups.py):
+    # one conditional-aggregation query over indexed (seller, day) rows
+    from . import seller_rollups
+    summary = seller_rollups.get_summary(seller_id)
     
-    # Get seller's properties count
-    my_properties_count = Property.objects.filter(user=seller_id).count()
-    
-    # Get active bookings count
-    active_bookings_count = Booking.objects.filter(property__user=seller_id, status='pending').count()
-    
-    # Calculate monthly revenue (current month)
-    current_month = timezone.now().month
-    current_year = timezone.now().year
-    monthly_revenue = Transaction.objects.filter(
-        booking__property__user=seller_id,
-        payment_date__month=current_month,
-        payment_date__year=current_year
-    ).aggregate(total=Sum('amount'))['total'] or 0
-    
-    # Calculate property views (estimate based on logs)
-    property_views_count = Log.objects.filter(
-        user=seller_id,
-        action__icontains='property'
-    ).count()
-    
-    # Calculate growth percentages
-    # Previous month for comparison
-    prev_month = current_month - 1 if current_month > 1 else 12
-    prev_year = current_year if current_month > 1 else current_year - 1
-    
-    # Previous month properties
-    prev_month_properties = Property.objects.filter(
-        user=seller_id,
-        created_at__month=prev_month,
-        created_at__year=prev_year
-    ).count()
-    
-    # Previous month revenue
-    prev_monthly_revenue = Transaction.objects.filter(
-        booking__property__user=seller_id,
-        payment_date__month=prev_month,
-        payment_date__year=prev_year
-    ).aggregate(total=Sum('amount'))['total'] or 0
+    my_properties_count = summary['listings']
+    active_bookings_count = summary['pending_bookings']
+    monthly_revenue = summary['month_revenue']
+    property_views_count = summary['total_views']
+    prev_month_properties = summary['prev_month_listings']
+    prev_monthly_revenue = summary['prev_month_revenue']
     
     # Calculate percentage changes
     def calculate_percentage_change(current, previous):
@@ -1374,38 +1434,20 @@ def seller_dashboard_view(request):
     revenue_growth = f"+{revenue_growth_percent}% increase" if revenue_growth_percent > 0 else f"{revenue_growth_percent}% change"
     
     # Views growth (last 7 days vs previous 7 days)
-    last_week = timezone.now() - timedelta(days=7)
-    prev_week = timezone.now() - timedelta(days=14)
-    
-    recent_views = Log.objects.filter(
-        user=seller_id,
-        action__icontains='property',
-        timestamp__gte=last_week
-    ).count()
-    
-    prev_views = Log.objects.filter(
-        user=seller_id,
-        action__icontains='property',
-        timestamp__gte=prev_week,
-        timestamp__lt=last_week
-    ).count()
-    
-    views_growth_percent = calculate_percentage_change(recent_views, prev_views)
+    views_growth_percent = calculate_percentage_change(summary['recent_views'], summary['prev_views'])
     views_growth = f"+{views_growth_percent}% this week" if views_growth_percent > 0 else f"{views_growth_percent}% this week"
     
     # Pending bookings info
     pending_bookings_info = f"+{active_bookings_count} pending" if active_bookings_count > 0 else "No pending requests"
     
     # Recent activities
-    recent_activities = Log.objects.filter(user=seller_id).order_by('-timestamp')[:5]
+    recent_activities = list(Log.objects.filter(user=seller_id).order_by('-timestamp')[:5])
     
     # Additional stats for action cards
-    # Count images uploaded by seller
-    images_count = PropertyImage.objects.filter(property__user=seller_id).count()
+    images_count = summary['images']
     
     # Last activity time
-    last_activity = Log.objects.filter(user=seller_id).order_by('-timestamp').first()
-    last_activity_time = "No activity" if not last_activity else f"2 min ago"
+    last_activity_time = "No activity" if not recent_activities else f"2 min ago"
     
     # Seller notifications (pending bookings for their properties)
     seller_notifications = active_bookings_count
@@ -1455,8 +1497,8 @@ def seller_properties(request):
                 properties = properties.filter(location__icontains=query)
 
     # Seller activity log (properties view)
-    seller = EstateUser.objects.get(user_id=seller_id)
-    Log.objects.create(user=seller, action="Viewed properties list")
+    seller = request_user(request)
+    log_activity(user=seller, action="Viewed properties list")
     return render(request, "backend/seller_properties.html", {"properties": properties, "query": query})
 
 # Seller - Add Property view
@@ -1504,38 +1546,36 @@ def add_property(request):
         images = request.FILES.getlist("images")
         descriptions = request.POST.getlist("image_descriptions") if "image_descriptions" in request.POST else []
         
+        from . import uploads
+        saved_count = 0
+        
         for idx, img in enumerate(images):
             desc = descriptions[idx] if idx < len(descriptions) else ""
             
-            # Save the file to media directory
-            import os
-            from django.core.files.storage import default_storage
-            from django.core.files.base import ContentFile
-            
-            # Create unique filename
-            import uuid
-            file_ext = img.name.split('.')[-1] if '.' in img.name else 'jpg'
-            unique_filename = f"property_{prop.property_id}_{uuid.uuid4().hex[:8]}.{file_ext}"
-            
-            # Save file
-            file_path = default_storage.save(unique_filename, ContentFile(img.read()))
+            # Stream the file to the media directory (validated from its first chunk)
+            try:
+                stored = uploads.save_image_upload(img)
+            except uploads.InvalidUpload as invalid:
+                messages.warning(request, f"Image '{img.name}' was skipped: it {invalid}.")
+                continue
             
             # Create PropertyImage record
             PropertyImage.objects.create(
                 property=prop,
-                image_url=file_path,  # Store relative path
+                image_url=stored.name,  # Store relative path
                 description=desc
             )
+            saved_count += 1
 
         # Log the activity
-        seller = EstateUser.objects.get(user_id=user_id)
-        Log.objects.create(user=seller, action=f"Added new property: {title}")
+        seller = request_user(request)
+        log_activity(user=seller, action=f"Added new property: {title}")
         
-        # Send notification to admins about new property
-        from . import notification_service
-        notification_service.notify_property_added(prop.property_id)
+        # Notify admins about the new property (written by the job queue)
+        from . import jobs
+        jobs.enqueue_on_commit("notifications.property_added", prop.property_id)
         
-        messages.success(request, f"Property '{title}' added successfully with {len(images)} images!")
+        messages.success(request, f"Property '{title}' added successfully with {saved_count} images!")
         return redirect("/backend/seller/properties/")
 
     # Pass user role and other context for unified template
@@ -1594,32 +1634,28 @@ def admin_add_property(request):
         images = request.FILES.getlist("images")
         descriptions = request.POST.getlist("image_descriptions") if "image_descriptions" in request.POST else []
         
+        from . import uploads
+        
         for idx, img in enumerate(images):
             desc = descriptions[idx] if idx < len(descriptions) else ""
             
-            # Save the file to media directory
-            import os
-            from django.core.files.storage import default_storage
-            from django.core.files.base import ContentFile
-            
-            # Create unique filename
-            import uuid
-            file_ext = img.name.split('.')[-1] if '.' in img.name else 'jpg'
-            unique_filename = f"property_{prop.property_id}_{uuid.uuid4().hex[:8]}.{file_ext}"
-            
-            # Save file
-            file_path = default_storage.save(unique_filename, ContentFile(img.read()))
+            # Stream the file to the media directory (validated from its first chunk)
+            try:
+                stored = uploads.save_image_upload(img)
+            except uploads.InvalidUpload as invalid:
+                messages.warning(request, f"Image '{img.name}' was skipped: it {invalid}.")
+                continue
             
             # Create PropertyImage record
             PropertyImage.objects.create(
                 property=prop,
-                image_url=file_path,  # Store relative path
+                image_url=stored.name,  # Store relative path
                 description=desc
             )
 
         # Log the activity
-        admin = EstateUser.objects.get(user_id=request.session['user_id'])
-        Log.objects.create(user=admin, action=f"Added new property: {title} for seller ID: {seller_id}")
+        admin = request_user(request)
+        log_activity(user=admin, action=f"Added new property: {title} for seller ID: {seller_id}")
         
         messages.success(request, f"Property '{title}' added successfully for seller!")
         return redirect("/backend/dashboard/")
@@ -1666,8 +1702,8 @@ def update_property(request, property_id):
         property_obj.save()
         
         # Log the activity
-        seller = EstateUser.objects.get(user_id=seller_id)
-        Log.objects.create(
+        seller = request_user(request)
+        log_activity(
             user=seller, 
             action=f"Updated property: {property_obj.title} (ID: {property_id})"
         )
@@ -1752,37 +1788,33 @@ def update_property_admin(request):
         # Check if new image is uploaded
         new_image = request.FILES.get('newImage')
         if new_image:
-            # Remove old images first
-            PropertyImage.objects.filter(property=property_obj).delete()
-            
-            # Save new image
-            import uuid
-            file_extension = os.path.splitext(new_image.name)[1]
-            unique_filename = f"property_{property_id}_{uuid.uuid4().hex[:8]}{file_extension}"
+            # Save new image (validated, content-addressed)
+            from . import uploads
+            try:
+                stored = uploads.save_image_upload(new_image)
+            except uploads.InvalidUpload as invalid:
+                return JsonResponse({"error": f"Image {invalid}"}, status=400)
             
-            # Save file to media directory
-            media_path = os.path.join(settings.MEDIA_ROOT, unique_filename)
-            with open(media_path, 'wb+') as destination:
-                for chunk in new_image.chunks():
-                    destination.write(chunk)
+            # Remove old images (their files are released, see media_store.py)
+            PropertyImage.objects.filter(property=property_obj).delete()
             
             # Create PropertyImage entry
             PropertyImage.objects.create(
                 property=property_obj,
-                image_url=unique_filename,
+                image_url=stored.name,
                 description=f"Property image for {property_obj.title}"
             )
             
             image_updated = True
-            new_image_url = f'/media/{unique_filename}'
+            new_image_url = settings.MEDIA_URL + stored.name
         
         # Log the activity
-        admin_user = EstateUser.objects.get(user_id=request.session['user_id'])
+        admin_user = request_user(request)
         action_details = f"Updated property: {property_obj.title} (ID: {property_id})"
         if image_updated:
             action_details += " - Image updated"
         
-        Log.objects.create(user=admin_user, action=action_details)
+        log_activity(user=admin_user, action=action_details)
         
         # Prepare response
         response_data = {
@@ -1821,7 +1853,7 @@ def update_property_admin(request):
 # ---------------------------
 # Buyer Dashboard API Views
 # ---------------------------
-from .models import SavedProperty, PaymentHistory, SupportTicket, TicketResponse, PropertyReview, MarketInsight, SellerNotification, BuyerNotification
+from .models import SavedProperty, PaymentHistory, SupportTicket, TicketResponse, PropertyReview, MarketInsight, SellerNotification, BuyerNotification, BackgroundJob
 from django.utils import timezone
 from datetime import datetime, timedelta
 from django.db.models import Avg, Count, Sum
@@ -1836,20 +1868,14 @@ def buyer_saved_properties_api(request):
     
     if request.method == "GET":
         try:
-            saved_properties = SavedProperty.objects.filter(user_id=user_id).select_related('property')
+            from . import image_variants
+            saved_properties = SavedProperty.objects.filter(user_id=user_id).select_related('property').prefetch_related('property__images')
             
             properties_data = []
             for saved in saved_properties:
                 prop = saved.property
-                # Get first image
-                first_image = prop.images.first()
-                image_url = None
-                if first_image:
-                    url = first_image.image_url
-                    if not url.startswith('http') and not url.startswith('/media/'):
-                        image_url = settings.MEDIA_URL + url
-                    else:
-                        image_url = url
+                # First image as a card-sized variant
+                image = image_variants.card_image_payload(image_variants.first_image(prop), default=None)
                 
                 properties_data.append({
                     'saved_id': saved.saved_id,
@@ -1864,14 +1890,14 @@ def buyer_saved_properties_api(request):
                     'bathrooms': prop.bathrooms,
                     'property_type': prop.property_type,
                     'status': prop.status,
-                    'image_url': image_url,
+                    **image,
                     'saved_at': saved.saved_at.strftime('%Y-%m-%d %H:%M'),
                     'notes': saved.notes or ''
                 })
             
             # Log the action
-            user = EstateUser.objects.get(user_id=user_id)
-            Log.objects.create(user=user, action="Viewed saved properties")
+            user = request_user(request)
+            log_activity(user=user, action="Viewed saved properties")
             
             return JsonResponse({
                 'success': True,
@@ -1908,8 +1934,8 @@ def buyer_saved_properties_api(request):
                 return JsonResponse({"error": "Property already saved"}, status=400)
             
             # Log the action
-            user = EstateUser.objects.get(user_id=user_id)
-            Log.objects.create(user=user, action=f"Saved property: {property_obj.title}")
+            user = request_user(request)
+            log_activity(user=user, action=f"Saved property: {property_obj.title}")
             
             # Notify seller that their property was saved
             from . import notification_service
@@ -1937,8 +1963,8 @@ def buyer_saved_properties_api(request):
             saved_property.delete()
             
             # Log the action
-            user = EstateUser.objects.get(user_id=user_id)
-            Log.objects.create(user=user, action=f"Removed saved property: {property_title}")
+            user = request_user(request)
+            log_activity(user=user, action=f"Removed saved property: {property_title}")
             
             return JsonResponse({
                 'success': True,
@@ -1974,8 +2000,8 @@ def update_saved_property_notes(request, saved_id):
         saved_property.save()
         
         # Log the action
-        user = EstateUser.objects.get(user_id=user_id)
-        Log.objects.create(user=user, action=f"Updated notes for saved property: {saved_property.property.title}")
+        user = request_user(request)
+        log_activity(user=user, action=f"Updated notes for saved property: {saved_property.property.title}")
         
         return JsonResponse({
             'success': True,
@@ -2006,8 +2032,8 @@ def remove_saved_property(request, saved_id):
         saved_property.delete()
         
         # Log the action
-        user = EstateUser.objects.get(user_id=user_id)
-        Log.objects.create(user=user, action=f"Removed saved property: {property_title}")
+        user = request_user(request)
+        log_activity(user=user, action=f"Removed saved property: {property_title}")
         
         return JsonResponse({
             'success': True,
@@ -2055,8 +2081,8 @@ def buyer_payment_history_api(request):
                     total_spent += float(payment.amount)
             
             # Log the action
-            user = EstateUser.objects.get(user_id=user_id)
-            Log.objects.create(user=user, action="Viewed payment history")
+            user = request_user(request)
+            log_activity(user=user, action="Viewed payment history")
             
             return JsonResponse({
                 'success': True,
@@ -2085,8 +2111,8 @@ def buyer_payment_history_api(request):
             )
             
             # Log the action
-            user = EstateUser.objects.get(user_id=user_id)
-            Log.objects.create(user=user, action=f"Made payment: ₹{payment.amount}")
+            user = request_user(request)
+            log_activity(user=user, action=f"Made payment: ₹{payment.amount}")
             
             return JsonResponse({
                 'success': True,
@@ -2107,8 +2133,6 @@ def create_booking_api(request):
     if request.method != "POST":
         return JsonResponse({"error": "POST method required"}, status=405)
     
-    user_id = request.session.get('buyer_id') or request.session.get('user_id')
-    
     try:
         data = json.loads(request.body)
         property_id = data.get('property_id')
@@ -2140,37 +2164,41 @@ def create_booking_api(request):
         
         # Get buyer user object
         try:
-            buyer = EstateUser.objects.get(user_id=user_id)
+            buyer = request_user(request)
         except EstateUser.DoesNotExist:
             return JsonResponse({"error": "User not found"}, status=404)
         
-        # Create booking with confirmed status (since payment is done)
-        booking = Booking.objects.create(
-            user=buyer,
-            property=property_obj,
-            status='confirmed'  # Confirmed because payment is done
-        )
-        
-        # Create transaction record
-        transaction = Transaction.objects.create(
-            booking=booking,
-            amount=float(amount),
-            payment_method=payment_method,
-            payment_status='completed',
-            payment_date=timezone.now()
-        )
-        
-        # ✅ CRITICAL FIX: Update property status to 'Sold' immediately
-        property_obj.status = 'Sold'
-        property_obj.save()
+        from django.db import transaction as db_transaction
+        from . import jobs, notification_service
         
-        # Send notifications using notification service
-        from . import notification_service
-        
-        # Notify seller about property sold
         seller = property_obj.user
-        if seller:
-            notification_message = f"""
+        
+        # Booking, payment, sold status and the follow-up notifications commit together;
+        # the notifications themselves are written by the job queue after the response
+        with db_transaction.atomic():
+            # Create booking with confirmed status (since payment is done)
+            booking = Booking.objects.create(
+                user=buyer,
+                property=property_obj,
+                status='confirmed'  # Confirmed because payment is done
+            )
+            
+            # Create transaction record
+            transaction = Transaction.objects.create(
+                booking=booking,
+                amount=float(amount),
+                payment_method=payment_method,
+                payment_status='completed',
+                payment_date=timezone.now()
+            )
+            
+            # ✅ CRITICAL FIX: Update property status to 'Sold' immediately
+            property_obj.status = 'Sold'
+            property_obj.save()
+            
+            # Notify seller about property sold
+            if seller:
+                notification_message = f"""
 🎉 PROPERTY SOLD! 🎉
 
 Property: {property_obj.title}
@@ -2184,35 +2212,36 @@ Status: Payment Completed & Property Marked as SOLD
 {f'Message from buyer: {message}' if message else ''}
 
 Congratulations on your successful sale!
-            """.strip()
-            
-            # Use notification service
-            notification_service.create_seller_notification(
-                seller_id=seller.user_id,
-                title=f'🎉 Property Sold: {property_obj.title}',
-                message=notification_message,
-                notification_type=notification_service.NotificationType.PAYMENT_RECEIVED,
-                property_obj=property_obj,
-                booking_obj=booking
+                """.strip()
+                
+                jobs.enqueue_on_commit(
+                    "notifications.seller",
+                    seller_id=seller.user_id,
+                    title=f'🎉 Property Sold: {property_obj.title}',
+                    message=notification_message,
+                    notification_type=notification_service.NotificationType.PAYMENT_RECEIVED,
+                    property_id=property_obj.property_id,
+                    booking_id=booking.booking_id
+                )
+            
+            # Notify buyer about successful purchase
+            jobs.enqueue_on_commit(
+                "notifications.buyer",
+                buyer_id=buyer.user_id,
+                title='✅ Property Purchase Confirmed!',
+                message=f'Congratulations! You have successfully purchased "{property_obj.title}". Payment of ₹{amount} received. Visit date: {visit_date}. The property is now yours!',
+                notification_type=notification_service.NotificationType.BOOKING_CONFIRMED
             )
         
-        # Notify buyer about successful purchase
-        notification_service.create_buyer_notification(
-            buyer_id=buyer.user_id,
-            title='✅ Property Purchase Confirmed!',
-            message=f'Congratulations! You have successfully purchased "{property_obj.title}". Payment of ₹{amount} received. Visit date: {visit_date}. The property is now yours!',
-            notification_type=notification_service.NotificationType.BOOKING_CONFIRMED
-        )
-        
         # Log the action with full details
-        Log.objects.create(
+        log_activity(
             user=buyer, 
             action=f"Property PURCHASED: {property_obj.title} (Booking ID: {booking.booking_id}, Amount: ₹{amount}, Payment: {payment_method}, Property Status: SOLD)"
         )
         
         # Log for seller
         if seller:
-            Log.objects.create(
+            log_activity(
                 user=seller,
                 action=f"Property SOLD: {property_obj.title} (Sold to: {buyer_name}, Amount: ₹{amount}, Booking ID: {booking.booking_id})"
             )
@@ -2275,8 +2304,8 @@ def buyer_transaction_history_api(request):
                 total_amount += float(txn.amount)
         
         # Log the action
-        user = EstateUser.objects.get(user_id=user_id)
-        Log.objects.create(user=user, action="Viewed transaction history")
+        user = request_user(request)
+        log_activity(user=user, action="Viewed transaction history")
         
         return JsonResponse({
             'success': True,
@@ -2299,14 +2328,13 @@ def buyer_support_tickets_api(request):
     
     if request.method == "GET":
         try:
-            tickets = SupportTicket.objects.filter(user_id=user_id).order_by('-created_at')
+            from . import support_tickets
+            own_tickets = SupportTicket.objects.filter(user_id=user_id)
+            # One query for the list (response count/last response as subqueries)
+            tickets = support_tickets.annotate_listing(own_tickets).order_by('-created_at')
             
             tickets_data = []
             for ticket in tickets:
-                # Get response count
-                response_count = ticket.responses.count()
-                last_response = ticket.responses.order_by('-created_at').first()
-                
                 ticket_data = {
                     'ticket_id': ticket.ticket_id,
                     'token_id': ticket.token_id or f"TKT-{ticket.ticket_id}",  # Fallback for old tickets
@@ -2317,28 +2345,26 @@ def buyer_support_tickets_api(request):
                     'description': ticket.description,
                     'created_at': ticket.created_at.strftime('%Y-%m-%d %H:%M'),
                     'updated_at': ticket.updated_at.strftime('%Y-%m-%d %H:%M'),
-                    'response_count': response_count,
-                    'last_response_date': last_response.created_at.strftime('%Y-%m-%d %H:%M') if last_response else None
+                    'response_count': ticket.response_count,
+                    'last_response_date': ticket.last_response_at.strftime('%Y-%m-%d %H:%M') if ticket.last_response_at else None
                 }
                 tickets_data.append(ticket_data)
             
-            # Count by status
-            open_count = tickets.filter(status='open').count()
-            in_progress_count = tickets.filter(status='in_progress').count()
-            resolved_count = tickets.filter(status='resolved').count()
+            # Count by status (one query)
+            counts = support_tickets.status_counts(own_tickets)
             
             # Log the action
-            user = EstateUser.objects.get(user_id=user_id)
-            Log.objects.create(user=user, action="Viewed support tickets")
+            user = request_user(request)
+            log_activity(user=user, action="Viewed support tickets")
             
             return JsonResponse({
                 'success': True,
                 'tickets': tickets_data,
                 'stats': {
-                    'total': len(tickets_data),
-                    'open': open_count,
-                    'in_progress': in_progress_count,
-                    'resolved': resolved_count
+                    'total': counts['total'],
+                    'open': counts['open'],
+                    'in_progress': counts['in_progress'],
+                    'resolved': counts['resolved']
                 }
             })
             
@@ -2364,18 +2390,21 @@ def buyer_support_tickets_api(request):
                 random_num = str(random.randint(1000, 9999))
                 token_id = f"SUP-{date_str}-{random_num}"
             
-            ticket = SupportTicket.objects.create(
-                user_id=user_id,
-                token_id=token_id,
-                subject=data.get('subject', ''),
-                category=data.get('category', 'general'),
-                priority=data.get('priority', 'medium'),
-                description=data.get('description', '')
-            )
+            # Atomic so the stats signal's delta commits with the ticket
+            from django.db import transaction as db_transaction
+            with db_transaction.atomic():
+                ticket = SupportTicket.objects.create(
+                    user_id=user_id,
+                    token_id=token_id,
+                    subject=data.get('subject', ''),
+                    category=data.get('category', 'general'),
+                    priority=data.get('priority', 'medium'),
+                    description=data.get('description', '')
+                )
             
             # Log the action
-            user = EstateUser.objects.get(user_id=user_id)
-            Log.objects.create(user=user, action=f"Created support ticket: {ticket.subject} (Token: {token_id})")
+            user = request_user(request)
+            log_activity(user=user, action=f"Created support ticket: {ticket.subject} (Token: {token_id})")
             
             # Notify admins about new support ticket
             from . import notification_service
@@ -2432,8 +2461,8 @@ def buyer_reviews_api(request):
             avg_rating = reviews.aggregate(avg=Avg('rating'))['avg'] or 0
             
             # Log the action
-            user = EstateUser.objects.get(user_id=user_id)
-            Log.objects.create(user=user, action="Viewed submitted reviews")
+            user = request_user(request)
+            log_activity(user=user, action="Viewed submitted reviews")
             
             return JsonResponse({
                 'success': True,
@@ -2468,9 +2497,9 @@ def buyer_reviews_api(request):
             )
             
             # Log the action
-            user = EstateUser.objects.get(user_id=user_id)
+            user = request_user(request)
             property_obj = Property.objects.get(property_id=property_id)
-            Log.objects.create(user=user, action=f"Reviewed property: {property_obj.title}")
+            log_activity(user=user, action=f"Reviewed property: {property_obj.title}")
             
             return JsonResponse({
                 'success': True,
@@ -2488,10 +2517,8 @@ def buyer_profile_api(request):
     if 'role' not in request.session or request.session['role'] != "buyer":
         return JsonResponse({"error": "Buyer access required"}, status=403)
     
-    user_id = request.session.get('buyer_id') or request.session.get('user_id')
-    
     try:
-        user = EstateUser.objects.get(user_id=user_id)
+        user = request_user(request)
         
         return JsonResponse({
             'success': True,
@@ -2521,6 +2548,11 @@ def buyer_reviewable_properties_api(request):
         # Get all properties from buyer's bookings
         bookings = Booking.objects.filter(user_id=user_id).select_related('property').order_by('-booking_date')
         
+        # Properties this user already reviewed (one query instead of one per booking)
+        reviewed_property_ids = set(
+            PropertyReview.objects.filter(user_id=user_id).values_list('property_id', flat=True)
+        )
+        
         # Get unique properties (avoid duplicates if user booked same property multiple times)
         seen_property_ids = set()
         properties_data = []
@@ -2531,10 +2563,7 @@ def buyer_reviewable_properties_api(request):
                 seen_property_ids.add(prop.property_id)
                 
                 # Check if user already reviewed this property
-                already_reviewed = PropertyReview.objects.filter(
-                    user_id=user_id,
-                    property_id=prop.property_id
-                ).exists()
+                already_reviewed = prop.property_id in reviewed_property_ids
                 
                 properties_data.append({
                     'property_id': prop.property_id,
@@ -2546,8 +2575,8 @@ def buyer_reviewable_properties_api(request):
                 })
         
         # Log the action
-        user = EstateUser.objects.get(user_id=user_id)
-        Log.objects.create(user=user, action="Viewed reviewable properties list")
+        user = request_user(request)
+        log_activity(user=user, action="Viewed reviewable properties list")
         
         return JsonResponse({
             'success': True,
@@ -2613,9 +2642,8 @@ def buyer_market_insights_api(request):
                         insights_data.append(sample_data)
             
             # Log the action
-            user_id = request.session.get('buyer_id') or request.session.get('user_id')
-            user = EstateUser.objects.get(user_id=user_id)
-            Log.objects.create(user=user, action="Viewed market insights")
+            user = request_user(request)
+            log_activity(user=user, action="Viewed market insights")
             
             return JsonResponse({
                 'success': True,
@@ -2681,7 +2709,16 @@ def get_property_images_api(request, property_id):
 # ========================
 @csrf_exempt
 def get_notifications_api(request):
-    """Universal API to get notifications for all user types (buyer/seller/admin)"""
+    """
+    Universal API to get notifications for all user types (buyer/seller/admin)
+    
+    GET /backend/api/notifications/               latest 50 notifications
+    GET /backend/api/notifications/?since=<id>    only notifications newer than <id>
+    
+    Responses carry an ETag built from the user's notification counter row
+    (latest notification id, unread count, version); a matching If-None-Match
+    returns 304 Not Modified without touching the notification tables.
+    """
     
     # Check if user is logged in
     if 'role' not in request.session or 'user_id' not in request.session:
@@ -2698,19 +2735,33 @@ def get_notifications_api(request):
     elif role == 'admin':
         user_id = request.session.get('admin_user') or user_id
     
+    since = request.GET.get('since', '').strip()
+    if since and not since.isdigit():
+        return JsonResponse({"error": "since must be a notification id"}, status=400)
+    since = int(since) if since else None
+    
     try:
         from .models import SellerNotification, BuyerNotification
-        from django.utils import timezone
+        from django.http import HttpResponseNotModified
+        from . import notification_service
+        
+        latest_id, unread_count, version = notification_service.get_notification_state(user_id, role)
+        etag = f'W/"notif-{user_id}-{latest_id}-{unread_count}-{version}-{since if since is not None else "all"}"'
+        
+        if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'
+            return response
         
         # Get notifications based on role
         notifications_data = []
-        unread_count = 0
         
         if role == 'buyer':
-            # Get buyer notifications
-            all_notifications = BuyerNotification.objects.filter(buyer_id=user_id)
-            unread_count = all_notifications.filter(is_read=False).count()
-            notifications = all_notifications.order_by('-created_at')[:50]
+            notifications = BuyerNotification.objects.filter(buyer_id=user_id)
+            if since is not None:
+                notifications = notifications.filter(notification_id__gt=since)
+            notifications = notifications.order_by('-created_at', '-notification_id')[:50]
             
             for notif in notifications:
                 notifications_data.append({
@@ -2720,14 +2771,15 @@ def get_notifications_api(request):
                     'type': notif.notification_type,
                     'is_read': notif.is_read,
                     'created_at': notif.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                    'ticket_id': notif.support_ticket.ticket_id if notif.support_ticket else None,
+                    'ticket_id': notif.support_ticket_id,
                     'time_ago': get_time_ago(notif.created_at)
                 })
         else:
             # Get seller/admin notifications
-            all_notifications = SellerNotification.objects.filter(seller_id=user_id)
-            unread_count = all_notifications.filter(is_read=False).count()
-            notifications = all_notifications.order_by('-created_at')[:50]
+            notifications = SellerNotification.objects.filter(seller_id=user_id).select_related('property')
+            if since is not None:
+                notifications = notifications.filter(notification_id__gt=since)
+            notifications = notifications.order_by('-created_at', '-notification_id')[:50]
             
             for notif in notifications:
                 notifications_data.append({
@@ -2737,19 +2789,24 @@ def get_notifications_api(request):
                     'type': notif.notification_type,
                     'is_read': notif.is_read,
                     'created_at': notif.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                    'property_id': notif.property.property_id if notif.property else None,
+                    'property_id': notif.property_id,
                     'property_title': notif.property.title if notif.property else None,
-                    'booking_id': notif.booking.booking_id if notif.booking else None,
+                    'booking_id': notif.booking_id,
                     'time_ago': get_time_ago(notif.created_at)
                 })
         
-        return JsonResponse({
+        response = JsonResponse({
             'success': True,
             'notifications': notifications_data,
             'unread_count': unread_count,
             'total_count': len(notifications_data),
+            'latest_id': latest_id,
+            'since': since,
             'user_role': role
         })
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
         
     except Exception as e:
         import traceback
@@ -2772,7 +2829,6 @@ def mark_notification_read(request, notification_id):
     
     try:
         from .models import SellerNotification, BuyerNotification
-        from django.utils import timezone
         
         user_id = request.session.get('user_id')
         role = request.session.get('role')
@@ -2796,10 +2852,9 @@ def mark_notification_read(request, notification_id):
                 seller_id=user_id
             )
         
-        # Mark as read
-        notification.is_read = True
-        notification.read_at = timezone.now()
-        notification.save()
+        # Mark as read (keeps the unread counter in sync)
+        from . import notification_service
+        notification_service.mark_notification_read(notification.notification_id, role)
         
         return JsonResponse({
             'success': True,
@@ -2827,9 +2882,6 @@ def mark_all_notifications_read(request):
         return JsonResponse({"error": "Authentication required"}, status=401)
     
     try:
-        from .models import SellerNotification, BuyerNotification
-        from django.utils import timezone
-        
         user_id = request.session.get('user_id')
         role = request.session.get('role')
         
@@ -2840,23 +2892,9 @@ def mark_all_notifications_read(request):
         elif role == 'admin':
             user_id = request.session.get('admin_user') or user_id
         
-        # Mark all unread notifications as read based on role
-        if role == 'buyer':
-            updated = BuyerNotification.objects.filter(
-                buyer_id=user_id,
-                is_read=False
-            ).update(
-                is_read=True,
-                read_at=timezone.now()
-            )
-        else:
-            updated = SellerNotification.objects.filter(
-                seller_id=user_id,
-                is_read=False
-            ).update(
-                is_read=True,
-                read_at=timezone.now()
-            )
+        # Mark all unread notifications as read (keeps the unread counter in sync)
+        from . import notification_service
+        updated = notification_service.mark_all_notifications_read(user_id, role)
         
         return JsonResponse({
             'success': True,
@@ -2922,6 +2960,8 @@ def dashboard_search_api(request):
     if not query:
         return JsonResponse({"success": True, "results": [], "query": query})
     
+    from . import image_variants, property_search_helper
+    
     try:
         results = {
             'query': query,
@@ -2934,28 +2974,15 @@ def dashboard_search_api(request):
         
         # BUYER: Search properties only
         if role == 'buyer':
-            properties = Property.objects.prefetch_related('images').filter(
-                status='Available'
-            ).filter(
-                models.Q(title__icontains=query) |
-                models.Q(location__icontains=query) |
-                models.Q(city__icontains=query) |
-                models.Q(state__icontains=query) |
-                models.Q(property_type__icontains=query) |
-                models.Q(description__icontains=query)
+            properties = property_search_helper.search_properties(
+                Property.objects.prefetch_related('images').filter(status='Available'),
+                query
             )[:10]  # Limit to 10 results
             
             for prop in properties:
-                first_image = prop.images.first()
-                image_url = ''
-                if first_image:
-                    url = first_image.image_url
-                    if not url.startswith('http') and not url.startswith('/media/'):
-                        image_url = settings.MEDIA_URL + url
-                    else:
-                        image_url = url
-                else:
-                    image_url = settings.MEDIA_URL + 'default_property.jpg'
+                image = image_variants.card_image_payload(
+                    image_variants.first_image(prop), default=settings.MEDIA_URL + 'default_property.jpg'
+                )
                 
                 results['properties'].append({
                     'id': prop.property_id,
@@ -2964,7 +2991,7 @@ def dashboard_search_api(request):
                     'price': float(prop.price),
                     'type': prop.property_type,
                     'status': prop.status,
-                    'image_url': image_url,
+                    **image,
                     'url': f'/backend/buyer/properties/?property_id={prop.property_id}'
                 })
         
@@ -2973,26 +3000,15 @@ def dashboard_search_api(request):
             seller_id = request.session.get('seller_id') or request.session.get('user_id')
             
             # Search seller's properties
-            properties = Property.objects.prefetch_related('images').filter(
-                user_id=seller_id
-            ).filter(
-                models.Q(title__icontains=query) |
-                models.Q(location__icontains=query) |
-                models.Q(city__icontains=query) |
-                models.Q(property_type__icontains=query)
+            properties = property_search_helper.search_properties(
+                Property.objects.prefetch_related('images').filter(user_id=seller_id),
+                query
             )[:8]
             
             for prop in properties:
-                first_image = prop.images.first()
-                image_url = ''
-                if first_image:
-                    url = first_image.image_url
-                    if not url.startswith('http') and not url.startswith('/media/'):
-                        image_url = settings.MEDIA_URL + url
-                    else:
-                        image_url = url
-                else:
-                    image_url = settings.MEDIA_URL + 'default_property.jpg'
+                image = image_variants.card_image_payload(
+                    image_variants.first_image(prop), default=settings.MEDIA_URL + 'default_property.jpg'
+                )
                 
                 results['properties'].append({
                     'id': prop.property_id,
@@ -3001,7 +3017,7 @@ def dashboard_search_api(request):
                     'price': float(prop.price),
                     'type': prop.property_type,
                     'status': prop.status,
-                    'image_url': image_url,
+                    **image,
                     'url': f'/backend/seller/properties/?q={prop.property_id}'
                 })
             
@@ -3059,24 +3075,15 @@ def dashboard_search_api(request):
                     property_id=int(query)
                 )[:5]
             else:
-                properties = Property.objects.prefetch_related('images').filter(
-                    models.Q(title__icontains=query) |
-                    models.Q(location__icontains=query) |
-                    models.Q(city__icontains=query) |
-                    models.Q(property_type__icontains=query)
+                properties = property_search_helper.search_properties(
+                    Property.objects.prefetch_related('images'),
+                    query
                 )[:5]
             
             for prop in properties:
-                first_image = prop.images.first()
-                image_url = ''
-                if first_image:
-                    url = first_image.image_url
-                    if not url.startswith('http') and not url.startswith('/media/'):
-                        image_url = settings.MEDIA_URL + url
-                    else:
-                        image_url = url
-                else:
-                    image_url = settings.MEDIA_URL + 'default_property.jpg'
+                image = image_variants.card_image_payload(
+                    image_variants.first_image(prop), default=settings.MEDIA_URL + 'default_property.jpg'
+                )
                 
                 results['properties'].append({
                     'id': prop.property_id,
@@ -3086,7 +3093,7 @@ def dashboard_search_api(request):
                     'type': prop.property_type,
                     'status': prop.status,
                     'owner_name': prop.user.name if prop.user else 'N/A',
-                    'image_url': image_url,
+                    **image,
                     'url': f'/backend/properties/html/?q={prop.property_id}'
                 })
             
@@ -3138,20 +3145,15 @@ def buyer_quick_search_api(request):
         bedrooms = request.GET.get('bedrooms', '').strip()
         bathrooms = request.GET.get('bathrooms', '').strip()
         
+        from . import image_variants
+        
         # Start with available properties
         properties = Property.objects.prefetch_related('images').filter(status='Available')
         
-        # Apply text search filter
+        # Apply text search filter (full-text index, best matches first)
         if query:
-            properties = properties.filter(
-                models.Q(title__icontains=query) |
-                models.Q(location__icontains=query) |
-                models.Q(city__icontains=query) |
-                models.Q(state__icontains=query) |
-                models.Q(property_type__icontains=query) |
-                models.Q(description__icontains=query) |
-                models.Q(amenities__icontains=query)
-            )
+            from . import property_search_helper
+            properties = property_search_helper.search_properties(properties, query)
         
         # Apply price range filters
         if min_price:
@@ -3198,16 +3200,9 @@ def buyer_quick_search_api(request):
         # Build response
         results = []
         for prop in properties:
-            first_image = prop.images.first()
-            image_url = ''
-            if first_image:
-                url = first_image.image_url
-                if not url.startswith('http') and not url.startswith('/media/'):
-                    image_url = settings.MEDIA_URL + url
-                else:
-                    image_url = url
-            else:
-                image_url = settings.MEDIA_URL + 'default_property.jpg'
+            image = image_variants.card_image_payload(
+                image_variants.first_image(prop), default=settings.MEDIA_URL + 'default_property.jpg'
+            )
             
             results.append({
                 'property_id': prop.property_id,
@@ -3222,19 +3217,19 @@ def buyer_quick_search_api(request):
                 'bathrooms': prop.bathrooms,
                 'property_type': prop.property_type,
                 'status': prop.status,
-                'image_url': image_url,
+                **image,
                 'amenities': prop.amenities
             })
         
         # Log the search activity
         try:
-            buyer = EstateUser.objects.get(user_id=request.session['user_id'])
+            buyer = request_user(request)
             search_details = f"Quick search: '{query}'" if query else "Quick search with filters"
             if property_type:
                 search_details += f", type={property_type}"
             if min_price or max_price:
                 search_details += f", price={min_price or '0'}-{max_price or '∞'}"
-            Log.objects.create(user=buyer, action=search_details)
+            log_activity(user=buyer, action=search_details)
         except EstateUser.DoesNotExist:
             pass
         
@@ -3270,18 +3265,19 @@ def admin_support_tickets(request):
     
     try:
         # Get admin user
-        admin_user_id = request.session.get('admin_user') or request.session.get('user_id')
-        admin_user = EstateUser.objects.get(user_id=admin_user_id)
+        admin_user = request_user(request)
         
         # Log activity
-        Log.objects.create(user=admin_user, action="Viewed support tickets dashboard")
+        log_activity(user=admin_user, action="Viewed support tickets dashboard")
         
         # Get filter parameters
         status_filter = request.GET.get('status', 'all')
         search_query = request.GET.get('q', '').strip()
         
-        # Base queryset with user details - ONLY select_related for user, not assigned_to yet
-        tickets = SupportTicket.objects.select_related('user').order_by('-created_at')
+        from . import support_tickets
+        
+        # Base queryset with user details and response count/last response (one query)
+        tickets = support_tickets.annotate_listing(SupportTicket.objects.select_related('user')).order_by('-created_at')
         
         # Apply filters
         if status_filter != 'all':
@@ -3298,14 +3294,8 @@ def admin_support_tickets(request):
                     models.Q(user__name__icontains=search_query)
                 )
         
-        # Get statistics
-        stats = {
-            'total': SupportTicket.objects.count(),
-            'open': SupportTicket.objects.filter(status='open').count(),
-            'in_progress': SupportTicket.objects.filter(status='in_progress').count(),
-            'resolved': SupportTicket.objects.filter(status='resolved').count(),
-            'closed': SupportTicket.objects.filter(status='closed').count(),
-        }
+        # Get statistics (cached row, or one conditional-aggregation query)
+        stats = support_tickets.site_stats()
         
         context = {
             'admin': admin_user,
@@ -3358,32 +3348,42 @@ def admin_solve_ticket_api(request):
         
         # Get ticket
         ticket = SupportTicket.objects.get(ticket_id=ticket_id)
+        old_status = ticket.status
         
         # Get admin user
-        admin_user_id = request.session.get('admin_user') or request.session.get('user_id')
-        admin_user = EstateUser.objects.get(user_id=admin_user_id)
+        admin_user = request_user(request)
         
-        # Update ticket status
+        from django.db import transaction as db_transaction
         from django.utils import timezone
-        ticket.status = 'resolved'
-        ticket.resolved_at = timezone.now()
-        ticket.assigned_to = admin_user
-        ticket.save()
-        
-        # Create ticket response
-        TicketResponse.objects.create(
-            ticket=ticket,
-            user=admin_user,
-            message=admin_response,
-            is_staff_response=True
-        )
-        
-        # Notify buyer about ticket resolution using notification service
-        from . import notification_service
-        notification_service.notify_ticket_resolved(ticket_id)
+        from . import jobs, support_tickets
+        
+        with db_transaction.atomic():
+            # Update ticket status only if nobody changed it since it was read,
+            # so the stats counters move exactly once per transition
+            now = timezone.now()
+            updated = SupportTicket.objects.filter(ticket_id=ticket.ticket_id, status=old_status).update(
+                status='resolved', resolved_at=now, assigned_to=admin_user, updated_at=now
+            )
+            if not updated:
+                return JsonResponse({"error": "Ticket status was changed by someone else, reload and try again"}, status=409)
+            ticket.status = 'resolved'
+            ticket.resolved_at = now
+            ticket.assigned_to = admin_user
+            
+            # Create ticket response
+            TicketResponse.objects.create(
+                ticket=ticket,
+                user=admin_user,
+                message=admin_response,
+                is_staff_response=True
+            )
+            support_tickets.status_changed(old_status, ticket.status)
+            
+            # Notify buyer about ticket resolution (written by the job queue after commit)
+            jobs.enqueue_on_commit("notifications.ticket_resolved", ticket.ticket_id)
         
         # Log activity
-        Log.objects.create(
+        log_activity(
             user=admin_user,
             action=f"Solved support ticket {ticket.token_id} for {ticket.user.name}"
         )
@@ -3427,24 +3427,34 @@ def admin_update_ticket_status_api(request):
         # Get ticket
         ticket = SupportTicket.objects.get(ticket_id=ticket_id)
         old_status = ticket.status
-        ticket.status = new_status
         
-        # If marking as resolved or closed, set resolved_at
-        if new_status in ['resolved', 'closed'] and not ticket.resolved_at:
-            from django.utils import timezone
-            ticket.resolved_at = timezone.now()
-        
-        ticket.save()
-        
-        # Notify buyer if status changed to resolved
-        if new_status == 'resolved':
-            from . import notification_service
-            notification_service.notify_ticket_resolved(ticket_id)
+        from django.db import transaction as db_transaction
+        from django.db.models import F, Value
+        from django.db.models.functions import Coalesce
+        from django.utils import timezone
+        from . import jobs, support_tickets
+        
+        now = timezone.now()
+        changes = {'status': new_status, 'updated_at': now}
+        # If marking as resolved or closed, set resolved_at (unless already set)
+        if new_status in ['resolved', 'closed']:
+            changes['resolved_at'] = Coalesce(F('resolved_at'), Value(now))
+        
+        with db_transaction.atomic():
+            # Only if nobody changed the status since it was read, so the
+            # stats counters move exactly once per transition
+            updated = SupportTicket.objects.filter(ticket_id=ticket_id, status=old_status).update(**changes)
+            if not updated:
+                return JsonResponse({"error": "Ticket status was changed by someone else, reload and try again"}, status=409)
+            support_tickets.status_changed(old_status, new_status)
+            
+            # Notify buyer if status changed to resolved (written by the job queue after commit)
+            if new_status == 'resolved':
+                jobs.enqueue_on_commit("notifications.ticket_resolved", ticket.ticket_id)
         
         # Log activity
-        admin_user_id = request.session.get('admin_user') or request.session.get('user_id')
-        admin_user = EstateUser.objects.get(user_id=admin_user_id)
-        Log.objects.create(
+        admin_user = request_user(request)
+        log_activity(
             user=admin_user,
             action=f"Changed ticket {ticket.token_id} status from {old_status} to {new_status}"
         )
@@ -3487,8 +3497,7 @@ def bulk_delete_logs_api(request):
             return JsonResponse({"error": "log_ids must be an array"}, status=400)
         
         # Get current user
-        user_id = request.session.get('admin_user') or request.session.get('seller_id') or request.session.get('buyer_id') or request.session.get('user_id')
-        current_user = EstateUser.objects.get(user_id=user_id)
+        current_user = request_user(request)
         role = request.session.get('role')
         
         # Filter logs based on role
@@ -3512,7 +3521,7 @@ def bulk_delete_logs_api(request):
         logs_to_delete.delete()
         
         # Create a log entry about the bulk deletion (if user has logs remaining)
-        Log.objects.create(
+        log_activity(
             user=current_user,
             action=f"Bulk deleted {delete_count} activity log(s)"
         )
@@ -3532,6 +3541,184 @@ def bulk_delete_logs_api(request):
         return JsonResponse({"error": str(e)}, status=500)
 
 
+
+# ======================
+# BACKGROUND JOB QUEUE
+# ======================
+
+def admin_job_stats_api(request):
+    """
+    Background job queue depth and latency (see backend/jobs.py)
+    GET /backend/api/admin/jobs/stats/
+    """
+    if 'role' not in request.session or request.session['role'] != "admin":
+        return JsonResponse({"error": "Admin access required"}, status=403)
+    
+    if request.method != "GET":
+        return JsonResponse({"error": "GET method required"}, status=405)
+    
+    from . import jobs
+    stats = jobs.job_stats()
+    
+    # Most recent permanent failures for troubleshooting
+    stats['recent_failures'] = [
+        {
+            'job_id': job['job_id'],
+            'task': job['task'],
+            'attempts': job['attempts'],
+            'finished_at': job['finished_at'].strftime('%Y-%m-%d %H:%M:%S') if job['finished_at'] else None,
+            'error': job['last_error'].splitlines()[0] if job['last_error'] else '',
+        }
+        for job in BackgroundJob.objects.filter(status=BackgroundJob.STATUS_FAILED)
+        .order_by('-finished_at')
+        .values('job_id', 'task', 'attempts', 'finished_at', 'last_error')[:20]
+    ]
+    return JsonResponse(stats)
+
+
+# ======================
+# QUERY INSPECTOR (development)
+# ======================
+
+def admin_query_inspector(request):
+    """
+    N+1 and slow-query findings recorded by backend/query_inspector.py
+    GET /backend/admin/query-inspector/           HTML page
+    GET /backend/admin/query-inspector/?format=json
+    Optional filter: ?kind=n_plus_one or ?kind=slow
+    """
+    if 'role' not in request.session or request.session['role'] != "admin":
+        if request.GET.get('format') == 'json':
+            return JsonResponse({"error": "Admin access required"}, status=403)
+        return redirect("/backend/login/")
+    
+    from . import query_inspector
+    findings = query_inspector.recent_findings()
+    kind = request.GET.get('kind')
+    if kind:
+        findings = [finding for finding in findings if finding.get('kind') == kind]
+    
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'enabled': query_inspector.ENABLED, 'findings': findings})
+    
+    # Hot spots: the source lines with the most N+1 reports
+    hot_spots = {}
+    for finding in findings:
+        if finding.get('kind') == 'n_plus_one':
+            spot = hot_spots.setdefault(finding.get('origin') or 'unknown', {'origin': finding.get('origin') or 'unknown', 'reports': 0, 'queries': 0})
+            spot['reports'] += 1
+            spot['queries'] += finding.get('count', 0)
+    
+    return render(request, "backend/query_inspector.html", {
+        "enabled": query_inspector.ENABLED,
+        "findings": findings,
+        "hot_spots": sorted(hot_spots.values(), key=lambda spot: -spot['queries']),
+        "kind": kind,
+        "slow_ms": query_inspector.SLOW_MS,
+        "repeat_threshold": query_inspector.REPEAT_THRESHOLD,
+    })
+
+
+# ======================
+# REQUEST METRICS
+# ======================
+
+def metrics_view(request):
+    """
+    Per-route latency, DB time, query count, response size and status codes
+    in the Prometheus text format (see backend/metrics.py)
+    GET /backend/metrics/
+    Access: admin session, or "Authorization: Bearer <METRICS_TOKEN>"
+    """
+    import hmac
+    from django.http import HttpResponse
+    from . import metrics
+
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    token_ok = bool(token) and hmac.compare_digest(header.encode(), f"Bearer {token}".encode())
+    if not token_ok and request.session.get('role') != "admin":
+        return JsonResponse({"error": "Admin access or metrics token required"}, status=403)
+
+    if request.method != "GET":
+        return JsonResponse({"error": "GET method required"}, status=405)
+
+    return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# ======================
+# REQUEST PROFILER
+# ======================
+
+@csrf_exempt
+def admin_profiler_token_api(request):
+    """
+    Issue a token that profiles requests carrying it (see backend/request_profiler.py)
+    POST /backend/api/admin/profiler/token/
+    Optional: path (only requests to this path are profiled)
+    Returns: JSON with token, expires_in and how to use it
+    """
+    if 'role' not in request.session or request.session['role'] != "admin":
+        return JsonResponse({"error": "Admin access required"}, status=403)
+
+    if request.method != "POST":
+        return JsonResponse({"error": "POST method required"}, status=405)
+
+    from . import request_profiler
+    if not request_profiler.ENABLED:
+        return JsonResponse({"error": "Profiling is disabled (PROFILER_ENABLED)"}, status=409)
+
+    try:
+        data = json.loads(request.body) if request.body else {}
+    except json.JSONDecodeError:
+        data = request.POST
+    path = (data.get('path') or '').strip() or None
+    if path and not path.startswith('/'):
+        return JsonResponse({"error": "path must start with /"}, status=400)
+
+    admin_id = session_user_id(request.session)
+    token = request_profiler.issue_token(admin_id, path)
+    log_activity(admin_id, f"Issued a profiling token{' for ' + path if path else ''}")
+    return JsonResponse({
+        'token': token,
+        'path': path,
+        'expires_in': request_profiler.TOKEN_MAX_AGE,
+        'max_per_hour': request_profiler.MAX_PER_HOUR,
+        'usage': f"Add ?{request_profiler.TOKEN_PARAM}=<token> or the X-Profile-Token header to the request",
+    })
+
+
+def admin_profiles_api(request):
+    """
+    Saved request profiles, newest first
+    GET /backend/api/admin/profiler/profiles/
+    """
+    if 'role' not in request.session or request.session['role'] != "admin":
+        return JsonResponse({"error": "Admin access required"}, status=403)
+
+    from . import request_profiler
+    profiles = request_profiler.list_profiles()
+    for profile in profiles:
+        profile['created'] = datetime.fromtimestamp(profile['created']).strftime('%Y-%m-%d %H:%M:%S')
+        profile['downloads'] = [f"/backend/admin/profiler/files/{filename}" for filename in profile['files']]
+    return JsonResponse({'enabled': request_profiler.ENABLED, 'profiles': profiles})
+
+
+def admin_profile_download(request, filename):
+    """
+    Download one saved .prof or .collapsed file
+    GET /backend/admin/profiler/files/<filename>
+    """
+    if 'role' not in request.session or request.session['role'] != "admin":
+        return redirect("/backend/login/")
+
+    from django.http import FileResponse, Http404
+    from . import request_profiler
+    path = request_profiler.profile_file(filename)
+    if path is None:
+        raise Http404("No such profile")
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=filename)
+
 # ==================== PROPERTY IMAGE MANAGEMENT APIs ====================
 
 @csrf_exempt
@@ -3610,23 +3797,13 @@ def delete_property_image_api(request, image_id):
         if role == 'seller' and property_obj.user_id != user_id:
             return JsonResponse({"error": "You don't have permission to delete this image"}, status=403)
         
-        # Store image path for deletion
-        image_path = image.image_url
-        
-        # Delete the file from storage if it exists
-        try:
-            from django.core.files.storage import default_storage
-            if default_storage.exists(image_path):
-                default_storage.delete(image_path)
-        except Exception as file_error:
-            print(f"Warning: Could not delete file {image_path}: {file_error}")
-        
-        # Delete the database record
+        # Delete the database record; the file may be shared with other listings, so it is
+        # only released here and reclaimed by `manage.py gc_media` once unreferenced
         image.delete()
         
         # Log the activity
-        current_user = EstateUser.objects.get(user_id=user_id)
-        Log.objects.create(
+        current_user = request_user(request)
+        log_activity(
             user=current_user,
             action=f"Deleted image from property: {property_obj.title} (ID: {property_obj.property_id})"
         )
@@ -3651,7 +3828,7 @@ def upload_property_images_api(request, property_id):
     API endpoint to upload new images to a property
     POST /backend/api/property-images/upload/<property_id>/
     Accepts: multipart/form-data with 'images' file field (supports multiple)
-    Validation: File format (jpg, jpeg, png, webp), size (<5MB per image)
+    Validation: File content (jpg, png, webp magic bytes), size (<5MB per image)
     """
     if request.method != "POST":
         return JsonResponse({"error": "POST method required"}, status=405)
@@ -3677,34 +3854,16 @@ def upload_property_images_api(request, property_id):
         if not images:
             return JsonResponse({"error": "No images provided"}, status=400)
         
-        # Validation settings
-        MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
-        ALLOWED_EXTENSIONS = ['jpg', 'jpeg', 'png', 'webp']
+        from . import uploads
         
         uploaded_images = []
         errors = []
         
         for idx, img in enumerate(images):
-            # Validate file size
-            if img.size > MAX_FILE_SIZE:
-                errors.append(f"Image {idx + 1} exceeds 5MB size limit")
-                continue
-            
-            # Validate file extension
-            file_ext = img.name.split('.')[-1].lower() if '.' in img.name else ''
-            if file_ext not in ALLOWED_EXTENSIONS:
-                errors.append(f"Image {idx + 1} has invalid format. Allowed: jpg, jpeg, png, webp")
-                continue
-            
-            # Save the file with unique filename
-            import uuid
-            unique_filename = f"property_{property_id}_{uuid.uuid4().hex[:8]}.{file_ext}"
-            
             try:
-                from django.core.files.storage import default_storage
-                from django.core.files.base import ContentFile
-                
-                file_path = default_storage.save(unique_filename, ContentFile(img.read()))
+                # Size and file type are checked from the first chunk, then streamed to storage
+                stored = uploads.save_image_upload(img)
+                file_path = stored.name
                 
                 # Create PropertyImage record
                 new_image = PropertyImage.objects.create(
@@ -3724,12 +3883,14 @@ def upload_property_images_api(request, property_id):
                     'description': new_image.description
                 })
                 
+            except uploads.InvalidUpload as invalid:
+                errors.append(f"Image {idx + 1} {invalid}")
             except Exception as save_error:
                 errors.append(f"Failed to save image {idx + 1}: {str(save_error)}")
         
         # Log the activity
-        current_user = EstateUser.objects.get(user_id=user_id)
-        Log.objects.create(
+        current_user = request_user(request)
+        log_activity(
             user=current_user,
             action=f"Uploaded {len(uploaded_images)} image(s) to property: {property_obj.title} (ID: {property_id})"
         )
@@ -3813,8 +3974,8 @@ def update_property_api(request, property_id):
         property_obj.save()
         
         # Log the activity
-        current_user = EstateUser.objects.get(user_id=user_id)
-        Log.objects.create(
+        current_user = request_user(request)
+        log_activity(
             user=current_user,
             action=f"Updated property: {property_obj.title} (ID: {property_id})"
         )
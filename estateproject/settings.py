@@ -55,11 +55,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'backend.metrics.MetricsMiddleware',  # first, so latency covers the other middleware
     'django.middleware.security.SecurityMiddleware',
+    'backend.request_profiler.RequestProfilerMiddleware',  # only requests with a profiling token
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'backend.current_user.EstateUserMiddleware',  # request.estate_user
+    'backend.query_inspector.QueryInspectorMiddleware',  # off unless QUERY_INSPECTOR_ENABLED
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -77,6 +81,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'backend.notification_push.push_context',  # push (ASGI) or polling (WSGI)
             ],
         },
     },
@@ -84,16 +89,45 @@ TEMPLATES = [
 
 
 WSGI_APPLICATION = 'estateproject.wsgi.application'
+ASGI_APPLICATION = 'estateproject.asgi.application'
+
+# Channels layer for pushed notifications (backend/notification_push.py).
+# In-memory only reaches sockets of the same process: enough for a single
+# ASGI process running the jobs itself (JOBS_EMBEDDED_WORKER). Notifications
+# created by `manage.py run_jobs` or served by several ASGI processes need
+# a shared layer: set CHANNEL_REDIS_URL (e.g. redis://localhost:6379/0).
+CHANNEL_REDIS_URL = os.environ.get('CHANNEL_REDIS_URL')
+if CHANNEL_REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [CHANNEL_REDIS_URL]},
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        },
+    }
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
 # Using SQLite (works everywhere - local and PythonAnywhere)
+# The job worker, activity-log writer and property-view flusher threads write
+# alongside requests: IMMEDIATE transactions take the write lock up front and
+# wait up to `timeout` seconds for it, instead of failing with "database is
+# locked" when a deferred transaction tries to upgrade its lock.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'timeout': 20,
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
@@ -142,6 +176,49 @@ import os
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Image uploads are streamed to storage (backend/uploads.py). Files above
+# FILE_UPLOAD_MAX_MEMORY_SIZE are spooled to a temp file while the request
+# is parsed instead of being held in memory.
+PROPERTY_IMAGE_MAX_SIZE = 5 * 1024 * 1024  # 5MB per image
+FILE_UPLOAD_MAX_MEMORY_SIZE = 512 * 1024
+# Property images are content-addressed and reference counted
+# (backend/media_store.py); `manage.py gc_media` reclaims unreferenced files
+# older than this grace period.
+MEDIA_GC_GRACE_SECONDS = 3600
+
+# Cache (home carousel snapshot, backend/home_carousel.py). LocMem is per
+# process; point this at Redis/Memcached when running several workers so
+# invalidation reaches all of them.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'estate-default',
+    }
+}
+HOME_CAROUSEL_LIMIT = 24  # slides, one per property
+HOME_CAROUSEL_CACHE_TIMEOUT = 600  # seconds; bounds staleness without a shared cache
+
+# Admin support tickets page reads its status counts from one cached row
+# (backend/support_tickets.py) instead of counting the tickets table.
+SUPPORT_TICKET_STATS_CACHED = True
+
+# Logged-in EstateUser rows are cached per process for this many seconds
+# (backend/current_user.py); saves and deletes drop the entry immediately.
+ESTATE_USER_CACHE_TTL = 30
+
+# Login phone lookup (EstateUser.phone_normalized): numbers entered without
+# a +country prefix and with this many digits get the default country code.
+PHONE_DEFAULT_COUNTRY_CODE = '91'
+PHONE_LOCAL_DIGITS = 10
+
+# Password hashing (backend/passwords.py). Hashing/verification runs in a
+# process pool so login bursts cannot tie up web workers; requests beyond
+# PASSWORD_POOL_MAX_PENDING get "try again" (HTTP 503) immediately.
+PASSWORD_POOL_SIZE = int(os.environ.get('PASSWORD_POOL_SIZE', '2'))  # 0 = hash inline
+PASSWORD_POOL_MAX_PENDING = 32
+PASSWORD_POOL_TIMEOUT = 10  # seconds
+PASSWORD_RESET_MAX_AGE = 3600  # seconds a "forgot password" link stays valid
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -149,6 +226,63 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Email backend for development
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
+# Activity log writer (backend/activity_log.py)
+# Log rows are buffered and written in batches by a background thread;
+# unwritten events are journaled to ACTIVITY_LOG_SPILL_DIR.
+ACTIVITY_LOG_ASYNC = os.environ.get('ACTIVITY_LOG_ASYNC', 'True').lower() == 'true'
+ACTIVITY_LOG_BATCH_SIZE = 200
+ACTIVITY_LOG_FLUSH_INTERVAL = 2.0  # seconds
+ACTIVITY_LOG_SPILL_DIR = os.path.join(BASE_DIR, 'activity_spill')
+
+# Property view tracking (backend/property_views.py)
+# Views are counted in memory and flushed as per-day counters and
+# "recently viewed" rows by a background thread.
+PROPERTY_VIEWS_ASYNC = os.environ.get('PROPERTY_VIEWS_ASYNC', 'True').lower() == 'true'
+PROPERTY_VIEWS_FLUSH_INTERVAL = 5.0  # seconds
+PROPERTY_VIEWS_BATCH_SIZE = 1000
+PROPERTY_VIEWS_RING_SIZE = 20  # recently viewed properties kept per user
+
+# Query inspector (backend/query_inspector.py), development only: logs N+1
+# patterns and slow queries (with EXPLAIN) per request to a rotating file,
+# shown at /backend/admin/query-inspector/.
+QUERY_INSPECTOR_ENABLED = os.environ.get('QUERY_INSPECTOR_ENABLED', 'False').lower() == 'true'
+QUERY_INSPECTOR_REPEAT_THRESHOLD = 5  # same query shape this often in one request = N+1
+QUERY_INSPECTOR_SLOW_MS = 100
+QUERY_INSPECTOR_LOG_FILE = os.path.join(BASE_DIR, 'logs', 'query_inspector.log')
+QUERY_INSPECTOR_MAX_BYTES = 5 * 1024 * 1024
+QUERY_INSPECTOR_BACKUP_COUNT = 3
+
+# Request metrics (backend/metrics.py), scraped from /backend/metrics/ by
+# admins or with "Authorization: Bearer <METRICS_TOKEN>". With several
+# worker processes point METRICS_MULTIPROC_DIR at a directory they share.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_FLUSH_INTERVAL = 10.0  # seconds
+METRICS_MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR') or None
+
+# On-demand request profiler (backend/request_profiler.py): admins issue
+# signed tokens; a request carrying one is profiled (cProfile + sampled
+# stacks) into PROFILER_DIR, at most PROFILER_MAX_PER_HOUR times an hour.
+PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'True').lower() == 'true'
+PROFILER_DIR = os.environ.get('PROFILER_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILER_TOKEN_MAX_AGE = 900  # seconds
+PROFILER_MAX_PER_HOUR = 10
+PROFILER_MAX_FILES = 200  # newest profiles kept
+PROFILER_SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+
+# Background job queue (backend/jobs.py)
+# Production worker: `python manage.py run_jobs --threads N`, run next to the
+# web server (jobs stay queued until it runs). The embedded worker runs one
+# thread per web process, started on its first enqueue, so development
+# works without run_jobs; it is off unless DEBUG.
+JOBS_EMBEDDED_WORKER = os.environ.get('JOBS_EMBEDDED_WORKER', str(DEBUG)).lower() == 'true'
+JOBS_POLL_INTERVAL = 1.0  # seconds
+JOBS_LOCK_TIMEOUT = 300  # seconds before a running job is considered lost
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_BASE_DELAY = 5  # seconds, doubled per attempt
+JOBS_RETRY_MAX_DELAY = 3600  # seconds
+JOBS_RETENTION_DAYS = 7  # finished jobs are purged after this
+
 # AI Chatbot Configuration
 from backend.chatbot_config import GEMINI_API_KEY
 GEMINI_API_KEY = GEMINI_API_KEY
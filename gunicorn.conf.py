@@ -0,0 +1,21 @@
+"""
+Gunicorn settings for Estate Management System
+Usage: PROMETHEUS_MULTIPROC_DIR=/tmp/estate-metrics gunicorn estateproject.wsgi
+
+Gunicorn reads this file from the working directory. Each worker writes
+its request metrics to PROMETHEUS_MULTIPROC_DIR (backend/metrics.py), so
+the directory is emptied once when the master starts.
+
+Background jobs are not run by the web workers in production: start
+``python manage.py run_jobs --threads 4`` alongside gunicorn.
+"""
+
+import os
+import shutil
+
+
+def on_starting(server):
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)